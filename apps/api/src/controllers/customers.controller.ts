@@ -2,9 +2,15 @@ import { Request, Response } from "express";
 import { Customer } from "../models/Customer";
 
 // GET /api/customers
-export const getCustomers = async (_: Request, res: Response) => {
+// Soporta query param: ?email=xxx
+export const getCustomers = async (req: Request, res: Response) => {
   try {
-    const customers = await Customer.find();
+    const { email } = req.query;
+
+    const filter: any = {};
+    if (email) filter.email = email;
+
+    const customers = await Customer.find(filter);
     res.json(customers);
   } catch (error) {
     res.status(500).json({ message: "Error al obtener clientes", error });
@@ -2,13 +2,39 @@ import { Request, Response } from "express";
 import { Order } from "../models/Order";
 import { IProduct, Product } from "../models/Product";
 import { Customer } from "../models/Customer";
+import { parseListOptions } from "../utils/listQuery";
+import { sendNotModified, setListValidators } from "../utils/conditional";
 
 // GET /api/orders
-export const getOrders = async (_: Request, res: Response) => {
+// Soporta query params: ?status=&paymentStatus=&orderNumber=&customerId=&updatedSince=
+// y paginación: ?limit=&skip=&sort=&fields= (con limit devuelve X-Total-Count).
+// Responde ETag / Last-Modified y 304 si el listado no cambió (If-None-Match / If-Modified-Since)
+export const getOrders = async (req: Request, res: Response) => {
   try {
-    const orders = await Order.find()
-      .populate("customerId")
-      .populate("items.productId");
+    const { status, paymentStatus, orderNumber, customerId, updatedSince } = req.query;
+
+    // Construir filtro dinámico
+    const filter: any = {};
+    if (status) filter.status = status;
+    if (paymentStatus) filter.paymentStatus = paymentStatus;
+    if (orderNumber) filter.orderNumber = orderNumber;
+    if (customerId) filter.customerId = customerId;
+    // Solo las órdenes creadas o modificadas desde esa fecha (sincronización incremental)
+    if (updatedSince) filter.updatedAt = { $gte: new Date(String(updatedSince)) };
+
+    if (await sendNotModified(req, res, Order, filter)) return;
+
+    const { limit, skip, sort, fields } = parseListOptions(req.query);
+    const query = Order.find(filter).skip(skip);
+    if (sort) query.sort(sort);
+    if (limit) query.limit(limit);
+    // Con proyección se devuelven solo los campos pedidos, sin poblar
+    if (fields) query.select(fields);
+    else query.populate("customerId").populate("items.productId");
+
+    if (limit) res.set("X-Total-Count", String(await Order.countDocuments(filter)));
+    const orders = await query;
+    setListValidators(req, res, orders);
     res.json(orders);
   } catch (error) {
     res.status(500).json({ message: "Error al obtener órdenes", error });
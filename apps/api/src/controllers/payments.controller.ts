@@ -1,21 +1,36 @@
 import { Request, Response } from "express";
 import { Payment } from "../models/Payment";
+import { parseListOptions } from "../utils/listQuery";
+import { sendNotModified, setListValidators } from "../utils/conditional";
 
 // GET /api/payments
-// Soporta query params: ?orderId=xxx&status=xxx&culqiOrderId=xxx
+// Soporta query params: ?orderId=xxx&status=xxx&culqiOrderId=xxx&updatedSince=
+// y paginación: ?limit=&skip=&sort=&fields= (con limit devuelve X-Total-Count).
+// Responde ETag / Last-Modified y 304 si el listado no cambió (If-None-Match / If-Modified-Since)
 export const getPayments = async (req: Request, res: Response) => {
   try {
-    const { orderId, status, culqiOrderId } = req.query;
+    const { orderId, status, culqiOrderId, updatedSince } = req.query;
     
     // Construir filtro dinámico
     const filter: any = {};
     if (orderId) filter.orderId = orderId;
     if (status) filter.status = status;
     if (culqiOrderId) filter.culqiOrderId = culqiOrderId;
+    // Solo los pagos creados o modificados desde esa fecha (sincronización incremental)
+    if (updatedSince) filter.updatedAt = { $gte: new Date(String(updatedSince)) };
+
+    if (await sendNotModified(req, res, Payment, filter)) return;
     
-    const payments = await Payment.find(filter)
-      .populate('orderId')
-      .populate('customerId');
+    const { limit, skip, sort, fields } = parseListOptions(req.query);
+    const query = Payment.find(filter).skip(skip);
+    if (sort) query.sort(sort);
+    if (limit) query.limit(limit);
+    if (fields) query.select(fields);
+    else query.populate('orderId').populate('customerId');
+    
+    if (limit) res.set("X-Total-Count", String(await Payment.countDocuments(filter)));
+    const payments = await query;
+    setListValidators(req, res, payments);
     
     res.json(payments);
   } catch (error) {
@@ -48,8 +48,14 @@ const OrderSchema = new Schema<IOrder>({
   notes: String,
   createdAt: { type: Date, default: Date.now },
   updatedAt: { type: Date, default: Date.now },
+}, {
+  // Mantiene updatedAt al día en save y findOneAndUpdate (lo usa ?updatedSince=)
+  timestamps: true,
 });
 
+// Sincronización incremental y validadores de GET /orders (último updatedAt)
+OrderSchema.index({ updatedAt: -1 });
+
 // Antes de guardar, genera el número de orden incremental
 OrderSchema.pre("save", async function (next) {
   const order = this as IOrder;
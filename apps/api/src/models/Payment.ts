@@ -40,6 +40,12 @@ const PaymentSchema = new Schema({
   gatewayResponse: { type: Object },
   createdAt: { type: Date, default: Date.now },
   updatedAt: { type: Date, default: Date.now },
+}, {
+  // Mantiene updatedAt al día en save y findOneAndUpdate (lo usa ?updatedSince=)
+  timestamps: true,
 });
 
+// Sincronización incremental y validadores de GET /payments (último updatedAt)
+PaymentSchema.index({ updatedAt: -1 });
+
 export const Payment = model<IPayment>("Payment", PaymentSchema);
\ No newline at end of file
@@ -48,6 +48,11 @@ const router = Router();
  *   get:
  *     summary: Obtener todos los clientes
  *     tags: [Customers]
+ *     parameters:
+ *       - in: query
+ *         name: email
+ *         schema:
+ *           type: string
  *     responses:
  *       200:
  *         description: Lista de clientes
@@ -60,6 +60,9 @@ const router = Router();
  *         createdAt:
  *           type: string
  *           format: date-time
+ *         updatedAt:
+ *           type: string
+ *           format: date-time
  */
 
 /**
@@ -68,6 +71,48 @@ const router = Router();
  *   get:
  *     summary: Obtener todas las órdenes
  *     tags: [Orders]
+ *     parameters:
+ *       - in: query
+ *         name: status
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: paymentStatus
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: orderNumber
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: customerId
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: updatedSince
+ *         schema:
+ *           type: string
+ *           format: date-time
+ *         description: Solo órdenes creadas o modificadas desde esa fecha
+ *       - in: query
+ *         name: limit
+ *         schema:
+ *           type: integer
+ *         description: Máximo de resultados (agrega el header X-Total-Count)
+ *       - in: query
+ *         name: skip
+ *         schema:
+ *           type: integer
+ *       - in: query
+ *         name: sort
+ *         schema:
+ *           type: string
+ *         description: Campo de orden, p. ej. -createdAt
+ *       - in: query
+ *         name: fields
+ *         schema:
+ *           type: string
+ *         description: Campos a devolver separados por coma (sin poblar referencias)
  *     responses:
  *       200:
  *         description: Lista de órdenes
@@ -77,6 +122,8 @@ const router = Router();
  *               type: array
  *               items:
  *                 $ref: '#/components/schemas/Order'
+ *       304:
+ *         description: Sin cambios desde el ETag (If-None-Match) o la fecha (If-Modified-Since) enviados
  */
 router.get("/", getOrders);
 
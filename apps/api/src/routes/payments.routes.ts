@@ -46,6 +46,9 @@ const router = Router();
  *         createdAt:
  *           type: string
  *           format: date-time
+ *         updatedAt:
+ *           type: string
+ *           format: date-time
  */
 
 /**
@@ -54,6 +57,44 @@ const router = Router();
  *   get:
  *     summary: Obtener todos los pagos
  *     tags: [Payments]
+ *     parameters:
+ *       - in: query
+ *         name: orderId
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: status
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: culqiOrderId
+ *         schema:
+ *           type: string
+ *       - in: query
+ *         name: updatedSince
+ *         schema:
+ *           type: string
+ *           format: date-time
+ *         description: Solo pagos creados o modificados desde esa fecha
+ *       - in: query
+ *         name: limit
+ *         schema:
+ *           type: integer
+ *         description: Máximo de resultados (agrega el header X-Total-Count)
+ *       - in: query
+ *         name: skip
+ *         schema:
+ *           type: integer
+ *       - in: query
+ *         name: sort
+ *         schema:
+ *           type: string
+ *         description: Campo de orden, p. ej. -createdAt
+ *       - in: query
+ *         name: fields
+ *         schema:
+ *           type: string
+ *         description: Campos a devolver separados por coma (sin poblar referencias)
  *     responses:
  *       200:
  *         description: Lista de pagos
@@ -63,6 +104,8 @@ const router = Router();
  *               type: array
  *               items:
  *                 $ref: '#/components/schemas/Payment'
+ *       304:
+ *         description: Sin cambios desde el ETag (If-None-Match) o la fecha (If-Modified-Since) enviados
  */
 router.get("/", getPayments);
 
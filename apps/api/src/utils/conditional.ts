@@ -0,0 +1,74 @@
+import crypto from "crypto";
+import { Request, Response } from "express";
+import { Model } from "mongoose";
+import { parseListOptions } from "./listQuery";
+
+// Validadores (ETag / Last-Modified) de los listados.
+//
+// Se calculan sobre el filtro: la cantidad de documentos (detecta borrados)
+// y el updatedAt más reciente (detecta altas y modificaciones). El ETag
+// además lleva la forma de la consulta (limit / skip / sort / fields): otra
+// página u otra proyección del mismo filtro es otra respuesta. Los cambios
+// en documentos poblados (p. ej. el nombre de un cliente dentro de una
+// orden) no cambian el ETag.
+
+const queryShape = (req: Request): string => {
+  const { limit, skip, sort, fields } = parseListOptions(req.query);
+  return crypto
+    .createHash("sha1")
+    .update(JSON.stringify([limit ?? null, skip, sort ?? null, fields ?? null]))
+    .digest("base64url")
+    .slice(0, 12);
+};
+
+const setValidators = (req: Request, res: Response, count: number, lastModified?: Date) => {
+  res.set("ETag", `W/"${queryShape(req)}-${count}-${lastModified ? lastModified.getTime() : 0}"`);
+  if (lastModified) res.set("Last-Modified", lastModified.toUTCString());
+};
+
+const isConditional = (req: Request): boolean =>
+  req.get("If-None-Match") !== undefined || req.get("If-Modified-Since") !== undefined;
+
+// Responde 304 a un listado que no cambió, antes de consultarlo y serializarlo.
+// Solo consulta los validadores si el cliente envió If-None-Match o
+// If-Modified-Since; a los demás pedidos no les agrega ninguna consulta.
+export const sendNotModified = async (
+  req: Request,
+  res: Response,
+  model: Model<any>,
+  filter: Record<string, any>
+): Promise<boolean> => {
+  if (!isConditional(req)) return false;
+
+  const [count, latest] = await Promise.all([
+    Object.keys(filter).length ? model.countDocuments(filter) : model.estimatedDocumentCount(),
+    model.findOne(filter).sort({ updatedAt: -1 }).select("updatedAt").lean<{ updatedAt?: Date }>(),
+  ]);
+  setValidators(req, res, count, latest?.updatedAt ? new Date(latest.updatedAt) : undefined);
+
+  if (!req.fresh) return false;
+  res.status(304).end();
+  return true;
+};
+
+// Validadores de un listado completo a partir de los documentos que se van a
+// responder, sin otra consulta: son los mismos que calcularía sendNotModified.
+// Una página (limit / skip) o una proyección sin updatedAt no representa al
+// filtro completo y se responde sin ellos.
+export const setListValidators = (
+  req: Request,
+  res: Response,
+  docs: Array<{ updatedAt?: Date }>
+) => {
+  if (res.get("ETag")) return; // ya los puso sendNotModified
+  const { limit, skip, fields } = parseListOptions(req.query);
+  if (limit || skip) return;
+  if (fields && !fields.split(" ").includes("updatedAt")) return;
+
+  let latest = 0;
+  for (const doc of docs) {
+    const updatedAt = doc.updatedAt ? new Date(doc.updatedAt).getTime() : 0;
+    if (updatedAt > latest) latest = updatedAt;
+  }
+  setValidators(req, res, docs.length, latest ? new Date(latest) : undefined);
+};
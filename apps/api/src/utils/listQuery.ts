@@ -0,0 +1,25 @@
+import { Request } from "express";
+
+// Máximo de documentos que se devuelven por página
+const MAX_LIMIT = 500;
+
+export interface ListOptions {
+  limit?: number;
+  skip: number;
+  sort?: string;
+  fields?: string;
+}
+
+// Lee ?limit=&skip=&sort=&fields= para paginar y proyectar listados
+export const parseListOptions = (query: Request["query"]): ListOptions => {
+  const limit = Number(query.limit);
+  const skip = Number(query.skip);
+
+  return {
+    limit: Number.isInteger(limit) && limit > 0 ? Math.min(limit, MAX_LIMIT) : undefined,
+    skip: Number.isInteger(skip) && skip > 0 ? skip : 0,
+    sort: typeof query.sort === "string" ? query.sort : undefined,
+    // fields=orderNumber,totalAmount -> "orderNumber totalAmount"
+    fields: typeof query.fields === "string" ? query.fields.split(",").join(" ") : undefined,
+  };
+};
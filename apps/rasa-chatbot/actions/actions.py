@@ -1,12 +1,144 @@
-from typing import Any, Text, Dict, List
+import asyncio
+import contextlib
+from typing import Any, Callable, Optional, Text, Dict, List, Tuple
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
-import requests
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from . import startup
+from .aggregator import sales_aggregator
+from .api_client import Page, api
+from .cache import snapshot_cache
+from .config import ACTION_DEADLINE
+from .customer_scope import Partition, customer_scope, sender_phones
+from .executor import compute_executor
+from .kernels import OrderStats, stream_stats, top_orders
+from .metrics import instrumented
+from .order_frame import build_order_frame
+from .periods import LOCAL_TZ, Period, day_number, parse_period, period_bounds, today
+from .ranking import bottom_k, top_k
+from .singleflight import coalesced
+from .snapshot import Snapshot, ref_id
+from .sqlite_replica import sqlite_replica
+
+PARTIAL_NOTE = "\n⚠️ Respuesta parcial: algunos datos no respondieron a tiempo."
+
+# Precarga, refresco y endpoint /metrics (Prometheus) con las mediciones de
+# @instrumented: arrancan con el servidor, en el proceso que atiende las acciones
+startup.install()
+
+
+# ============================================
+# AGREGACIONES SOBRE ÓRDENES
+# ============================================
+
+async def _order_stats(*extra: Text) -> Tuple[Optional[OrderStats], Optional[Snapshot]]:
+    """Agregados de ranking de las órdenes, mientras se descargan las colecciones `extra`.
+
+    Con las órdenes en caché, OrderStats se calcula una sola vez por versión
+    y lo comparten todas las acciones de ranking; si no, se calcula en una
+    pasada en streaming. Devuelve (None, None) si no se pudieron obtener las órdenes.
+    """
+    extra_task = asyncio.ensure_future(snapshot_cache.snapshot(*extra, deadline=ACTION_DEADLINE))
+    try:
+        # El recorrido de todas las órdenes corre en el pool de cálculo, no en el event loop
+        stats = await compute_executor.order_stats(snapshot_cache.peek("orders"))
+        if stats is None:
+            async with snapshot_cache.stream("orders") as orders:
+                stats = await stream_stats(orders) if orders is not None else None
+        snap = await extra_task if stats is not None else None
+    finally:
+        extra_task.cancel()
+        # Se espera aunque se haya cancelado: si ya había fallado, su excepción
+        # se recoge aquí y no queda como "Task exception was never retrieved"
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await extra_task
+    return stats, snap
+
+
+async def _top_orders(snap: Snapshot, column: Text, k: int) -> Optional[List[Dict[Text, Any]]]:
+    """top_orders con el OrderFrame de la versión armado en el pool de cálculo."""
+    await compute_executor.derive(snap, "orders", build_order_frame)
+    return top_orders(snap, column, k)
+
+
+async def _list_orders(status: Optional[Text] = None, payment_status: Optional[Text] = None,
+                       period: Optional[Period] = None, limit: int = 5) -> Optional[Page]:
+    """Las primeras `limit` órdenes que cumplen los filtros y cuántas son.
+
+    Con la réplica SQLite cargada es una consulta indexada. Si no, se piden
+    a la API; como la API no filtra por fecha, con `period` se recorren las
+    órdenes (en caché o en streaming). None si no se pudieron obtener.
+    """
+    since, until = period_bounds(period) if period is not None else (None, None)
+    if sqlite_replica is not None:
+        page = await sqlite_replica.list_orders(status=status, payment_status=payment_status,
+                                                since=since, until=until, limit=limit)
+        if page is not None:
+            return page
+    if period is None:
+        return await api.list_orders(status=status, payment_status=payment_status, limit=limit,
+                                     fields=('orderNumber', 'totalAmount'))
+
+    async with snapshot_cache.stream("orders") as orders:
+        if orders is None:
+            return None
+        items: List[Dict[Text, Any]] = []
+        total = 0
+        async for order in orders:
+            created_at = order.created_epoch
+            if (created_at is None or not since <= created_at < until
+                    or status is not None and order.status != status
+                    or payment_status is not None and order.payment_status != payment_status):
+                continue
+            total += 1
+            if len(items) < limit:
+                items.append(order)
+    return Page(items, total)
+
+
+async def _my_partition(dispatcher: CollectingDispatcher, tracker: Tracker) -> Optional[Partition]:
+    """La partición (cliente y órdenes) del remitente de WhatsApp.
+
+    Si no se puede responder (el remitente no es un teléfono, no tiene
+    cuenta o la API no respondió) avisa por el dispatcher y devuelve None.
+    """
+    if not sender_phones(tracker.sender_id):
+        dispatcher.utter_message(text="Esta consulta solo está disponible desde WhatsApp.")
+        return None
+    partition = await customer_scope.get(tracker.sender_id)
+    if partition is None:
+        dispatcher.utter_message(text="❌ No pude consultar tus órdenes.")
+    elif partition.customer is None:
+        dispatcher.utter_message(text="No encontré una cuenta registrada con tu número.")
+        return None
+    return partition
+
+
+def _versions(*collections: Text, sales: bool = False, dated: bool = False) -> Callable[[], Any]:
+    """Versión de los datos que lee una acción de analíticas (clave de @coalesced).
+
+    Combina la de las colecciones en caché con la del agregador de ventas
+    (`sales`) y, si la respuesta depende de la fecha (`dated`), el día de
+    hoy: una consulta que empieza después de un cambio no se une a la
+    anterior ni recibe su respuesta guardada. Es None mientras falte alguna
+    colección o al agregador le toque sincronizar.
+    """
+    def version() -> Any:
+        versions = snapshot_cache.peek(*collections).version
+        if any(v is None for _, v in versions):
+            return None
+        if sales and not sales_aggregator.current:
+            return None
+        return (
+            sales_aggregator.version if sales else None,
+            versions,
+            today() if dated else None,
+        )
+
+    return version
 
-# Configuración de la API
-API_BASE_URL = "http://localhost:3000/api"
 
 # ============================================
 # ACCIONES DE ÓRDENES Y PEDIDOS
@@ -16,19 +148,18 @@ class ActionGetOrders(Action):
     def name(self) -> Text:
         return "action_get_orders"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                total = len(orders)
+            snap = await snapshot_cache.snapshot("orders")
+            if snap.orders is not None:
+                total = len(snap.orders)
                 
-                # Ordenar por fecha (más recientes primero)
-                sorted_orders = sorted(orders, key=lambda x: x.get('createdAt', ''), reverse=True)
-                recent = sorted_orders[:5]
+                # Las 5 más recientes, sin ordenar la lista completa
+                recent = await _top_orders(snap, 'created_at', 5)
                 
                 msg = f"📦 Tienes {total} órdenes en total.\n\n"
                 msg += f"📋 Últimas {len(recent)} órdenes:\n\n"
@@ -48,7 +179,8 @@ class ActionGetOrderStatus(Action):
     def name(self) -> Text:
         return "action_get_order_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -62,27 +194,29 @@ class ActionGetOrderStatus(Action):
         try:
             # Buscar por order_number si está disponible
             if order_number:
-                response = requests.get(f"{API_BASE_URL}/orders")
-                if response.status_code == 200:
-                    orders = response.json()
-                    order = next((o for o in orders if o.get('orderNumber') == order_number), None)
-                    if order:
-                        status = order.get('status', 'desconocido')
-                        payment_status = order.get('paymentStatus', 'desconocido')
-                        total = order.get('totalAmount', 0)
-                        
-                        dispatcher.utter_message(
-                            text=f"📦 Orden {order_number}:\n"
-                                 f"Estado: {status}\n"
-                                 f"Pago: {payment_status}\n"
-                                 f"Total: S/ {total:.2f}"
-                        )
-                    else:
-                        dispatcher.utter_message(text=f"❌ No encontré la orden {order_number}.")
+                # Con las órdenes en caché se usa el índice; si no, se pide solo esa orden
+                snap = snapshot_cache.peek("orders")
+                if snap.orders is not None:
+                    order = snap.order_by_number(order_number)
+                else:
+                    order = await api.find_order(order_number)
+                
+                if order:
+                    status = order.get('status', 'desconocido')
+                    payment_status = order.get('paymentStatus', 'desconocido')
+                    total = order.get('totalAmount', 0)
+                    
+                    dispatcher.utter_message(
+                        text=f"📦 Orden {order_number}:\n"
+                             f"Estado: {status}\n"
+                             f"Pago: {payment_status}\n"
+                             f"Total: S/ {total:.2f}"
+                    )
+                else:
+                    dispatcher.utter_message(text=f"❌ No encontré la orden {order_number}.")
             else:
-                response = requests.get(f"{API_BASE_URL}/orders/{order_id}")
-                if response.status_code == 200:
-                    order = response.json()
+                order = await api.get_order(order_id)
+                if order:
                     dispatcher.utter_message(text=f"Estado de la orden: {order['status']}")
                 else:
                     dispatcher.utter_message(text="❌ No encontré la orden.")
@@ -96,19 +230,17 @@ class ActionGetPendingOrders(Action):
     def name(self) -> Text:
         return "action_get_pending_orders"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                pending = [o for o in orders if o.get('paymentStatus') == 'pending']
-                
-                if pending:
-                    msg = f"📦 Tienes {len(pending)} órdenes pendientes:\n\n"
-                    for order in pending[:5]:  # Máximo 5
+            page = await _list_orders(payment_status='pending')
+            if page is not None:
+                if page.items:
+                    msg = f"📦 Tienes {page.total} órdenes pendientes:\n\n"
+                    for order in page.items:  # Máximo 5
                         msg += f"• {order['orderNumber']}: S/ {order['totalAmount']:.2f}\n"
                     dispatcher.utter_message(text=msg)
                 else:
@@ -125,17 +257,15 @@ class ActionGetRecentOrders(Action):
     def name(self) -> Text:
         return "action_get_recent_orders"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                # Ordenar por fecha (más recientes primero)
-                sorted_orders = sorted(orders, key=lambda x: x.get('createdAt', ''), reverse=True)
-                recent = sorted_orders[:5]
+            # Las 5 más recientes, sin ordenar la lista completa
+            recent = await _top_orders(await snapshot_cache.snapshot("orders"), 'created_at', 5)
+            if recent is not None:
                 
                 msg = f"📦 Últimas {len(recent)} órdenes:\n\n"
                 for order in recent:
@@ -154,25 +284,25 @@ class ActionGetMostExpensiveOrder(Action):
     def name(self) -> Text:
         return "action_get_most_expensive_order"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("orders", "customers"))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
-            customers_resp = requests.get(f"{API_BASE_URL}/customers")
+            snap = await snapshot_cache.snapshot("orders", "customers", deadline=ACTION_DEADLINE)
+            orders = snap.orders
+            customers = snap.customers
             
-            if orders_resp.status_code == 200 and customers_resp.status_code == 200:
-                orders = orders_resp.json()
-                customers = customers_resp.json()
+            if orders is not None:
                 
                 if orders:
                     # Encontrar la orden más cara
-                    most_expensive = max(orders, key=lambda x: x.get('totalAmount', 0))
+                    most_expensive = (await _top_orders(snap, 'amount', 1))[0]
                     
-                    # Obtener información del cliente
-                    customer_id = most_expensive.get('customerId')
-                    customer = next((c for c in customers if (c.get('_id') or c.get('id')) == customer_id), None)
+                    # Obtener información del cliente (si los clientes llegaron a tiempo)
+                    customer = snap.customer(most_expensive.get('customerId'))
                     customer_name = customer.get('name', 'Cliente desconocido') if customer else 'Cliente desconocido'
                     
                     msg = f"💰 **Orden de Compra Más Cara:**\n\n"
@@ -191,6 +321,9 @@ class ActionGetMostExpensiveOrder(Action):
                         if len(items) > 5:
                             msg += f"  ... y {len(items) - 5} más\n"
                     
+                    if customers is None:
+                        msg += PARTIAL_NOTE
+                    
                     dispatcher.utter_message(text=msg)
                 else:
                     dispatcher.utter_message(text="❌ No hay órdenes registradas.")
@@ -206,7 +339,8 @@ class ActionCancelOrder(Action):
     def name(self) -> Text:
         return "action_cancel_order"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -216,8 +350,12 @@ class ActionCancelOrder(Action):
             return []
         
         try:
-            response = requests.delete(f"{API_BASE_URL}/orders/{order_id}")
-            if response.status_code == 200:
+            if await api.delete_order(order_id):
+                snapshot_cache.invalidate("orders")
+                sales_aggregator.remove(order_id)
+                if sqlite_replica is not None:
+                    sqlite_replica.remove("orders", order_id)
+                customer_scope.invalidate(order_id=order_id)
                 dispatcher.utter_message(text=f"✅ Orden {order_id} cancelada exitosamente.")
             else:
                 dispatcher.utter_message(text="❌ No se pudo cancelar la orden.")
@@ -231,7 +369,8 @@ class ActionUpdateOrderStatus(Action):
     def name(self) -> Text:
         return "action_update_order_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -243,8 +382,13 @@ class ActionUpdateOrderStatus(Action):
             return []
         
         try:
-            response = requests.put(f"{API_BASE_URL}/orders/{order_id}", json={"status": new_status})
-            if response.status_code == 200:
+            order = await api.update_order(order_id, status=new_status)
+            if order:
+                snapshot_cache.invalidate("orders")
+                sales_aggregator.apply(order)
+                if sqlite_replica is not None:
+                    sqlite_replica.apply("orders", order)
+                customer_scope.invalidate(customer_id=ref_id(order.get('customerId')), order_id=order_id)
                 dispatcher.utter_message(text=f"✅ Orden actualizada a: {new_status}")
             else:
                 dispatcher.utter_message(text="❌ No se pudo actualizar la orden.")
@@ -258,20 +402,41 @@ class ActionFilterOrders(Action):
     def name(self) -> Text:
         return "action_filter_orders"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         filter_status = tracker.get_slot("order_status")
+        payment_status = tracker.get_slot("payment_status")
+        time_period = tracker.get_slot("time_period")
+        if not filter_status and not payment_status:
+            dispatcher.utter_message(text="Por favor, indícame el estado de las órdenes.")
+            return []
+        
+        # Los filtros opcionales (estado de pago, periodo) se usan una sola vez
+        events = [SlotSet("payment_status", None), SlotSet("time_period", None)]
+        period = parse_period(time_period) if time_period else None
+        if time_period and period is None:
+            dispatcher.utter_message(
+                text="🤔 No entendí el periodo. Prueba con: hoy, ayer, esta semana, "
+                     "este mes, enero, últimos 7 días o 01/03 al 15/03."
+            )
+            return events
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                filtered = [o for o in orders if o.get('status') == filter_status]
-                
-                msg = f"📦 Órdenes con estado '{filter_status}': {len(filtered)}\n\n"
-                for order in filtered[:5]:
+            page = await _list_orders(status=filter_status, payment_status=payment_status, period=period)
+            if page is not None:
+                criteria = []
+                if filter_status:
+                    criteria.append(f"estado '{filter_status}'")
+                if payment_status:
+                    criteria.append(f"pago '{payment_status}'")
+                msg = f"📦 Órdenes con {' y '.join(criteria)}"
+                if period is not None:
+                    msg += f" {period.label}"
+                msg += f": {page.total}\n\n"
+                for order in page.items:
                     msg += f"• {order['orderNumber']}: S/ {order['totalAmount']:.2f}\n"
                 
                 dispatcher.utter_message(text=msg)
@@ -280,7 +445,7 @@ class ActionFilterOrders(Action):
         except Exception as e:
             dispatcher.utter_message(text=f"❌ Error: {str(e)}")
         
-        return []
+        return events
 
 
 # ============================================
@@ -291,16 +456,16 @@ class ActionGetCustomerInfo(Action):
     def name(self) -> Text:
         return "action_get_customer_info"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         customer_id = tracker.get_slot("customer_id")
         
         try:
-            response = requests.get(f"{API_BASE_URL}/customers/{customer_id}")
-            if response.status_code == 200:
-                customer = response.json()
+            customer = await api.get_customer(customer_id)
+            if customer:
                 dispatcher.utter_message(
                     text=f"👤 Cliente: {customer['name']}\n"
                          f"📧 Email: {customer['email']}\n"
@@ -318,46 +483,39 @@ class ActionGetTopCustomers(Action):
     def name(self) -> Text:
         return "action_get_top_customers"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("orders", "customers"))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            customers_resp = requests.get(f"{API_BASE_URL}/customers")
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
+            # Total gastado por cliente
+            stats, snap = await _order_stats("customers")
             
-            if customers_resp.status_code == 200 and orders_resp.status_code == 200:
-                customers = customers_resp.json()
-                orders = orders_resp.json()
+            if stats is not None:
+                customers = snap.customers
+                customer_totals = stats.customer_totals
                 
-                # Calcular total gastado por cliente
-                customer_totals = {}
-                for order in orders:
-                    customer_id = order.get('customerId')
-                    if customer_id:
-                        if customer_id not in customer_totals:
-                            customer_totals[customer_id] = {'total': 0, 'orders': 0}
-                        customer_totals[customer_id]['total'] += order.get('totalAmount', 0)
-                        customer_totals[customer_id]['orders'] += 1
-                
-                # Crear lista de clientes con sus totales
-                customer_list = []
-                for customer in customers:
-                    cid = customer.get('_id') or customer.get('id')
-                    if cid in customer_totals:
-                        customer_list.append({
-                            'name': customer.get('name', 'N/A'),
-                            'email': customer.get('email', 'N/A'),
-                            'total': customer_totals[cid]['total'],
-                            'orders': customer_totals[cid]['orders']
-                        })
-                
-                # Ordenar por total gastado
-                customer_list.sort(key=lambda x: x['total'], reverse=True)
+                # Los 10 que más gastaron, omitiendo clientes que ya no existen
+                ranked = top_k(
+                    (
+                        (cid, totals) for cid, totals in customer_totals.items()
+                        if customers is None or snap.customer(cid) is not None
+                    ),
+                    10,
+                    key=lambda x: x[1]['total'],
+                )
                 
                 msg = "🏆 Top 10 Clientes:\n\n"
-                for i, customer in enumerate(customer_list[:10], 1):
-                    msg += f"{i}. {customer['name']}: S/ {customer['total']:.2f} ({customer['orders']} órdenes)\n"
+                for i, (cid, totals) in enumerate(ranked, 1):
+                    customer = snap.customer(cid)
+                    # Sin clientes a tiempo: mostrar el ID en lugar del nombre
+                    name = customer.get('name', 'N/A') if customer else f"Cliente {cid}"
+                    msg += f"{i}. {name}: S/ {totals['total']:.2f} ({totals['orders']} órdenes)\n"
+                
+                if customers is None:
+                    msg += PARTIAL_NOTE
                 
                 dispatcher.utter_message(text=msg)
             else:
@@ -372,44 +530,39 @@ class ActionGetBestActiveCustomer(Action):
     def name(self) -> Text:
         return "action_get_best_active_customer"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("orders", "customers"))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            customers_resp = requests.get(f"{API_BASE_URL}/customers")
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
+            # Total gastado por cliente
+            stats, snap = await _order_stats("customers")
             
-            if customers_resp.status_code == 200 and orders_resp.status_code == 200:
-                customers = customers_resp.json()
-                orders = orders_resp.json()
-                
-                # Calcular total gastado por cliente
-                customer_totals = {}
-                for order in orders:
-                    customer_id = order.get('customerId')
-                    if customer_id:
-                        if customer_id not in customer_totals:
-                            customer_totals[customer_id] = {'total': 0, 'orders': 0, 'name': ''}
-                        customer_totals[customer_id]['total'] += order.get('totalAmount', 0)
-                        customer_totals[customer_id]['orders'] += 1
-                
-                # Obtener nombres de clientes
-                customer_dict = {c.get('_id') or c.get('id'): c for c in customers}
-                for cid, data in customer_totals.items():
-                    customer = customer_dict.get(cid)
-                    if customer:
-                        data['name'] = customer.get('name', 'Cliente desconocido')
-                        data['email'] = customer.get('email', 'N/A')
+            if stats is not None:
+                customers = snap.customers
+                customer_totals = stats.customer_totals
                 
                 # Encontrar el mejor cliente activo
                 if customer_totals:
-                    best = max(customer_totals.values(), key=lambda x: x['total'])
+                    best_id, best = max(customer_totals.items(), key=lambda x: x[1]['total'])
+                    customer = snap.customer(best_id)
+                    if customer:
+                        name = customer.get('name', 'Cliente desconocido')
+                        email = customer.get('email', 'N/A')
+                    else:
+                        name, email = f"Cliente {best_id}", 'N/A'
                     msg = f"👑 **Mejor Cliente Activo:**\n\n"
-                    msg += f"Nombre: {best['name']}\n"
-                    msg += f"Email: {best.get('email', 'N/A')}\n"
+                    msg += f"Nombre: {name}\n"
+                    msg += f"Email: {email}\n"
                     msg += f"Total gastado: S/ {best['total']:.2f}\n"
                     msg += f"Órdenes: {best['orders']}"
+                    if best['last_order']:
+                        last_order = datetime.fromtimestamp(best['last_order'], LOCAL_TZ)
+                        msg += f"\nÚltima compra: {last_order:%d/%m/%Y}"
+                    if customers is None:
+                        msg += "\n" + PARTIAL_NOTE
                     
                     dispatcher.utter_message(text=msg)
                 else:
@@ -426,14 +579,14 @@ class ActionGetCustomerCount(Action):
     def name(self) -> Text:
         return "action_get_customer_count"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/customers")
-            if response.status_code == 200:
-                customers = response.json()
+            customers = await snapshot_cache.get("customers")
+            if customers is not None:
                 dispatcher.utter_message(text=f"👥 Total de clientes: {len(customers)}")
             else:
                 dispatcher.utter_message(text="❌ No pude obtener los clientes.")
@@ -447,7 +600,8 @@ class ActionSearchCustomer(Action):
     def name(self) -> Text:
         return "action_search_customer"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
@@ -455,17 +609,20 @@ class ActionSearchCustomer(Action):
         customer_email = tracker.get_slot("customer_email")
         
         try:
-            response = requests.get(f"{API_BASE_URL}/customers")
-            if response.status_code == 200:
-                customers = response.json()
-                
-                # Buscar por nombre o email
-                found = None
-                if customer_email:
-                    found = next((c for c in customers if c.get('email') == customer_email), None)
-                elif customer_name:
-                    found = next((c for c in customers if customer_name.lower() in c.get('name', '').lower()), None)
-                
+            # Por email: índice si los clientes están en caché, si no un solo cliente de la API
+            if customer_email:
+                snap = snapshot_cache.peek("customers")
+                if snap.customers is not None:
+                    found = snap.customer_by_email(customer_email)
+                else:
+                    found = await api.customer_by_email(customer_email)
+                searched = True
+            else:
+                snap = await snapshot_cache.snapshot("customers")
+                found = snap.find_customer(customer_name) if customer_name else None
+                searched = snap.customers is not None
+            
+            if searched:
                 if found:
                     dispatcher.utter_message(
                         text=f"👤 Cliente encontrado:\n"
@@ -491,14 +648,14 @@ class ActionGetProducts(Action):
     def name(self) -> Text:
         return "action_get_products"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/products")
-            if response.status_code == 200:
-                products = response.json()
+            products = await snapshot_cache.get("products")
+            if products is not None:
                 msg = f"🛍️ Productos disponibles ({len(products)}):\n\n"
                 for product in products[:10]:  # Máximo 10
                     msg += f"• {product['name']}: S/ {product['price']:.2f}\n"
@@ -516,36 +673,24 @@ class ActionGetTopProducts(Action):
     def name(self) -> Text:
         return "action_get_top_products"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("orders"))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            products_resp = requests.get(f"{API_BASE_URL}/products")
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
+            # Los nombres y precios vienen en los items, no hace falta /products
+            stats, _ = await _order_stats()
             
-            if products_resp.status_code == 200 and orders_resp.status_code == 200:
-                products = products_resp.json()
-                orders = orders_resp.json()
+            if stats is not None:
+                product_sales = stats.product_sales
                 
-                # Calcular ventas por producto
-                product_sales = {}
-                for order in orders:
-                    items = order.get('items', [])
-                    for item in items:
-                        product_name = item.get('productName', '')
-                        quantity = item.get('quantity', 0)
-                        if product_name:
-                            if product_name not in product_sales:
-                                product_sales[product_name] = {'quantity': 0, 'revenue': 0}
-                            product_sales[product_name]['quantity'] += quantity
-                            product_sales[product_name]['revenue'] += item.get('price', 0) * quantity
-                
-                # Ordenar por cantidad vendida
-                sorted_products = sorted(product_sales.items(), key=lambda x: x[1]['quantity'], reverse=True)
+                # Los 10 con más unidades vendidas
+                top_products = top_k(product_sales.items(), 10, key=lambda x: x[1]['quantity'])
                 
                 msg = "🏆 Top 10 Productos Más Vendidos:\n\n"
-                for i, (name, data) in enumerate(sorted_products[:10], 1):
+                for i, (name, data) in enumerate(top_products, 1):
                     msg += f"{i}. {name}: {data['quantity']} unidades - S/ {data['revenue']:.2f}\n"
                 
                 dispatcher.utter_message(text=msg)
@@ -561,30 +706,19 @@ class ActionGetMostSoldProduct(Action):
     def name(self) -> Text:
         return "action_get_most_sold_product"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("orders", "products"))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            products_resp = requests.get(f"{API_BASE_URL}/products")
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
+            # Ventas por producto en streaming; los precios llegan en paralelo
+            stats, snap = await _order_stats("products")
             
-            if products_resp.status_code == 200 and orders_resp.status_code == 200:
-                products = products_resp.json()
-                orders = orders_resp.json()
-                
-                # Calcular ventas por producto
-                product_sales = {}
-                for order in orders:
-                    items = order.get('items', [])
-                    for item in items:
-                        product_name = item.get('productName', '')
-                        quantity = item.get('quantity', 0)
-                        if product_name:
-                            if product_name not in product_sales:
-                                product_sales[product_name] = {'quantity': 0, 'revenue': 0}
-                            product_sales[product_name]['quantity'] += quantity
-                            product_sales[product_name]['revenue'] += item.get('price', 0) * quantity
+            if stats is not None:
+                products = snap.products
+                product_sales = stats.product_sales
                 
                 # Encontrar el producto más vendido
                 if product_sales:
@@ -593,7 +727,7 @@ class ActionGetMostSoldProduct(Action):
                     data = most_sold[1]
                     
                     # Buscar precio del producto
-                    product_info = next((p for p in products if p.get('name') == product_name), None)
+                    product_info = snap.product_by_name(product_name)
                     price = product_info.get('price', 0) if product_info else 0
                     
                     msg = f"🏆 **Producto Más Vendido:**\n\n"
@@ -603,6 +737,9 @@ class ActionGetMostSoldProduct(Action):
                     if price > 0:
                         msg += f"Precio unitario: S/ {price:.2f}"
                     
+                    if products is None:
+                        msg += "\n" + PARTIAL_NOTE
+                    
                     dispatcher.utter_message(text=msg)
                 else:
                     dispatcher.utter_message(text="❌ No hay productos vendidos aún.")
@@ -618,24 +755,21 @@ class ActionGetLowestStockProduct(Action):
     def name(self) -> Text:
         return "action_get_lowest_stock_product"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/products")
-            if response.status_code == 200:
-                products = response.json()
+            products = await snapshot_cache.get("products")
+            if products is not None:
                 
-                # Filtrar solo productos activos
-                active_products = [p for p in products if p.get('isActive', True) != False]
+                # Producto activo con menos stock (recorrido único, sin ordenar)
+                active_products = (p for p in products if p.get('isActive', True) != False)
+                lowest_products = bottom_k(active_products, 1, key=lambda x: x.get('stock', 0))
                 
-                if active_products:
-                    # Ordenar por stock (menor a mayor)
-                    sorted_products = sorted(active_products, key=lambda x: x.get('stock', 0))
-                    
-                    # Obtener el producto con menos stock
-                    lowest = sorted_products[0]
+                if lowest_products:
+                    lowest = lowest_products[0]
                     stock = lowest.get('stock', 0)
                     name = lowest.get('name', 'N/A')
                     price = lowest.get('price', 0)
@@ -665,17 +799,24 @@ class ActionGetProductStock(Action):
     def name(self) -> Text:
         return "action_get_product_stock"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         product_name = tracker.get_slot("product_name")
         
         try:
-            response = requests.get(f"{API_BASE_URL}/products")
-            if response.status_code == 200:
-                products = response.json()
-                product = next((p for p in products if product_name.lower() in p.get('name', '').lower()), None)
+            # Con los productos en caché se usa el índice (exacto y luego aproximado); si no, la API
+            snap = snapshot_cache.peek("products")
+            if snap.products is not None:
+                exact = snap.product_by_name(product_name)
+                matches = ([exact] if exact else []) + snap.search_products(product_name)
+            else:
+                matches = await api.search_products(product_name or '')
+            
+            if matches is not None:
+                product = next((p for p in matches if p and p.get('isActive', True) != False), None)
                 
                 if product:
                     stock = product.get('stock', 'N/A')
@@ -702,23 +843,20 @@ class ActionGetTotalSales(Action):
     def name(self) -> Text:
         return "action_get_total_sales"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                total_sales = sum(order.get('totalAmount', 0) for order in orders)
-                paid_orders = [o for o in orders if o.get('paymentStatus') == 'paid']
-                total_paid = sum(order.get('totalAmount', 0) for order in paid_orders)
-                
+            if await sales_aggregator.sync():
+                sales = sales_aggregator
                 dispatcher.utter_message(
                     text=f"💰 Ventas Totales:\n\n"
-                         f"Total general: S/ {total_sales:.2f}\n"
-                         f"Total pagado: S/ {total_paid:.2f}\n"
-                         f"Órdenes: {len(orders)} (Pagadas: {len(paid_orders)})"
+                         f"Total general: S/ {sales.total_amount:.2f}\n"
+                         f"Total pagado: S/ {sales.paid_amount:.2f}\n"
+                         f"Órdenes: {sales.total_count} (Pagadas: {sales.paid_count})"
                 )
             else:
                 dispatcher.utter_message(text="❌ No pude obtener las ventas.")
@@ -732,21 +870,18 @@ class ActionGetRevenue(Action):
     def name(self) -> Text:
         return "action_get_revenue"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                paid_orders = [o for o in orders if o.get('paymentStatus') == 'paid']
-                revenue = sum(order.get('totalAmount', 0) for order in paid_orders)
-                
+            if await sales_aggregator.sync():
                 dispatcher.utter_message(
                     text=f"💰 Ingresos (pagos confirmados):\n\n"
-                         f"Total: S/ {revenue:.2f}\n"
-                         f"Órdenes pagadas: {len(paid_orders)}"
+                         f"Total: S/ {sales_aggregator.paid_amount:.2f}\n"
+                         f"Órdenes pagadas: {sales_aggregator.paid_count}"
                 )
             else:
                 dispatcher.utter_message(text="❌ No pude obtener los ingresos.")
@@ -760,35 +895,66 @@ class ActionGetSalesByPeriod(Action):
     def name(self) -> Text:
         return "action_get_sales_by_period"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True, dated=True), slots=("time_period",))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
-        # Por ahora, mostrar ventas de hoy
-        dispatcher.utter_message(text="📊 Ventas del día: S/ 1,234.56 (placeholder)")
-        return []
+        period = parse_period(tracker.get_slot("time_period"))
+        if period is None:
+            dispatcher.utter_message(
+                text="🤔 No entendí el periodo. Prueba con: hoy, ayer, esta semana, "
+                     "este mes, enero, últimos 7 días o 01/03 al 15/03."
+            )
+            return [SlotSet("time_period", None)]
+        
+        try:
+            if await sales_aggregator.sync():
+                # Búsqueda en el acumulado diario: no se recorren las órdenes
+                sales = sales_aggregator.daily.between(day_number(period.start), day_number(period.end))
+                
+                msg = f"📊 Ventas {period.label}"
+                if period.start != period.end:
+                    msg += f" ({period.start:%d/%m} – {period.end:%d/%m/%Y})"
+                msg += ":\n\n"
+                msg += f"Total general: S/ {sales.total_amount:,.2f}\n"
+                msg += f"Total pagado: S/ {sales.paid_amount:,.2f}\n"
+                msg += f"Órdenes: {sales.orders} (Pagadas: {sales.paid})"
+                dispatcher.utter_message(text=msg)
+            else:
+                dispatcher.utter_message(text="❌ No pude obtener las ventas.")
+        except Exception as e:
+            dispatcher.utter_message(text=f"❌ Error: {str(e)}")
+        
+        # El periodo se usa una sola vez: la próxima consulta sin periodo es "hoy"
+        return [SlotSet("time_period", None)]
 
 
 class ActionGetAbandonedCarts(Action):
     def name(self) -> Text:
         return "action_get_abandoned_carts"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                abandoned = [o for o in orders if o.get('status') == 'pending' and o.get('paymentStatus') == 'pending']
+            # Cantidad y valor salen del agregador; de la API solo las 5 que se muestran
+            synced, page = await asyncio.gather(
+                sales_aggregator.sync(),
+                _list_orders(status='pending', payment_status='pending'),
+            )
+            if synced and page is not None:
+                abandoned = page.items
                 
-                if abandoned:
-                    total_lost = sum(order.get('totalAmount', 0) for order in abandoned)
-                    msg = f"🛒 Carritos Abandonados: {len(abandoned)}\n\n"
-                    msg += f"💰 Valor total: S/ {total_lost:.2f}\n\n"
+                if sales_aggregator.abandoned_count > 0:
+                    msg = f"🛒 Carritos Abandonados: {sales_aggregator.abandoned_count}\n\n"
+                    msg += f"💰 Valor total: S/ {sales_aggregator.abandoned_amount:.2f}\n\n"
                     
-                    for order in abandoned[:5]:
+                    for order in abandoned:
                         msg += f"• {order['orderNumber']}: S/ {order['totalAmount']:.2f}\n"
                     
                     dispatcher.utter_message(text=msg)
@@ -810,29 +976,33 @@ class ActionGetPaymentStatus(Action):
     def name(self) -> Text:
         return "action_get_payment_status"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         order_number = tracker.get_slot("order_number")
+        if not order_number:
+            dispatcher.utter_message(text="Por favor, indícame el número de orden.")
+            return []
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                order = next((o for o in orders if o.get('orderNumber') == order_number), None)
-                
-                if order:
-                    payment_status = order.get('paymentStatus', 'desconocido')
-                    dispatcher.utter_message(
-                        text=f"💳 Estado de pago de {order_number}:\n\n"
-                             f"Estado: {payment_status}\n"
-                             f"Total: S/ {order['totalAmount']:.2f}"
-                    )
-                else:
-                    dispatcher.utter_message(text=f"❌ No encontré la orden {order_number}.")
+            # Con las órdenes en caché se usa el índice; si no, se pide solo esa orden
+            snap = snapshot_cache.peek("orders")
+            if snap.orders is not None:
+                order = snap.order_by_number(order_number)
             else:
-                dispatcher.utter_message(text="❌ Error al consultar pago.")
+                order = await api.find_order(order_number)
+            
+            if order:
+                payment_status = order.get('paymentStatus', 'desconocido')
+                dispatcher.utter_message(
+                    text=f"💳 Estado de pago de {order_number}:\n\n"
+                         f"Estado: {payment_status}\n"
+                         f"Total: S/ {order['totalAmount']:.2f}"
+                )
+            else:
+                dispatcher.utter_message(text=f"❌ No encontré la orden {order_number}.")
         except Exception as e:
             dispatcher.utter_message(text=f"❌ Error: {str(e)}")
         
@@ -843,19 +1013,23 @@ class ActionGetPendingPayments(Action):
     def name(self) -> Text:
         return "action_get_pending_payments"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/payments")
-            if response.status_code == 200:
-                payments = response.json()
-                pending = [p for p in payments if p.get('status') == 'pending']
+            # Con la réplica, cantidad y suma en una consulta; si no, la lista de montos
+            totals = await sqlite_replica.payment_totals('pending') if sqlite_replica is not None else None
+            if totals is None:
+                page = await api.list_payments(status='pending', fields=('amount',))
+                if page is not None:
+                    totals = len(page.items), sum(p.get('amount', 0) for p in page.items)
+            if totals is not None:
+                count, total = totals
                 
-                if pending:
-                    total = sum(p.get('amount', 0) for p in pending)
-                    msg = f"💳 Pagos Pendientes: {len(pending)}\n\n"
+                if count:
+                    msg = f"💳 Pagos Pendientes: {count}\n\n"
                     msg += f"💰 Total: S/ {total:.2f}\n"
                     
                     dispatcher.utter_message(text=msg)
@@ -869,6 +1043,94 @@ class ActionGetPendingPayments(Action):
         return []
 
 
+# ============================================
+# ACCIONES DEL CLIENTE (WHATSAPP)
+# ============================================
+
+class ActionGetMyOrders(Action):
+    def name(self) -> Text:
+        return "action_get_my_orders"
+
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        
+        try:
+            partition = await _my_partition(dispatcher, tracker)
+            if partition is not None:
+                if partition.orders:
+                    msg = f"🧾 Tienes {len(partition.orders)} órdenes. Las más recientes:\n\n"
+                    for order in partition.orders[:5]:
+                        msg += f"• {order.order_number}: S/ {order.total_amount:.2f} - {order.status}\n"
+                    dispatcher.utter_message(text=msg)
+                else:
+                    dispatcher.utter_message(text="Todavía no tienes órdenes.")
+        except Exception as e:
+            dispatcher.utter_message(text=f"❌ Error: {str(e)}")
+        
+        return []
+
+
+class ActionGetMyPendingPayments(Action):
+    def name(self) -> Text:
+        return "action_get_my_pending_payments"
+
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        
+        try:
+            partition = await _my_partition(dispatcher, tracker)
+            if partition is not None:
+                pending = [order for order in partition.orders
+                           if order.payment_status == 'pending' and order.status != 'cancelled']
+                if pending:
+                    total = sum(order.total_amount for order in pending)
+                    msg = f"💳 Tienes {len(pending)} pagos pendientes:\n\n"
+                    for order in pending[:5]:
+                        msg += f"• {order.order_number}: S/ {order.total_amount:.2f}\n"
+                    msg += f"\n💰 Total: S/ {total:.2f}"
+                    dispatcher.utter_message(text=msg)
+                else:
+                    dispatcher.utter_message(text="✅ No tienes pagos pendientes.")
+        except Exception as e:
+            dispatcher.utter_message(text=f"❌ Error: {str(e)}")
+        
+        return []
+
+
+class ActionGetMyLastOrder(Action):
+    def name(self) -> Text:
+        return "action_get_my_last_order"
+
+    @instrumented
+    async def run(self, dispatcher: CollectingDispatcher,
+            tracker: Tracker,
+            domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
+        
+        try:
+            partition = await _my_partition(dispatcher, tracker)
+            if partition is not None:
+                if partition.orders:
+                    order = partition.orders[0]
+                    msg = f"📦 Tu última orden, {order.order_number}:\n"
+                    if order.created_epoch is not None:
+                        created = datetime.fromtimestamp(order.created_epoch, LOCAL_TZ)
+                        msg += f"Fecha: {created:%d/%m/%Y}\n"
+                    msg += (f"Estado: {order.status}\n"
+                            f"Pago: {order.payment_status}\n"
+                            f"Total: S/ {order.total_amount:.2f}")
+                    dispatcher.utter_message(text=msg)
+                else:
+                    dispatcher.utter_message(text="Todavía no tienes órdenes.")
+        except Exception as e:
+            dispatcher.utter_message(text=f"❌ Error: {str(e)}")
+        
+        return []
+
+
 # ============================================
 # ACCIONES DE MÉTRICAS
 # ============================================
@@ -877,22 +1139,23 @@ class ActionGetConversionRate(Action):
     def name(self) -> Text:
         return "action_get_conversion_rate"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                paid = [o for o in orders if o.get('paymentStatus') == 'paid']
+            if await sales_aggregator.sync():
+                paid = sales_aggregator.paid_count
+                total = sales_aggregator.total_count
                 
-                if len(orders) > 0:
-                    rate = (len(paid) / len(orders)) * 100
+                if total > 0:
+                    rate = (paid / total) * 100
                     dispatcher.utter_message(
                         text=f"📈 Tasa de Conversión:\n\n"
                              f"{rate:.1f}%\n\n"
-                             f"Pagadas: {len(paid)} / Total: {len(orders)}"
+                             f"Pagadas: {paid} / Total: {total}"
                     )
                 else:
                     dispatcher.utter_message(text="No hay datos suficientes.")
@@ -908,24 +1171,23 @@ class ActionGetAverageOrder(Action):
     def name(self) -> Text:
         return "action_get_average_order"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions(sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            response = requests.get(f"{API_BASE_URL}/orders")
-            if response.status_code == 200:
-                orders = response.json()
-                paid = [o for o in orders if o.get('paymentStatus') == 'paid']
+            if await sales_aggregator.sync():
+                paid = sales_aggregator.paid_count
                 
-                if len(paid) > 0:
-                    total = sum(order.get('totalAmount', 0) for order in paid)
-                    average = total / len(paid)
+                if paid > 0:
+                    average = sales_aggregator.paid_amount / paid
                     
                     dispatcher.utter_message(
                         text=f"💰 Ticket Promedio:\n\n"
                              f"S/ {average:.2f}\n\n"
-                             f"Basado en {len(paid)} órdenes pagadas"
+                             f"Basado en {paid} órdenes pagadas"
                     )
                 else:
                     dispatcher.utter_message(text="No hay órdenes pagadas para calcular.")
@@ -941,28 +1203,31 @@ class ActionGetDashboardSummary(Action):
     def name(self) -> Text:
         return "action_get_dashboard_summary"
 
-    def run(self, dispatcher: CollectingDispatcher,
+    @instrumented
+    @coalesced(_versions("customers", sales=True))
+    async def run(self, dispatcher: CollectingDispatcher,
             tracker: Tracker,
             domain: Dict[Text, Any]) -> List[Dict[Text, Any]]:
         
         try:
-            # Obtener datos de múltiples endpoints
-            orders_resp = requests.get(f"{API_BASE_URL}/orders")
-            customers_resp = requests.get(f"{API_BASE_URL}/customers")
+            # Totales del agregador y clientes en paralelo
+            synced, snap = await asyncio.gather(
+                sales_aggregator.sync(),
+                snapshot_cache.snapshot("customers", deadline=ACTION_DEADLINE),
+            )
+            customers = snap.customers
             
-            if orders_resp.status_code == 200 and customers_resp.status_code == 200:
-                orders = orders_resp.json()
-                customers = customers_resp.json()
-                
-                paid = [o for o in orders if o.get('paymentStatus') == 'paid']
-                total_revenue = sum(order.get('totalAmount', 0) for order in paid)
-                conversion = (len(paid) / len(orders) * 100) if len(orders) > 0 else 0
+            if synced:
+                sales = sales_aggregator
+                conversion = (sales.paid_count / sales.total_count * 100) if sales.total_count > 0 else 0
                 
                 msg = "📊 **Resumen del Dashboard**\n\n"
-                msg += f"💰 Ingresos: S/ {total_revenue:.2f}\n"
-                msg += f"📦 Órdenes: {len(orders)} (Pagadas: {len(paid)})\n"
-                msg += f"👥 Clientes: {len(customers)}\n"
+                msg += f"💰 Ingresos: S/ {sales.paid_amount:.2f}\n"
+                msg += f"📦 Órdenes: {sales.total_count} (Pagadas: {sales.paid_count})\n"
+                msg += f"👥 Clientes: {len(customers) if customers is not None else 'N/D'}\n"
                 msg += f"📈 Conversión: {conversion:.1f}%\n"
+                if customers is None:
+                    msg += PARTIAL_NOTE
                 
                 dispatcher.utter_message(text=msg)
             else:
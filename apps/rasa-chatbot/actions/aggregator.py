@@ -0,0 +1,252 @@
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Text, Tuple
+
+from .api_client import api
+from .cache import snapshot_cache
+from .config import AGGREGATOR_RECONCILE_INTERVAL, AGGREGATOR_SYNC_INTERVAL
+from .periods import local_day
+from .snapshot import Document, doc_id, parse_timestamp
+
+# Campos que necesita el agregador al pedir deltas a la API
+DELTA_FIELDS = ('_id', 'totalAmount', 'status', 'paymentStatus', 'createdAt', 'updatedAt')
+
+# (monto en céntimos, estado, estado de pago, día local de creación o None)
+Contribution = Tuple[int, Text, Text, Optional[int]]
+
+
+def _contribution(order: Document) -> Contribution:
+    cents = int(round((order.get('totalAmount') or 0) * 100))
+    created_at = parse_timestamp(order.get('createdAt'))
+    day = local_day(created_at) if created_at is not None else None
+    return cents, order.get('status') or '', order.get('paymentStatus') or '', day
+
+
+class DayTotals(NamedTuple):
+    total_cents: int = 0
+    orders: int = 0
+    paid_cents: int = 0
+    paid: int = 0
+
+    @property
+    def total_amount(self) -> float:
+        return self.total_cents / 100
+
+    @property
+    def paid_amount(self) -> float:
+        return self.paid_cents / 100
+
+
+class DailyRollup:
+    """Totales por día de creación con sumas prefijas para consultar rangos.
+
+    Los días se guardan ordenados; un rango se responde con dos búsquedas
+    binarias y una resta de sumas prefijas, sin recorrer órdenes ni días.
+    Las sumas prefijas se recalculan solo desde el primer día modificado, así
+    que agregar órdenes del día actual (el caso normal) cuesta O(1).
+    """
+
+    def __init__(self) -> None:
+        self._days: List[int] = []
+        self._totals: Dict[int, List[int]] = {}
+        # _prefix[i] = suma de los días _days[:i], válida hasta _clean
+        self._prefix: List[Tuple[int, int, int, int]] = [(0, 0, 0, 0)]
+        self._clean = 0
+
+    def add(self, day: int, cents: int, paid: bool, sign: int) -> None:
+        totals = self._totals.get(day)
+        if totals is None:
+            totals = self._totals[day] = [0, 0, 0, 0]
+            position = bisect_left(self._days, day)
+            self._days.insert(position, day)
+        else:
+            position = bisect_left(self._days, day)
+
+        totals[0] += sign * cents
+        totals[1] += sign
+        if paid:
+            totals[2] += sign * cents
+            totals[3] += sign
+        self._clean = min(self._clean, position)
+
+    def between(self, first_day: int, last_day: int) -> DayTotals:
+        """Totales de los días first_day..last_day (inclusive)."""
+        self._refresh()
+        start = bisect_left(self._days, first_day)
+        end = bisect_right(self._days, last_day)
+        if end <= start:
+            return DayTotals()
+        high, low = self._prefix[end], self._prefix[start]
+        return DayTotals(*(h - l for h, l in zip(high, low)))
+
+    def _refresh(self) -> None:
+        del self._prefix[self._clean + 1:]
+        running = self._prefix[-1]
+        for day in self._days[self._clean:]:
+            running = tuple(r + t for r, t in zip(running, self._totals[day]))
+            self._prefix.append(running)
+        self._clean = len(self._days)
+
+
+class SalesAggregator:
+    """Totales de ventas que se mantienen a partir de los cambios de órdenes.
+
+    Guarda la contribución de cada orden (monto, estado, estado de pago) y,
+    cuando llega una versión nueva de la orden, resta la anterior y suma la
+    nueva: los totales se leen en tiempo constante sin importar cuántas
+    órdenes haya. Los montos se acumulan en céntimos para que sumar y restar
+    no acumule error. Cada cierto tiempo se recalcula todo desde cero
+    (reconciliación) para corregir órdenes borradas o cambios perdidos.
+    """
+
+    def __init__(self) -> None:
+        self._contributions: Dict[Text, Contribution] = {}
+        self._watermark: Optional[Text] = None
+        self._synced_at = 0.0
+        self._reconciled_at: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+        # Cambia con cada modificación de los totales (clave de las consultas unidas)
+        self.version = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.version += 1
+        self._contributions = {}
+        self._watermark = None
+        self.daily = DailyRollup()
+        self.total_cents = 0
+        self.total_count = 0
+        self.paid_cents = 0
+        self.paid_count = 0
+        self.abandoned_cents = 0
+        self.abandoned_count = 0
+        self.status_counts: Counter = Counter()
+        self.payment_counts: Counter = Counter()
+
+    # ---------- Lectura ----------
+
+    @property
+    def total_amount(self) -> float:
+        return self.total_cents / 100
+
+    @property
+    def paid_amount(self) -> float:
+        return self.paid_cents / 100
+
+    @property
+    def abandoned_amount(self) -> float:
+        return self.abandoned_cents / 100
+
+    @property
+    def ready(self) -> bool:
+        return self._reconciled_at is not None
+
+    @property
+    def current(self) -> bool:
+        """True si los totales están al día: el próximo sync no consultaría la API."""
+        if self._reconciled_at is None or self._watermark is None:
+            return False
+        now = time.monotonic()
+        return (now - self._reconciled_at < AGGREGATOR_RECONCILE_INTERVAL
+                and now - self._synced_at < AGGREGATOR_SYNC_INTERVAL)
+
+    # ---------- Escritura ----------
+
+    def apply(self, order: Document) -> None:
+        """Incorpora una orden nueva o la versión modificada de una existente.
+
+        Es para las escrituras del propio bot (la respuesta de un PUT): no
+        mueve la marca de agua, así el próximo delta sigue trayendo lo que
+        otros clientes cambiaron desde la última sincronización.
+        """
+        order_id = doc_id(order)
+        if not order_id:
+            return
+
+        previous = self._contributions.get(order_id)
+        if previous is not None:
+            self._add(previous, -1)
+        contribution = _contribution(order)
+        self._add(contribution, 1)
+        self._contributions[order_id] = contribution
+
+    def _ingest(self, order: Document) -> None:
+        # Orden leída de la API (delta o carga completa): avanza la marca de agua
+        self.apply(order)
+        updated_at = order.get('updatedAt')
+        if updated_at and (self._watermark is None or updated_at > self._watermark):
+            self._watermark = updated_at
+
+    def remove(self, order_id: Text) -> None:
+        previous = self._contributions.pop(order_id, None)
+        if previous is not None:
+            self._add(previous, -1)
+
+    def reset(self, orders: Iterable[Document]) -> None:
+        """Recalcula todos los totales desde cero (reconciliación)."""
+        self._clear()
+        for order in orders:
+            self._ingest(order)
+        self._reconciled_at = self._synced_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Fuerza a recalcular todo desde cero en el próximo sync."""
+        self._reconciled_at = None
+
+    def _add(self, contribution: Contribution, sign: int) -> None:
+        cents, status, payment_status, day = contribution
+        self.version += 1
+        self.total_cents += sign * cents
+        self.total_count += sign
+        self.status_counts[status] += sign
+        self.payment_counts[payment_status] += sign
+        if day is not None:
+            self.daily.add(day, cents, payment_status == 'paid', sign)
+        if payment_status == 'paid':
+            self.paid_cents += sign * cents
+            self.paid_count += sign
+        if status == 'pending' and payment_status == 'pending':
+            self.abandoned_cents += sign * cents
+            self.abandoned_count += sign
+
+    # ---------- Sincronización ----------
+
+    async def sync(self) -> bool:
+        """Pone al día los totales; devuelve False si no hay datos disponibles."""
+        async with self._sync_lock:
+            now = time.monotonic()
+            needs_reconcile = (
+                self._reconciled_at is None
+                or self._watermark is None
+                or now - self._reconciled_at >= AGGREGATOR_RECONCILE_INTERVAL
+            )
+
+            if needs_reconcile:
+                if not await self._reconcile():
+                    return self.ready
+            elif now - self._synced_at >= AGGREGATOR_SYNC_INTERVAL:
+                # Solo las órdenes creadas o modificadas desde la última vista
+                page = await api.list_orders(updated_since=self._watermark, fields=DELTA_FIELDS)
+                if page is not None:
+                    for order in page.items:
+                        self._ingest(order)
+                    self._synced_at = now
+
+            return True
+
+    async def _reconcile(self) -> bool:
+        # Las órdenes se recorren en streaming: no hace falta tener la lista completa
+        async with snapshot_cache.stream("orders") as orders:
+            if orders is None:
+                return False
+            self._clear()
+            self._reconciled_at = None  # si falla a mitad, la próxima vez se reintenta
+            async for order in orders:
+                self._ingest(order)
+        self._reconciled_at = self._synced_at = time.monotonic()
+        return True
+
+
+sales_aggregator = SalesAggregator()
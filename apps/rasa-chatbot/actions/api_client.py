@@ -0,0 +1,129 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Text
+
+from . import http_client
+
+Document = Dict[Text, Any]
+
+# Lo que devuelven los métodos que lo aceptan (not_found=) cuando la API
+# responde 404, para distinguirlo de una falla (None)
+NOT_FOUND = object()
+
+
+class Page:
+    """Una página de resultados y el total de documentos que cumplen el filtro."""
+
+    __slots__ = ("items", "total")
+
+    def __init__(self, items: List[Document], total: int):
+        self.items = items
+        self.total = total
+
+
+def _params(**params: Any) -> Dict[Text, Text]:
+    # aiohttp no acepta None: se omiten los filtros no indicados
+    result = {}
+    for key, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ",".join(value)
+        result[key] = str(value)
+    return result
+
+
+class ApiClient:
+    """Cliente tipado de la API para las acciones.
+
+    Usa los endpoints específicos (/orders/:id, /orders/customer/:id,
+    /customers/phone/:phone, /products/search) y los filtros, la paginación
+    y la proyección por query string, de modo que el tamaño de la respuesta
+    depende de la pregunta y no del tamaño de la base de datos. Todos los
+    métodos devuelven None si la API no responde 200; los que aceptan
+    not_found= devuelven ese valor en un 404 (no existe, no es una falla).
+    """
+
+    # ---------- Órdenes ----------
+
+    async def list_orders(self, status: Optional[Text] = None,
+                          payment_status: Optional[Text] = None,
+                          order_number: Optional[Text] = None,
+                          customer_id: Optional[Text] = None,
+                          updated_since: Optional[Text] = None,
+                          limit: Optional[int] = None,
+                          skip: Optional[int] = None,
+                          sort: Optional[Text] = None,
+                          fields: Optional[Sequence[Text]] = None) -> Optional[Page]:
+        params = _params(status=status, paymentStatus=payment_status, orderNumber=order_number,
+                         customerId=customer_id, updatedSince=updated_since,
+                         limit=limit, skip=skip, sort=sort, fields=fields)
+        return await self._page("/orders", params)
+
+    async def get_order(self, order_id: Text) -> Optional[Document]:
+        return await self._document(f"/orders/{order_id}")
+
+    async def find_order(self, order_number: Text) -> Optional[Document]:
+        page = await self.list_orders(order_number=order_number, limit=1)
+        return page.items[0] if page and page.items else None
+
+    async def orders_by_customer(self, customer_id: Text) -> Optional[List[Document]]:
+        return await self._document(f"/orders/customer/{customer_id}")
+
+    async def update_order(self, order_id: Text, **fields: Any) -> Optional[Document]:
+        response = await http_client.put(f"/orders/{order_id}", json=fields)
+        return response.json() if response.status_code == 200 else None
+
+    async def delete_order(self, order_id: Text) -> bool:
+        response = await http_client.delete(f"/orders/{order_id}")
+        return response.status_code == 200
+
+    # ---------- Clientes ----------
+
+    async def get_customer(self, customer_id: Text) -> Optional[Document]:
+        return await self._document(f"/customers/{customer_id}")
+
+    async def customer_by_phone(self, phone: Text, not_found: Any = None) -> Any:
+        return await self._document(f"/customers/phone/{phone}", not_found=not_found)
+
+    async def customer_by_email(self, email: Text) -> Optional[Document]:
+        customers = await self._document("/customers", _params(email=email))
+        return customers[0] if customers else None
+
+    # ---------- Productos ----------
+
+    async def search_products(self, name: Text) -> Optional[List[Document]]:
+        # La API usa el texto como regex: se escapa para buscarlo literal
+        return await self._document("/products/search", _params(q=re.escape(name)))
+
+    # ---------- Pagos ----------
+
+    async def list_payments(self, status: Optional[Text] = None,
+                            order_id: Optional[Text] = None,
+                            updated_since: Optional[Text] = None,
+                            limit: Optional[int] = None,
+                            skip: Optional[int] = None,
+                            sort: Optional[Text] = None,
+                            fields: Optional[Sequence[Text]] = None) -> Optional[Page]:
+        params = _params(status=status, orderId=order_id, updatedSince=updated_since,
+                         limit=limit, skip=skip, sort=sort, fields=fields)
+        return await self._page("/payments", params)
+
+    # ---------- Internos ----------
+
+    async def _document(self, path: Text, params: Optional[Dict[Text, Text]] = None, not_found: Any = None) -> Any:
+        response = await http_client.get(path, params=params)
+        if response.status_code == 404:
+            return not_found
+        return response.json() if response.status_code == 200 else None
+
+    async def _page(self, path: Text, params: Dict[Text, Text]) -> Optional[Page]:
+        response = await http_client.get(path, params=params)
+        if response.status_code != 200:
+            return None
+        items = response.json()
+        # Sin limit la API no envía el total: es la lista completa
+        total = int(response.headers.get("X-Total-Count", len(items)))
+        return Page(items, total)
+
+
+api = ApiClient()
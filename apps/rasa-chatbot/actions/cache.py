@@ -0,0 +1,481 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Text
+
+from . import http_client, metrics
+from .config import (CACHE_DELTA_COLLECTIONS, CACHE_FULL_SYNC_INTERVAL, CACHE_MAX_BYTES, CACHE_STALE_GRACE,
+                     CACHE_TTL, STREAM_CHUNK_SIZE)
+from .records import decode, dumps, to_record
+from .snapshot import Snapshot, doc_id
+from .streaming import iter_json_array
+
+logger = logging.getLogger(__name__)
+
+# Registros de actions.records (dicts si la colección no tiene registro)
+Collection = List[Any]
+
+
+class CacheEntry:
+    """Una colección descargada, con lo necesario para revalidarla.
+
+    etag / last_modified son los validadores de la última descarga completa
+    (para pedirla condicional: 304 si no cambió), watermark es el updatedAt
+    más reciente de los datos (para pedir solo los cambios) y full_at el
+    momento de la última descarga completa.
+    """
+
+    __slots__ = ("data", "nbytes", "expires_at", "version", "etag", "last_modified", "watermark", "full_at",
+                 "_derived", "_deriving")
+
+    def __init__(self, data: Collection, nbytes: int, expires_at: float, version: int,
+                 etag: Optional[Text] = None, last_modified: Optional[Text] = None,
+                 watermark: Optional[Text] = None, full_at: float = 0.0):
+        self.data = data
+        self.nbytes = nbytes
+        self.expires_at = expires_at
+        self.version = version
+        self.etag = etag
+        self.last_modified = last_modified
+        self.watermark = watermark
+        self.full_at = full_at
+        self._derived: Dict[Text, Any] = {}
+        self._deriving: Dict[Text, "asyncio.Future[Any]"] = {}
+
+    def derive(self, key: Text, builder: Callable[[], Any]) -> Any:
+        """Calcula (una sola vez por versión de los datos) un derivado: índices, agregados..."""
+        if key not in self._derived:
+            self._derived[key] = builder()
+        return self._derived[key]
+
+    async def derive_async(self, key: Text, run: Callable[..., Awaitable[Any]],
+                           builder: Callable[..., Any], *args: Any) -> Any:
+        """Como derive, pero el cálculo lo hace `run(builder, *args)` (p. ej. en
+        el pool de cálculo). Las llamadas concurrentes esperan el mismo cálculo."""
+        if key in self._derived:
+            return self._derived[key]
+        pending = self._deriving.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(run(builder, *args))
+            self._deriving[key] = pending
+            pending.add_done_callback(lambda f: self._derived_done(key, f))
+        # shield: si esta acción se cancela, el cálculo sigue para las demás
+        return await asyncio.shield(pending)
+
+    def _derived_done(self, key: Text, future: "asyncio.Future[Any]") -> None:
+        self._deriving.pop(key, None)
+        if not future.cancelled() and future.exception() is None:
+            self._derived.setdefault(key, future.result())
+
+    def derived(self, key: Text) -> Optional[Any]:
+        return self._derived.get(key)
+
+    def carry(self, entry: "CacheEntry") -> None:
+        """Pasa a `entry` (la versión siguiente de la colección) los derivados
+        incrementales de esta: los que tienen updated(cambiados, borrados),
+        como los índices de búsqueda, reciben solo los documentos que
+        cambiaron en lugar de construirse de nuevo. Se actualizan en el lugar:
+        los Snapshot anteriores también ven los documentos nuevos."""
+        incremental = {key: value for key, value in self._derived.items() if hasattr(value, "updated")}
+        if not incremental:
+            return
+        before = {doc_id(doc): doc for doc in self.data}
+        changed = []
+        for doc in entry.data:
+            old = before.pop(doc_id(doc), None)
+            if old is not doc and old != doc:
+                changed.append(doc)
+        for key, value in incremental.items():
+            entry._derived.setdefault(key, value.updated(changed, list(before)))
+
+    def renewed(self, expires_at: float, full_at: Optional[float] = None) -> "CacheEntry":
+        """La misma versión con un nuevo vencimiento; conserva los derivados ya calculados."""
+        entry = CacheEntry(self.data, self.nbytes, expires_at, self.version, self.etag, self.last_modified,
+                           self.watermark, self.full_at if full_at is None else full_at)
+        entry._derived = self._derived
+        entry._deriving = self._deriving
+        return entry
+
+
+class SnapshotCache:
+    """Caché en memoria de las colecciones completas de la API.
+
+    Cada colección (/orders, /customers, /products, /payments) tiene su
+    propio TTL, el total de bytes guardados está limitado (se descarta la
+    colección usada hace más tiempo) y, si varias acciones piden a la vez
+    una colección vencida, solo una la descarga y las demás la esperan. Los
+    documentos se guardan como registros compactos (actions.records).
+
+    Al vencer, una colección se revalida en lugar de descargarse entera: se
+    pide condicional (ETag / If-Modified-Since, 304 si no cambió) y, para las
+    colecciones de `delta_collections`, solo los documentos modificados desde
+    su updatedAt más reciente, que se combinan por _id con los que ya estaban.
+    Cada `full_sync_interval` segundos se vuelve a la descarga completa
+    (también condicional) para enterarse de los documentos borrados.
+
+    Durante `stale_grace` segundos después de vencer, una colección se sigue
+    sirviendo mientras se descarga la nueva en segundo plano
+    (stale-while-revalidate): ninguna acción espera una descarga completa
+    salvo que la colección no esté en caché o lleve demasiado tiempo vencida.
+    """
+
+    def __init__(self, fetcher: Callable[..., Awaitable[http_client.ApiResponse]],
+                 ttl: Dict[Text, float], max_bytes: int,
+                 streamer: Optional[Callable[[Text], AsyncContextManager[Any]]] = None,
+                 stale_grace: float = 0, delta_collections: Optional[List[Text]] = None,
+                 full_sync_interval: float = 0):
+        self._fetcher = fetcher
+        self._streamer = streamer
+        self._ttl = dict(ttl)
+        self._max_bytes = max_bytes
+        self._stale_grace = stale_grace
+        self._delta_collections = set(delta_collections or ())
+        self._full_sync_interval = full_sync_interval
+        self._entries: "OrderedDict[Text, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight: Dict[Text, "asyncio.Future[Optional[CacheEntry]]"] = {}
+        self._generations: Dict[Text, int] = {}
+        self._versions: Dict[Text, int] = {}
+        self._source: Optional[Callable[[Text], Optional[CacheEntry]]] = None
+        self._bypassed: Dict[Text, CacheEntry] = {}
+
+    def attach(self, source: Optional[Callable[[Text], Optional[CacheEntry]]]) -> None:
+        """Consulta primero `source` (p. ej. el snapshot compartido entre workers).
+
+        Las colecciones para las que devuelve una entrada se sirven desde ahí
+        sin pasar por la API; las demás siguen el camino normal de la caché.
+        Tras invalidate() una colección deja de leerse de `source` hasta que
+        este entregue otra entrada (una versión publicada después).
+        """
+        self._source = source
+
+    async def get(self, collection: Text) -> Optional[Collection]:
+        """Devuelve la colección (desde caché o la API) o None si la API falla."""
+        entry = await self._get_entry(collection)
+        return entry.data if entry is not None else None
+
+    async def snapshot(self, *collections: Text, deadline: Optional[float] = None) -> Snapshot:
+        """Obtiene varias colecciones en paralelo y las devuelve indexadas.
+
+        Termina cuando llegan todas, cuando la primera falla o cuando vence
+        el plazo; las colecciones que no llegaron quedan en None para que la
+        acción responda de forma parcial en lugar de quedarse esperando.
+        """
+        entries: Dict[Text, Optional[CacheEntry]] = dict.fromkeys(collections)
+        tasks = {asyncio.ensure_future(self._get_entry(name)): name for name in collections}
+        pending = set(tasks)
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline is not None else None
+
+        try:
+            while pending:
+                timeout = None if deadline_at is None else max(0.0, deadline_at - loop.time())
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break  # plazo vencido
+
+                failed = False
+                for task in done:
+                    entries[tasks[task]] = task.result()
+                    failed = failed or entries[tasks[task]] is None
+                if failed:
+                    break
+        finally:
+            # Las descargas canceladas siguen en segundo plano y llenan la caché
+            for task in pending:
+                task.cancel()
+
+        return Snapshot(entries)
+
+    @asynccontextmanager
+    async def stream(self, collection: Text) -> AsyncIterator[Optional[AsyncIterator[Dict[Text, Any]]]]:
+        """Recorre la colección documento por documento, o None si la API falla.
+
+        Si está en caché se recorre la lista guardada. Si no, la respuesta se
+        parsea a medida que llega en lugar de cargarla entera: solo se guarda
+        en caché si su tamaño (Content-Length) entra en el límite, así que las
+        colecciones grandes se procesan con memoria constante.
+
+            async with snapshot_cache.stream("orders") as orders:
+                if orders is not None:
+                    async for order in orders:
+                        ...
+        """
+        # En caché, o ya descargándose para otra acción: se usa esa lista
+        if self._streamer is None or collection in self._inflight or self._fresh_entry(collection):
+            entry = await self._get_entry(collection)
+            yield _iterate(entry.data) if entry is not None else None
+            return
+
+        generation = self._generations.get(collection, 0)
+        async with self._streamer(collection) as response:
+            if response.status != 200:
+                yield None
+                return
+            yield self._ingest(collection, response, generation)
+
+    def load(self, collection: Text, entry: CacheEntry) -> None:
+        """Pone en caché una entrada obtenida por otro medio (p. ej. restaurada
+        de disco). Las versiones que asigne la caché después siguen a la suya."""
+        with self._lock:
+            self._versions[collection] = max(self._versions.get(collection, 0), entry.version)
+        self._store(collection, entry, self._generations.get(collection, 0))
+
+    def peek(self, *collections: Text) -> Snapshot:
+        """Snapshot de lo que ya está en caché, sin descargar nada."""
+        return Snapshot({name: self._fresh_entry(name) for name in collections})
+
+    async def refresh(self, collection: Text) -> Optional[CacheEntry]:
+        """Vuelve a descargar la colección aunque siga vigente.
+
+        La entrada anterior se sigue sirviendo hasta que llega la nueva, que
+        la reemplaza de una sola vez; los Snapshot ya entregados conservan la
+        versión con la que se crearon.
+        """
+        return await asyncio.shield(self._start_fetch(collection))
+
+    def expires_in(self, collection: Text) -> Optional[float]:
+        """Segundos que le quedan de vigencia a la colección (None si no está en caché)."""
+        with self._lock:
+            entry = self._entries.get(collection)
+            return entry.expires_at - time.monotonic() if entry is not None else None
+
+    async def _get_entry(self, collection: Text) -> Optional[CacheEntry]:
+        entry = self._fresh_entry(collection)
+        if entry:
+            return entry
+
+        # Si otra acción ya la está descargando, esperamos esa misma descarga
+        inflight = self._start_fetch(collection)
+
+        # shield: si esta acción se cancela, la descarga sigue para las demás
+        with metrics.http_span():
+            entry = await asyncio.shield(inflight)
+        if entry is not None:
+            metrics.record_http(entry.nbytes)
+        return entry
+
+    def invalidate(self, *collections: Text) -> None:
+        """Descarta las colecciones indicadas (todas si no se indica ninguna)."""
+        with self._lock:
+            names = collections or tuple(self._entries)
+            for name in names:
+                # Lo compartido ya no refleja la escritura que motivó invalidar
+                shared = self._source(name) if self._source is not None else None
+                if shared is not None:
+                    self._bypassed[name] = shared
+                self._entries.pop(name, None)
+                self._inflight.pop(name, None)
+                self._generations[name] = self._generations.get(name, 0) + 1
+
+    def _start_fetch(self, collection: Text) -> "asyncio.Future[Optional[CacheEntry]]":
+        inflight = self._inflight.get(collection)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch(collection))
+            self._inflight[collection] = inflight
+            inflight.add_done_callback(lambda f: self._forget(collection, f))
+        return inflight
+
+    def _fresh_entry(self, collection: Text) -> Optional[CacheEntry]:
+        if self._source is not None:
+            shared = self._source(collection)
+            if shared is not None and shared is not self._bypassed.get(collection):
+                if self._bypassed.pop(collection, None) is not None:
+                    # Ya hay una versión publicada después: sobra la copia propia
+                    with self._lock:
+                        self._entries.pop(collection, None)
+                return shared
+
+        with self._lock:
+            entry = self._entries.get(collection)
+            if entry is None:
+                return None
+            now = time.monotonic()
+            stale = entry.expires_at <= now
+            if stale and entry.expires_at + self._stale_grace <= now:
+                # No se sirve, pero se conserva para revalidarla (304 / deltas)
+                return None
+            self._entries.move_to_end(collection)
+
+        if stale:
+            self._revalidate(collection)
+        return entry
+
+    def _revalidate(self, collection: Text) -> None:
+        # Fuera de un event loop (p. ej. desde otro hilo) se sirve la vencida sin más
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if collection not in self._inflight:
+            self._start_fetch(collection).add_done_callback(lambda f: _log_failure(collection, f))
+
+    async def _fetch(self, collection: Text) -> Optional[CacheEntry]:
+        # Corre en su propia tarea: cada acción que la espera la mide en _get_entry
+        metrics.detach()
+        generation = self._generations.get(collection, 0)
+        with self._lock:
+            # Aunque esté vencida, sirve para revalidar en lugar de descargar todo
+            previous = self._entries.get(collection)
+
+        entry = None
+        if previous is not None and self._wants_delta(collection, previous):
+            entry = await self._fetch_delta(collection, previous)
+        if entry is None:
+            entry = await self._fetch_full(collection, previous)
+        if entry is not None:
+            if previous is not None and entry.version != previous.version:
+                previous.carry(entry)
+            self._store(collection, entry, generation)
+        return entry
+
+    def _wants_delta(self, collection: Text, previous: CacheEntry) -> bool:
+        return (
+            collection in self._delta_collections
+            and previous.watermark is not None
+            and time.monotonic() - previous.full_at < self._full_sync_interval
+        )
+
+    async def _fetch_full(self, collection: Text, previous: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        headers = {}
+        if previous is not None:
+            if previous.etag:
+                headers["If-None-Match"] = previous.etag
+            if previous.last_modified:
+                headers["If-Modified-Since"] = previous.last_modified
+
+        response = await self._fetcher(collection, headers=headers or None)
+        if response.status_code == 304 and previous is not None:
+            now = time.monotonic()
+            return previous.renewed(now + self._ttl.get(collection, 0), full_at=now)
+        if response.status_code != 200:
+            return None
+        with metrics.phase("decode"):
+            data = decode(collection, response.content)
+        return self._new_entry(collection, data, len(response.content), response.headers)
+
+    async def _fetch_delta(self, collection: Text, previous: CacheEntry) -> Optional[CacheEntry]:
+        """Pide solo lo modificado desde el watermark y lo combina por _id (None si falla)."""
+        response = await self._fetcher(collection, params={"updatedSince": previous.watermark})
+        if response.status_code != 200:
+            return None
+
+        # updatedSince es inclusivo: los documentos del watermark vuelven sin cambios
+        positions = previous.derive("_positions", lambda: {doc_id(doc): i for i, doc in enumerate(previous.data)})
+        changed = []
+        with metrics.phase("decode"):
+            docs = decode(collection, response.content)
+        for doc in docs:
+            position = positions.get(doc_id(doc))
+            if position is None or previous.data[position].get("updatedAt") != doc.get("updatedAt"):
+                changed.append((position, doc))
+
+        expires_at = time.monotonic() + self._ttl.get(collection, 0)
+        if not changed:
+            return previous.renewed(expires_at)
+
+        # Lista nueva: los Snapshot ya entregados siguen viendo la anterior.
+        # El tamaño se corrige solo por los documentos que cambiaron: el de
+        # cada uno en JSON reemplaza al de su versión anterior
+        data = list(previous.data)
+        nbytes = previous.nbytes
+        for position, doc in changed:
+            nbytes += len(dumps(doc))
+            if position is None:
+                data.append(doc)
+            else:
+                nbytes -= len(dumps(data[position]))
+                data[position] = doc
+
+        entry = self._new_entry(collection, data, max(nbytes, 0))
+        entry.etag, entry.last_modified, entry.full_at = previous.etag, previous.last_modified, previous.full_at
+        return entry
+
+    async def _ingest(self, collection: Text, response: Any, generation: int) -> AsyncIterator[Dict[Text, Any]]:
+        nbytes = response.content_length
+        # Solo se acumula la lista si luego va a poder guardarse en caché
+        keep = nbytes is not None and self.cacheable(collection, nbytes)
+        docs: Collection = []
+
+        async for doc in iter_json_array(metrics.timed_chunks(response.content.iter_chunked(STREAM_CHUNK_SIZE))):
+            doc = to_record(collection, doc)
+            if keep:
+                docs.append(doc)
+            yield doc
+
+        if keep:
+            self._store(collection, self._new_entry(collection, docs, nbytes, response.headers), generation)
+
+    def _new_entry(self, collection: Text, data: Collection, nbytes: int,
+                   headers: Optional[Mapping[Text, Text]] = None) -> CacheEntry:
+        """Entrada con una versión nueva; con `headers` es una descarga completa."""
+        with self._lock:
+            version = self._versions.get(collection, 0) + 1
+            self._versions[collection] = version
+
+        now = time.monotonic()
+        entry = CacheEntry(data, nbytes, now + self._ttl.get(collection, 0), version)
+        if collection in self._delta_collections:
+            # Las fechas ISO en UTC de la API se comparan bien como texto
+            entry.watermark = max((doc.get("updatedAt") or "" for doc in data), default="") or None
+        if headers is not None:
+            entry.etag = headers.get("ETag")
+            entry.last_modified = headers.get("Last-Modified")
+            entry.full_at = now
+        return entry
+
+    def cacheable(self, collection: Text, nbytes: int) -> bool:
+        """Si una respuesta de `nbytes` de la colección puede guardarse en caché."""
+        return self._ttl.get(collection, 0) > 0 and nbytes <= self._max_bytes
+
+    def _forget(self, collection: Text, future: "asyncio.Future[Optional[CacheEntry]]") -> None:
+        if self._inflight.get(collection) is future:
+            del self._inflight[collection]
+
+    def _store(self, collection: Text, entry: CacheEntry, generation: int) -> None:
+        # Sin TTL o demasiado grande: se usa solo para esta respuesta
+        if not self.cacheable(collection, entry.nbytes):
+            return
+
+        with self._lock:
+            # Si se invalidó durante la descarga, la respuesta ya no es confiable
+            if self._generations.get(collection, 0) != generation:
+                return
+
+            self._entries.pop(collection, None)
+            self._entries[collection] = entry
+
+            # Liberar las colecciones menos usadas hasta respetar el límite
+            total = sum(e.nbytes for e in self._entries.values())
+            while total > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                total -= evicted.nbytes
+
+
+def _log_failure(collection: Text, future: "asyncio.Future[Optional[CacheEntry]]") -> None:
+    # Nadie espera una revalidación en segundo plano: el error solo se registra
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("No se pudo revalidar %s: %s", collection, future.exception())
+
+
+async def _iterate(docs: Collection) -> AsyncIterator[Dict[Text, Any]]:
+    for doc in docs:
+        yield doc
+
+
+async def _fetch_collection(collection: Text, params: Optional[Dict[Text, Text]] = None,
+                            headers: Optional[Dict[Text, Text]] = None) -> http_client.ApiResponse:
+    return await http_client.get(f"/{collection}", params=params, headers=headers)
+
+
+def _stream_collection(collection: Text) -> AsyncContextManager[Any]:
+    return http_client.stream(f"/{collection}")
+
+
+snapshot_cache = SnapshotCache(_fetch_collection, CACHE_TTL, CACHE_MAX_BYTES, _stream_collection,
+                               stale_grace=CACHE_STALE_GRACE, delta_collections=CACHE_DELTA_COLLECTIONS,
+                               full_sync_interval=CACHE_FULL_SYNC_INTERVAL)
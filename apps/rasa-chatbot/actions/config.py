@@ -0,0 +1,218 @@
+import os
+
+# Configuración de la API
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:3000/api")
+
+# Diferencia horaria del negocio respecto a UTC (Perú: -5, sin horario de verano).
+# Define a qué día pertenece cada orden en los reportes por periodo.
+UTC_OFFSET_HOURS = float(os.getenv("ACTIONS_UTC_OFFSET_HOURS", "-5"))
+
+# ============================================
+# CACHÉ DE COLECCIONES
+# ============================================
+
+# Segundos que vive cada colección en caché (0 desactiva la caché)
+CACHE_TTL = {
+    "orders": float(os.getenv("ACTIONS_CACHE_TTL_ORDERS", "30")),
+    "customers": float(os.getenv("ACTIONS_CACHE_TTL_CUSTOMERS", "120")),
+    "products": float(os.getenv("ACTIONS_CACHE_TTL_PRODUCTS", "300")),
+    "payments": float(os.getenv("ACTIONS_CACHE_TTL_PAYMENTS", "30")),
+}
+
+# Límite total de memoria (bytes de las respuestas) que puede ocupar la caché
+CACHE_MAX_BYTES = int(os.getenv("ACTIONS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Segundos que una colección vencida se sigue sirviendo mientras se descarga
+# la nueva en segundo plano (0: al vencer, la acción espera la descarga)
+CACHE_STALE_GRACE = float(os.getenv("ACTIONS_CACHE_STALE_GRACE", "60"))
+
+# Colecciones que al vencer piden solo los documentos modificados
+# (?updatedSince=) en lugar de descargarse completas
+CACHE_DELTA_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("ACTIONS_CACHE_DELTA_COLLECTIONS", "orders,payments").split(",")
+    if name.strip()
+]
+
+# Cada cuántos segundos una colección con deltas se vuelve a pedir completa
+# (condicional: 304 si no cambió) para enterarse de los documentos borrados
+CACHE_FULL_SYNC_INTERVAL = float(os.getenv("ACTIONS_CACHE_FULL_SYNC_INTERVAL", "600"))
+
+# Refresco en segundo plano: vuelve a descargar las colecciones antes de que
+# venzan, así ninguna acción espera una descarga completa ("1" lo activa)
+REFRESH_ENABLED = os.getenv("ACTIONS_REFRESH", "0") == "1"
+
+# Colecciones que mantiene al día el refresco en segundo plano
+REFRESH_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("ACTIONS_REFRESH_COLLECTIONS", "orders,customers,products,payments").split(",")
+    if name.strip()
+]
+
+# Cada cuántos segundos revisa el refresco qué colecciones están por vencer
+REFRESH_INTERVAL = float(os.getenv("ACTIONS_REFRESH_INTERVAL", "5"))
+
+# Segundos sin acciones tras los cuales el refresco deja de descargar hasta
+# la próxima acción ("0": refresca aunque no haya conversaciones)
+REFRESH_IDLE_AFTER = float(os.getenv("ACTIONS_REFRESH_IDLE_AFTER", "300"))
+
+# ============================================
+# CLIENTE HTTP
+# ============================================
+
+# Conexiones simultáneas máximas hacia la API (keep-alive compartido)
+HTTP_POOL_SIZE = int(os.getenv("ACTIONS_HTTP_POOL_SIZE", "32"))
+
+# Segundos que una conexión ociosa se mantiene abierta para reutilizarla
+HTTP_KEEPALIVE = float(os.getenv("ACTIONS_HTTP_KEEPALIVE", "30"))
+
+# Tiempo máximo (segundos) por petición a la API
+HTTP_TIMEOUT = float(os.getenv("ACTIONS_HTTP_TIMEOUT", "10"))
+
+# Tamaño (bytes) de cada pedazo que se lee al recorrer una respuesta en streaming
+STREAM_CHUNK_SIZE = int(os.getenv("ACTIONS_STREAM_CHUNK_SIZE", str(64 * 1024)))
+
+# Tiempo máximo (segundos) que una acción espera sus datos antes de
+# responder con lo que tenga (respuesta parcial)
+ACTION_DEADLINE = float(os.getenv("ACTIONS_DEADLINE", "5"))
+
+# ============================================
+# AGREGADOR DE VENTAS
+# ============================================
+
+# Cada cuántos segundos se piden las órdenes modificadas (delta)
+AGGREGATOR_SYNC_INTERVAL = float(os.getenv("ACTIONS_AGGREGATOR_SYNC_INTERVAL", "5"))
+
+# Cada cuántos segundos se recalculan los totales desde cero
+AGGREGATOR_RECONCILE_INTERVAL = float(os.getenv("ACTIONS_AGGREGATOR_RECONCILE_INTERVAL", "600"))
+
+# ============================================
+# RÉPLICA SQLITE
+# ============================================
+
+# Réplica de órdenes y pagos en SQLite para los listados con filtros:
+# ruta del archivo (sobrevive reinicios), ":memory:" o vacío (desactivada)
+SQLITE_REPLICA = os.getenv("ACTIONS_SQLITE_REPLICA", "")
+
+# Cada cuántos segundos se aplican a la réplica los documentos modificados (delta)
+SQLITE_SYNC_INTERVAL = float(os.getenv("ACTIONS_SQLITE_SYNC_INTERVAL", "5"))
+
+# Cada cuántos segundos se vuelve a cargar completa (borrados, cambios perdidos)
+SQLITE_RECONCILE_INTERVAL = float(os.getenv("ACTIONS_SQLITE_RECONCILE_INTERVAL", "3600"))
+
+# ============================================
+# ÓRDENES POR CLIENTE (WHATSAPP)
+# ============================================
+
+# Remitentes cuyas órdenes se guardan en memoria para "mis órdenes"; al
+# superarlos sale el que lleva más tiempo sin preguntar
+CUSTOMER_SCOPE_MAX_ENTRIES = int(os.getenv("ACTIONS_CUSTOMER_SCOPE_MAX_ENTRIES", "1000"))
+
+# Segundos que se reutilizan las órdenes de un remitente antes de volver a
+# pedirlas a la API (0 desactiva la caché)
+CUSTOMER_SCOPE_TTL = float(os.getenv("ACTIONS_CUSTOMER_SCOPE_TTL", "30"))
+
+# Código de país que WhatsApp antepone al número del remitente y que los
+# teléfonos registrados pueden no llevar (Perú: 51)
+CUSTOMER_PHONE_COUNTRY_CODE = os.getenv("ACTIONS_CUSTOMER_PHONE_COUNTRY_CODE", "51")
+
+# ============================================
+# CÁLCULOS PESADOS
+# ============================================
+
+# Dónde corren las agregaciones de ranking: "thread" (pool de hilos),
+# "process" (pool de procesos) o "inline" (en el event loop, sin pool)
+COMPUTE_EXECUTOR = os.getenv("ACTIONS_COMPUTE_EXECUTOR", "thread")
+
+# Hilos o procesos del pool de cálculo. Con hilos conviene 1: los cálculos son
+# Python puro y cada hilo extra solo le disputa el GIL al event loop
+COMPUTE_WORKERS = int(os.getenv("ACTIONS_COMPUTE_WORKERS", "1"))
+
+# Cálculos que pueden esperar turno en el pool además de los que corren
+COMPUTE_QUEUE_SIZE = int(os.getenv("ACTIONS_COMPUTE_QUEUE_SIZE", "8"))
+
+# Segundos que una acción espera lugar en la cola llena antes de responder
+# que el servidor está ocupado
+COMPUTE_QUEUE_TIMEOUT = float(os.getenv("ACTIONS_COMPUTE_QUEUE_TIMEOUT", "2"))
+
+# ============================================
+# RESPUESTAS RENDERIZADAS
+# ============================================
+
+# Límite (bytes) de la caché de respuestas ya armadas de las acciones de
+# analíticas, por versión de los datos ("0" la desactiva)
+RENDER_CACHE_MAX_BYTES = int(os.getenv("ACTIONS_RENDER_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+
+# ============================================
+# MÉTRICAS
+# ============================================
+
+# Puerto del endpoint /metrics en formato Prometheus (0 lo desactiva)
+METRICS_PORT = int(os.getenv("ACTIONS_METRICS_PORT", "5056"))
+
+# Interfaz donde escucha el endpoint de métricas (solo local por defecto). Un
+# readiness probe desde fuera del contenedor debe usar GET /ready en el puerto
+# de las acciones (5055), que no depende de esta interfaz
+METRICS_HOST = os.getenv("ACTIONS_METRICS_HOST", "127.0.0.1")
+
+# Una línea de log JSON por cada ejecución de acción ("0" la desactiva)
+METRICS_LOG = os.getenv("ACTIONS_METRICS_LOG", "1") != "0"
+
+# ============================================
+# ARRANQUE EN CALIENTE
+# ============================================
+
+# Precarga las colecciones al iniciar el action server ("1" lo activa); GET
+# /ready responde 503 hasta que termina
+WARM_START = os.getenv("ACTIONS_WARM_START", "0") == "1"
+
+# Colecciones que se descargan e indexan antes de recibir tráfico
+WARM_START_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("ACTIONS_WARM_START_COLLECTIONS", "orders,customers,products").split(",")
+    if name.strip()
+]
+
+# Segundos máximos reintentando la precarga; pasado ese plazo el servidor
+# se declara listo igual y atiende en frío
+WARM_START_TIMEOUT = float(os.getenv("ACTIONS_WARM_START_TIMEOUT", "120"))
+
+# ============================================
+# SNAPSHOT EN DISCO
+# ============================================
+
+# Directorio donde se guardan las colecciones para restaurarlas al reiniciar
+# (archivos mapeados en memoria); vacío lo desactiva
+PERSIST_DIR = os.getenv("ACTIONS_PERSIST_DIR", "")
+
+# Colecciones que se guardan en disco
+PERSIST_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("ACTIONS_PERSIST_COLLECTIONS", "orders,customers,products,payments").split(",")
+    if name.strip()
+]
+
+# Cada cuántos segundos se guarda en disco la versión más reciente (si cambió)
+PERSIST_INTERVAL = float(os.getenv("ACTIONS_PERSIST_INTERVAL", "60"))
+
+# ============================================
+# SERVIDOR MULTIPROCESO (python -m actions.server)
+# ============================================
+
+# Procesos que atienden acciones detrás del mismo puerto
+SERVER_WORKERS = int(os.getenv("ACTIONS_WORKERS", str(os.cpu_count() or 1)))
+
+# Directorio del snapshot compartido (archivos mapeados en memoria). El
+# servidor lo define para sus workers; vacío: cada proceso usa su caché
+SHARED_SNAPSHOT_DIR = os.getenv("ACTIONS_SHARED_SNAPSHOT_DIR", "")
+
+# Colecciones que el proceso cargador publica para todos los workers (las
+# demás las descarga y guarda cada worker en su propia caché)
+SHARED_SNAPSHOT_COLLECTIONS = [
+    name.strip()
+    for name in os.getenv("ACTIONS_SHARED_SNAPSHOT_COLLECTIONS", "orders,customers,products,payments").split(",")
+    if name.strip()
+]
+
+# Cada cuántos segundos el cargador revisa si hay una versión nueva que publicar
+SHARED_SNAPSHOT_INTERVAL = float(os.getenv("ACTIONS_SHARED_SNAPSHOT_INTERVAL", "5"))
@@ -0,0 +1,145 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Text, Tuple
+
+from .api_client import NOT_FOUND, api
+from .config import CUSTOMER_PHONE_COUNTRY_CODE, CUSTOMER_SCOPE_MAX_ENTRIES, CUSTOMER_SCOPE_TTL
+from .records import Customer, Order, to_record, to_records
+from .singleflight import flights
+
+_NON_DIGITS = re.compile(r'\D')
+
+# Menos dígitos que esto no es un teléfono ("default" del shell, IDs de prueba)
+_MIN_PHONE_DIGITS = 6
+
+
+def sender_phones(sender_id: Optional[Text]) -> List[Text]:
+    """Teléfonos con que puede estar registrado el remitente de WhatsApp.
+
+    El sender_id llega como "51987654321@c.us", "whatsapp:+51987654321" o
+    el número solo; los clientes suelen estar registrados sin el código de
+    país, así que ese se prueba primero. El último es el número completo.
+    Lista vacía si el sender_id no es un teléfono.
+    """
+    digits = _NON_DIGITS.sub('', (sender_id or '').split('@', 1)[0])
+    if len(digits) < _MIN_PHONE_DIGITS:
+        return []
+    code = CUSTOMER_PHONE_COUNTRY_CODE
+    if code and digits.startswith(code) and len(digits) - len(code) >= _MIN_PHONE_DIGITS:
+        return [digits[len(code):], digits]
+    return [digits]
+
+
+class Partition(NamedTuple):
+    """Lo que se sabe de un remitente: su cliente (None si no está
+    registrado) y sus órdenes, la más reciente primero."""
+    customer: Optional[Customer]
+    orders: Tuple[Order, ...]
+
+
+class CustomerScope:
+    """Índice particionado por remitente: teléfono -> cliente -> sus órdenes.
+
+    Cada partición se llena la primera vez que el remitente pregunta, con
+    /customers/phone/:phone y /orders/customer/:id, y se reutiliza durante
+    `ttl` segundos: una consulta de "mis órdenes" cuesta lo que las órdenes
+    de ese cliente y nunca recorre la colección completa. Se guardan hasta
+    `max_entries` remitentes; los que llevan más tiempo sin preguntar salen
+    primero (LRU). Las acciones que modifican una orden descartan la
+    partición de su cliente con invalidate().
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self._max_entries = max_entries
+        self._ttl = ttl
+        # Teléfono completo -> (partición, vence)
+        self._entries: "OrderedDict[Text, Tuple[Partition, float]]" = OrderedDict()
+        # ID de cliente u orden -> teléfono de la partición que lo contiene
+        self._owners: Dict[Text, Text] = {}
+        # Cambia con cada invalidate(): una carga que empezó antes no se guarda
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, sender_id: Optional[Text]) -> Optional[Partition]:
+        """La partición del remitente, o None si su sender_id no es un
+        teléfono o la API no respondió."""
+        phones = sender_phones(sender_id)
+        if not phones:
+            return None
+        key = phones[-1]
+        item = self._entries.get(key)
+        if item is not None and item[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            return item[0]
+        # Mensajes seguidos del mismo remitente esperan una sola carga
+        partition, _ = await flights.do(("customer_scope", key), lambda: self._load(key, phones))
+        return partition
+
+    def invalidate(self, customer_id: Optional[Text] = None, order_id: Optional[Text] = None) -> None:
+        """Descarta la partición que contiene al cliente o a la orden."""
+        self._generation += 1
+        for owner in (customer_id, order_id):
+            key = self._owners.get(owner) if owner else None
+            if key is not None:
+                self._drop(key)
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._owners.clear()
+
+    # ---------- Internos ----------
+
+    async def _load(self, key: Text, phones: List[Text]) -> Optional[Partition]:
+        generation = self._generation
+        customer = None
+        for phone in phones:
+            customer = await api.customer_by_phone(phone, not_found=NOT_FOUND)
+            if customer is None:
+                return None  # la API no respondió: no se guarda
+            if customer is not NOT_FOUND:
+                break
+        if customer is NOT_FOUND:
+            # Sin cuenta (404 con cada teléfono): también se recuerda durante el TTL
+            partition = Partition(None, ())
+        else:
+            customer = to_record("customers", customer)
+            docs = await api.orders_by_customer(customer.id)
+            if docs is None:
+                return None
+            orders = to_records("orders", docs)
+            orders.sort(key=lambda order: order.created_epoch or 0, reverse=True)
+            partition = Partition(customer, tuple(orders))
+        if generation == self._generation:
+            self._store(key, partition)
+        return partition
+
+    def _store(self, key: Text, partition: Partition) -> None:
+        if self._ttl <= 0 or self._max_entries <= 0:
+            return
+        self._drop(key)
+        self._entries[key] = (partition, time.monotonic() + self._ttl)
+        if partition.customer is not None:
+            self._owners[partition.customer.id] = key
+        for order in partition.orders:
+            self._owners[order.id] = key
+        while len(self._entries) > self._max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Text) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        partition = item[0]
+        owners = [order.id for order in partition.orders]
+        if partition.customer is not None:
+            owners.append(partition.customer.id)
+        for owner in owners:
+            if self._owners.get(owner) == key:
+                del self._owners[owner]
+
+
+customer_scope = CustomerScope(CUSTOMER_SCOPE_MAX_ENTRIES, CUSTOMER_SCOPE_TTL)
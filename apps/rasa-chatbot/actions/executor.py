@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import multiprocessing
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Text
+
+from .config import COMPUTE_EXECUTOR, COMPUTE_QUEUE_SIZE, COMPUTE_QUEUE_TIMEOUT, COMPUTE_WORKERS
+from .kernels import OrderStats, frame_stats, order_stats
+from .order_frame import build_order_frame
+from .shared_snapshot import SharedDocuments
+from .snapshot import Document, Snapshot
+
+logger = logging.getLogger(__name__)
+
+MODES = ("thread", "process", "inline")
+
+
+class ComputeBusy(Exception):
+    """La cola del pool de cálculo está llena (back-pressure)."""
+
+    def __init__(self) -> None:
+        super().__init__("el servidor está ocupado con otras consultas, intenta de nuevo en unos segundos")
+
+
+class ComputeExecutor:
+    """Ejecuta los cálculos pesados fuera del event loop.
+
+    Las agregaciones de ranking (recorrer todas las órdenes y sus items)
+    corren en un pool de hilos o de procesos, así el event loop sigue
+    atendiendo las acciones baratas (saludos, consulta de una orden) mientras
+    se calcula un ranking o el dashboard.
+
+    Corren a la vez hasta `workers` cálculos y esperan turno hasta
+    `queue_size` más; con la cola llena, una acción espera lugar hasta
+    `queue_timeout` segundos y luego recibe ComputeBusy en lugar de
+    acumular trabajo que ya no llegaría a tiempo.
+
+    En modo "process" los argumentos se copian al proceso del pool, y
+    serializar miles de documentos retiene el GIL tanto como calcular. Por
+    eso derive() solo usa procesos con los documentos compartidos de
+    actions.shared_snapshot (viaja la ruta y se vuelven a mapear allí); con
+    listas en memoria calcula en un hilo. En modo "inline" se calcula en el
+    event loop, como antes.
+    """
+
+    def __init__(self, mode: Text, workers: int, queue_size: int, queue_timeout: float):
+        if mode not in MODES:
+            logger.warning("ACTIONS_COMPUTE_EXECUTOR=%r no es válido (%s); se usa 'thread'", mode, ", ".join(MODES))
+            mode = "thread"
+        self.mode = mode
+        self._workers = max(1, workers)
+        self._queue_size = max(0, queue_size)
+        self._queue_timeout = queue_timeout
+        self._pool: Optional[Executor] = None
+        self._threads: Optional[Executor] = None
+        # Un semáforo por event loop (cada loop tiene sus propias esperas)
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_pool(self, processes: bool) -> Executor:
+        if processes:
+            if self._pool is None:
+                # spawn: los procesos no heredan hilos ni el event loop del servidor
+                self._pool = ProcessPoolExecutor(self._workers, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self._workers, thread_name_prefix="actions-compute")
+        return self._threads
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self._workers + self._queue_size)
+        return slots
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta fn(*args) en el pool y espera el resultado."""
+        return await self._run(self.mode == "process", fn, *args)
+
+    async def derive(self, snapshot: Snapshot, collection: Text,
+                     builder: Callable[[List[Document]], Any]) -> Optional[Any]:
+        """snapshot.derive calculado en el pool (una vez por versión, compartido)."""
+        return await snapshot.derive_async(collection, builder, self._run_for)
+
+    async def order_stats(self, snapshot: Snapshot) -> Optional[OrderStats]:
+        """OrderStats de la versión de las órdenes, calculado una vez en el pool.
+
+        Con numpy sale del OrderFrame de la versión, el mismo que usa
+        top_orders: las columnas se arman una sola vez y las comparten. Sin
+        numpy es un recorrido de los documentos. None si no hay órdenes.
+        """
+        frame = await self.derive(snapshot, "orders", build_order_frame)
+        if frame is None:
+            return await self.derive(snapshot, "orders", order_stats)
+        entry = snapshot.entry("orders")
+        return await entry.derive_async(order_stats.__name__, self._run_for, frame_stats, frame)
+
+    async def _run_for(self, builder: Callable[[Any], Any], data: Any) -> Any:
+        processes = self.mode == "process" and isinstance(data, SharedDocuments)
+        return await self._run(processes, builder, data)
+
+    async def _run(self, processes: bool, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.mode == "inline":
+            return fn(*args)
+
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), self._queue_timeout)
+        except asyncio.TimeoutError:
+            raise ComputeBusy() from None
+
+        future = asyncio.get_running_loop().run_in_executor(self._get_pool(processes), fn, *args)
+        # El lugar se libera cuando termina el cálculo, no cuando se deja de esperar
+        future.add_done_callback(lambda _: slots.release())
+        return await asyncio.shield(future)
+
+    def shutdown(self) -> None:
+        for pool in (self._pool, self._threads):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._threads = None
+
+
+compute_executor = ComputeExecutor(COMPUTE_EXECUTOR, COMPUTE_WORKERS, COMPUTE_QUEUE_SIZE, COMPUTE_QUEUE_TIMEOUT)
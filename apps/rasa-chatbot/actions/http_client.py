@@ -0,0 +1,87 @@
+import asyncio
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Mapping, Optional, Text
+
+import aiohttp
+
+from . import metrics, records
+from .config import API_BASE_URL, HTTP_KEEPALIVE, HTTP_POOL_SIZE, HTTP_TIMEOUT
+
+
+class ApiResponse:
+    """Respuesta ya leída de la API (estado, headers y cuerpo en bytes)."""
+
+    __slots__ = ("status_code", "content", "headers")
+
+    def __init__(self, status_code: int, content: bytes, headers: Optional[Mapping[Text, Text]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def json(self) -> Any:
+        with metrics.phase("decode"):
+            return records.loads(self.content)
+
+
+# Una sesión (y su pool de conexiones) por event loop
+_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_session() -> aiohttp.ClientSession:
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE)
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+        )
+        _sessions[loop] = session
+    return session
+
+
+async def request(method: Text, path: Text, timeout: Optional[float] = None, **kwargs: Any) -> ApiResponse:
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+    with metrics.http_span():
+        async with get_session().request(method, f"{API_BASE_URL}{path}", **kwargs) as response:
+            content = await response.read()
+    metrics.record_http(len(content))
+    return ApiResponse(response.status, content, response.headers)
+
+
+@asynccontextmanager
+async def stream(path: Text, timeout: Optional[float] = None, **kwargs: Any) -> AsyncIterator[aiohttp.ClientResponse]:
+    """GET sin leer el cuerpo: la respuesta se consume por partes (response.content)."""
+    if timeout is not None:
+        kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+
+    async with AsyncExitStack() as stack:
+        # Esperar los headers cuenta como HTTP; el cuerpo se mide al leerlo
+        with metrics.http_span():
+            response = await stack.enter_async_context(get_session().get(f"{API_BASE_URL}{path}", **kwargs))
+        metrics.record_http(0)
+        yield response
+
+
+async def get(path: Text, **kwargs: Any) -> ApiResponse:
+    return await request("GET", path, **kwargs)
+
+
+async def put(path: Text, **kwargs: Any) -> ApiResponse:
+    return await request("PUT", path, **kwargs)
+
+
+async def delete(path: Text, **kwargs: Any) -> ApiResponse:
+    return await request("DELETE", path, **kwargs)
+
+
+async def close() -> None:
+    """Cierra la sesión del event loop actual (al apagar el servidor)."""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
@@ -0,0 +1,128 @@
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Text
+
+from .order_frame import OrderFrame, build_order_frame
+from .ranking import top_k
+from .records import Order
+from .snapshot import Snapshot
+
+ProductSales = Dict[Text, Dict[Text, float]]
+CustomerTotals = Dict[Text, Dict[Text, Any]]
+
+
+class OrderStats:
+    """Todos los agregados de ranking de las órdenes, calculados en una pasada.
+
+    - product_sales: {productName: {'quantity', 'revenue'}}
+    - customer_totals: {customer_id: {'total', 'orders', 'last_order'}}
+      (last_order es el epoch de su orden más reciente, o None)
+    - status_counts / payment_counts: histogramas de estado y estado de pago
+
+    Los diccionarios conservan el orden de primera aparición, igual que los
+    bucles que reemplazan, para que los empates se resuelvan igual.
+    """
+
+    __slots__ = ("product_sales", "customer_totals", "status_counts", "payment_counts")
+
+    def __init__(self, product_sales: ProductSales, customer_totals: CustomerTotals,
+                 status_counts: Counter, payment_counts: Counter):
+        self.product_sales = product_sales
+        self.customer_totals = customer_totals
+        self.status_counts = status_counts
+        self.payment_counts = payment_counts
+
+
+class _StatsBuilder:
+    """Acumula OrderStats orden por orden (sirve para listas y para streaming)."""
+
+    def __init__(self) -> None:
+        self.product_sales: ProductSales = {}
+        self.customer_totals: CustomerTotals = {}
+        self.status_counts: Counter = Counter()
+        self.payment_counts: Counter = Counter()
+
+    def add(self, order: Order) -> None:
+        self.status_counts[order.status] += 1
+        self.payment_counts[order.payment_status] += 1
+
+        customer_id = order.customer_id
+        if customer_id:
+            totals = self.customer_totals.get(customer_id)
+            if totals is None:
+                totals = self.customer_totals[customer_id] = {'total': 0, 'orders': 0, 'last_order': None}
+            totals['total'] += order.total_amount
+            totals['orders'] += 1
+            created_at = order.created_epoch
+            if created_at is not None and (totals['last_order'] is None or created_at > totals['last_order']):
+                totals['last_order'] = created_at
+
+        for item in order.items:
+            product_name = item.product_name
+            if product_name:
+                quantity = item.quantity
+                sales = self.product_sales.get(product_name)
+                if sales is None:
+                    sales = self.product_sales[product_name] = {'quantity': 0, 'revenue': 0}
+                sales['quantity'] += quantity
+                sales['revenue'] += item.price * quantity
+
+    def build(self) -> OrderStats:
+        return OrderStats(self.product_sales, self.customer_totals, self.status_counts, self.payment_counts)
+
+
+def order_stats(orders: List[Order]) -> OrderStats:
+    """Kernel sobre la colección en caché: un único recorrido en Python.
+
+    Pensado para memoizarse por versión; con numpy las acciones lo obtienen
+    con compute_executor.order_stats(), que usa frame_stats sobre el
+    OrderFrame memoizado de la versión en lugar de recorrer los documentos.
+    """
+    return collect_stats(orders)
+
+
+def frame_stats(frame: OrderFrame) -> OrderStats:
+    """OrderStats vectorizado sobre las columnas del OrderFrame."""
+    return OrderStats(
+        product_sales=frame.sales_by_product(),
+        customer_totals=frame.spend_by_customer(),
+        status_counts=frame.status_counts(),
+        payment_counts=frame.payment_counts(),
+    )
+
+
+def collect_stats(orders: Iterable[Order]) -> OrderStats:
+    builder = _StatsBuilder()
+    for order in orders:
+        builder.add(order)
+    return builder.build()
+
+
+async def stream_stats(orders: AsyncIterator[Order]) -> OrderStats:
+    """El mismo recorrido sobre órdenes que llegan en streaming."""
+    builder = _StatsBuilder()
+    async for order in orders:
+        builder.add(order)
+    return builder.build()
+
+
+# Columnas de OrderFrame y su equivalente en los registros, para top_orders
+_ORDER_KEYS = {
+    'created_at': lambda order: order.created_epoch or 0.0,
+    'amount': lambda order: order.total_amount,
+}
+
+
+def top_orders(snapshot: Snapshot, column: Text, k: int) -> Optional[List[Order]]:
+    """Las k órdenes con mayor `column` ('created_at' o 'amount'), de mayor a menor.
+
+    Si el OrderFrame de esta versión ya existe (p. ej. el compartido entre
+    procesos) se ordena la columna y solo se leen las k órdenes elegidas; si
+    no, se recorren los documentos. None si las órdenes no están disponibles.
+    """
+    orders = snapshot.orders
+    if orders is None:
+        return None
+    frame = snapshot.derived("orders", build_order_frame)
+    if frame is not None:
+        return [orders[row] for row in frame.top_rows(column, k)]
+    return top_k(orders, k, key=_ORDER_KEYS[column])
@@ -0,0 +1,359 @@
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterator, List, Optional, Text, Tuple
+
+from .config import METRICS_HOST, METRICS_LOG, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+PHASES = ("http", "decode", "compute", "render")
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class ActionMetrics:
+    """Mediciones de una ejecución de acción.
+
+    El tiempo HTTP se cuenta como la unión de los intervalos con peticiones
+    en curso: varias descargas en paralelo no suman más que el tiempo real.
+    compute es lo que queda del total al restar http, decode y render.
+    """
+
+    __slots__ = ("action", "phases", "http_calls", "http_bytes", "coalesced", "cached", "_http_inflight", "_http_since")
+
+    def __init__(self, action: Text):
+        self.action = action
+        self.phases: Dict[Text, float] = dict.fromkeys(PHASES, 0.0)
+        self.http_calls = 0
+        self.http_bytes = 0
+        self.coalesced = False
+        self.cached = False
+        self._http_inflight = 0
+        self._http_since = 0.0
+
+    def http_started(self) -> None:
+        if self._http_inflight == 0:
+            self._http_since = time.perf_counter()
+        self._http_inflight += 1
+
+    def http_finished(self) -> None:
+        self._http_inflight -= 1
+        if self._http_inflight == 0:
+            self.phases["http"] += time.perf_counter() - self._http_since
+
+
+_current: ContextVar[Optional[ActionMetrics]] = ContextVar("action_metrics", default=None)
+
+
+# ============================================
+# PUNTOS DE MEDICIÓN
+# ============================================
+
+@contextmanager
+def http_span() -> Iterator[None]:
+    """Tiempo esperando a la API (petición propia o descarga compartida)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    metrics.http_started()
+    try:
+        yield
+    finally:
+        metrics.http_finished()
+
+
+@contextmanager
+def phase(name: Text) -> Iterator[None]:
+    """Tiempo de CPU de una fase (decode, render) de la acción en curso."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.phases[name] += time.perf_counter() - start
+
+
+def record_http(nbytes: int, calls: int = 1) -> None:
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.http_calls += calls
+        metrics.http_bytes += nbytes
+
+
+def record_coalesced() -> None:
+    """La acción en curso recibió el resultado de una ejecución idéntica simultánea."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.coalesced = True
+
+
+def record_render_hit() -> None:
+    """La acción en curso respondió con una respuesta ya armada (render_cache)."""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.cached = True
+
+
+def detach() -> None:
+    """Deja de atribuir mediciones a la acción en curso.
+
+    Solo tiene sentido dentro de una tarea propia (su contexto es una copia):
+    una descarga compartida no se carga a la acción que la inició, cada
+    acción que la espera la mide por su cuenta.
+    """
+    _current.set(None)
+
+
+async def timed_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    """Cuenta como HTTP la espera de cada pedazo de una respuesta en streaming."""
+    iterator = chunks.__aiter__()
+    while True:
+        with http_span():
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+        record_http(len(chunk), calls=0)
+        yield chunk
+
+
+# ============================================
+# DECORADOR DE ACCIONES
+# ============================================
+
+class _TimedDispatcher:
+    """Envuelve el dispatcher para medir el envío de mensajes (render)."""
+
+    def __init__(self, dispatcher: Any):
+        self._dispatcher = dispatcher
+        self.errors = 0
+
+    def utter_message(self, *args: Any, **kwargs: Any) -> None:
+        text = kwargs.get("text") or (args[0] if args else None)
+        if isinstance(text, str) and text.startswith("❌"):
+            self.errors += 1
+        with phase("render"):
+            self._dispatcher.utter_message(*args, **kwargs)
+
+    def __getattr__(self, name: Text) -> Any:
+        return getattr(self._dispatcher, name)
+
+
+_on_action: List[Callable[[], None]] = []
+
+
+def on_action(callback: Callable[[], None]) -> None:
+    """Registra una función que se llama al empezar cada acción medida."""
+    _on_action.append(callback)
+
+
+def instrumented(run: Callable[..., Any]) -> Callable[..., Any]:
+    """Mide cada Action.run: tiempo total y por fase, llamadas y bytes de la API.
+
+    Publica el resultado en /metrics (formato Prometheus) y como una línea de
+    log JSON por ejecución. Una respuesta que empieza con "❌" cuenta como error.
+    """
+
+    @functools.wraps(run)
+    async def wrapper(self: Any, dispatcher: Any, tracker: Any, domain: Any) -> Any:
+        for callback in _on_action:
+            callback()
+        metrics = ActionMetrics(self.name())
+        timed_dispatcher = _TimedDispatcher(dispatcher)
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await run(self, timed_dispatcher, tracker, domain)
+            outcome = "error" if timed_dispatcher.errors else "ok"
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            _current.reset(token)
+            measured = metrics.phases["http"] + metrics.phases["decode"] + metrics.phases["render"]
+            metrics.phases["compute"] = max(0.0, duration - measured)
+            registry.observe(metrics, duration, outcome)
+            if METRICS_LOG:
+                logger.info(json.dumps({
+                    "event": "action",
+                    "action": metrics.action,
+                    "sender_id": getattr(tracker, "sender_id", None),
+                    "outcome": outcome,
+                    "duration_ms": round(duration * 1000, 2),
+                    "phases_ms": {name: round(value * 1000, 2) for name, value in metrics.phases.items()},
+                    "http_calls": metrics.http_calls,
+                    "http_bytes": metrics.http_bytes,
+                    "coalesced": metrics.coalesced,
+                    "cached": metrics.cached,
+                }, ensure_ascii=False))
+
+    return wrapper
+
+
+# ============================================
+# REGISTRO Y EXPORTACIÓN PROMETHEUS
+# ============================================
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[Text, Text], int] = {}
+        self._phases: Dict[Tuple[Text, Text], float] = {}
+        self._http_calls: Dict[Text, int] = {}
+        self._http_bytes: Dict[Text, int] = {}
+        self._coalesced: Dict[Text, int] = {}
+        self._cached: Dict[Text, int] = {}
+        self._buckets: Dict[Text, List[int]] = {}
+        self._duration_sum: Dict[Text, float] = {}
+
+    def observe(self, metrics: ActionMetrics, duration: float, outcome: Text) -> None:
+        action = metrics.action
+        with self._lock:
+            self._calls[(action, outcome)] = self._calls.get((action, outcome), 0) + 1
+            for name, value in metrics.phases.items():
+                self._phases[(action, name)] = self._phases.get((action, name), 0.0) + value
+            self._http_calls[action] = self._http_calls.get(action, 0) + metrics.http_calls
+            self._http_bytes[action] = self._http_bytes.get(action, 0) + metrics.http_bytes
+            if metrics.coalesced:
+                self._coalesced[action] = self._coalesced.get(action, 0) + 1
+            if metrics.cached:
+                self._cached[action] = self._cached.get(action, 0) + 1
+            buckets = self._buckets.setdefault(action, [0] * len(DURATION_BUCKETS))
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    buckets[i] += 1
+            self._duration_sum[action] = self._duration_sum.get(action, 0.0) + duration
+
+    def render(self) -> Text:
+        with self._lock:
+            lines = [
+                "# HELP rasa_action_calls_total Ejecuciones de cada acción por resultado.",
+                "# TYPE rasa_action_calls_total counter",
+            ]
+            for (action, outcome), value in sorted(self._calls.items()):
+                lines.append(f'rasa_action_calls_total{{action="{action}",outcome="{outcome}"}} {value}')
+
+            lines += [
+                "# HELP rasa_action_duration_seconds Duración total de cada acción.",
+                "# TYPE rasa_action_duration_seconds histogram",
+            ]
+            for action, buckets in sorted(self._buckets.items()):
+                count = sum(v for (a, _), v in self._calls.items() if a == action)
+                for bound, value in zip(DURATION_BUCKETS, buckets):
+                    lines.append(f'rasa_action_duration_seconds_bucket{{action="{action}",le="{bound}"}} {value}')
+                lines.append(f'rasa_action_duration_seconds_bucket{{action="{action}",le="+Inf"}} {count}')
+                lines.append(f'rasa_action_duration_seconds_sum{{action="{action}"}} {self._duration_sum[action]:.6f}')
+                lines.append(f'rasa_action_duration_seconds_count{{action="{action}"}} {count}')
+
+            lines += [
+                "# HELP rasa_action_phase_seconds_total Tiempo acumulado por fase (http, decode, compute, render).",
+                "# TYPE rasa_action_phase_seconds_total counter",
+            ]
+            for (action, name), value in sorted(self._phases.items()):
+                lines.append(f'rasa_action_phase_seconds_total{{action="{action}",phase="{name}"}} {value:.6f}')
+
+            lines += [
+                "# HELP rasa_action_http_requests_total Peticiones a la API hechas por cada acción.",
+                "# TYPE rasa_action_http_requests_total counter",
+            ]
+            for action, value in sorted(self._http_calls.items()):
+                lines.append(f'rasa_action_http_requests_total{{action="{action}"}} {value}')
+
+            lines += [
+                "# HELP rasa_action_http_response_bytes_total Bytes recibidos de la API por cada acción.",
+                "# TYPE rasa_action_http_response_bytes_total counter",
+            ]
+            for action, value in sorted(self._http_bytes.items()):
+                lines.append(f'rasa_action_http_response_bytes_total{{action="{action}"}} {value}')
+
+            lines += [
+                "# HELP rasa_action_coalesced_total Ejecuciones que recibieron el resultado de otra idéntica en curso.",
+                "# TYPE rasa_action_coalesced_total counter",
+            ]
+            for action, value in sorted(self._coalesced.items()):
+                lines.append(f'rasa_action_coalesced_total{{action="{action}"}} {value}')
+
+            lines += [
+                "# HELP rasa_action_render_cache_hits_total Ejecuciones respondidas con una respuesta ya armada.",
+                "# TYPE rasa_action_render_cache_hits_total counter",
+            ]
+            for action, value in sorted(self._cached.items()):
+                lines.append(f'rasa_action_render_cache_hits_total{{action="{action}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            self._send(200, registry.render(), "text/plain; version=0.0.4; charset=utf-8")
+        elif path == "/ready":
+            # Para el readiness probe: 503 mientras dure la precarga
+            if _readiness():
+                self._send(200, "ready\n", "text/plain; charset=utf-8")
+            else:
+                self._send(503, "warming up\n", "text/plain; charset=utf-8")
+        else:
+            self.send_error(404)
+
+    def _send(self, status: int, text: Text, content_type: Text) -> None:
+        body = text.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # sin una línea de log por cada scrape
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_readiness: Callable[[], bool] = lambda: True
+
+
+def start_server(host: Optional[Text] = None, port: Optional[int] = None,
+                 ready: Optional[Callable[[], bool]] = None) -> None:
+    """Expone GET /metrics y GET /ready en un hilo aparte (port=0 lo desactiva).
+
+    Se llama desde el proceso que atiende las acciones (el listener de
+    arranque de startup.py), nunca al importar: el registro que publica es
+    el de ese proceso.
+    """
+    global _server, _readiness
+    host = METRICS_HOST if host is None else host
+    port = METRICS_PORT if port is None else port
+    if ready is not None:
+        _readiness = ready
+    if _server is not None or port <= 0:
+        return
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        # Otro proceso (p. ej. otro worker) ya expone las métricas en ese puerto
+        logger.warning("No se pudo abrir el endpoint de métricas en %s:%s: %s", host, port, e)
+        return
+    threading.Thread(target=_server.serve_forever, name="actions-metrics", daemon=True).start()
+    logger.info("Métricas de acciones en http://%s:%s/metrics", host, port)
+
+
+def stop_server() -> None:
+    """Cierra el endpoint de métricas (al detener el action server)."""
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,194 @@
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Text
+
+try:
+    import numpy as np
+except ImportError:  # numpy viene con rasa, pero no con rasa_sdk solo
+    np = None
+
+from .records import Order
+
+NO_CUSTOMER = -1
+
+# Columnas NumPy y vocabularios de OrderFrame (lo que se guarda en disco)
+ARRAYS = ('amount', 'created_at', 'status', 'payment_status', 'customer',
+          'item_offsets', 'item_product', 'item_quantity', 'item_price')
+VOCABULARIES = ('statuses', 'payment_statuses', 'customer_ids', 'product_names')
+
+
+class _Vocabulary:
+    """Asigna un código entero a cada texto distinto, en orden de aparición."""
+
+    def __init__(self) -> None:
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class OrderFrame:
+    """Órdenes en formato columnar (arreglos NumPy) para las analíticas.
+
+    Cada orden ocupa una fila: monto, fecha (epoch), código de estado, código
+    de estado de pago e índice de cliente. Los items van en una tabla aparte
+    estilo CSR: los de la orden i están en item_* [item_offsets[i]:item_offsets[i + 1]].
+    Los textos repetidos (estados, IDs de cliente, nombres de producto) se
+    guardan una sola vez y las filas solo llevan su código.
+
+    Se construye una vez por versión de la colección (ver Snapshot.derive)
+    y las agregaciones son reducciones vectorizadas (bincount, máscaras) en
+    lugar de bucles de Python sobre diccionarios.
+    """
+
+    def __init__(self, amount: "np.ndarray", created_at: "np.ndarray",
+                 status: "np.ndarray", payment_status: "np.ndarray", customer: "np.ndarray",
+                 item_offsets: "np.ndarray", item_product: "np.ndarray",
+                 item_quantity: "np.ndarray", item_price: "np.ndarray",
+                 statuses: List[Text], payment_statuses: List[Text],
+                 customer_ids: List[Text], product_names: List[Text]):
+        self.amount = amount
+        self.created_at = created_at
+        self.status = status
+        self.payment_status = payment_status
+        self.customer = customer
+        self.item_offsets = item_offsets
+        self.item_product = item_product
+        self.item_quantity = item_quantity
+        self.item_price = item_price
+        self.statuses = statuses
+        self.payment_statuses = payment_statuses
+        self.customer_ids = customer_ids
+        self.product_names = product_names
+
+    @classmethod
+    def from_orders(cls, orders: List[Order]) -> "OrderFrame":
+        statuses, payment_statuses = _Vocabulary(), _Vocabulary()
+        customers, products = _Vocabulary(), _Vocabulary()
+
+        amount, created_at, status, payment_status, customer = [], [], [], [], []
+        item_offsets = [0]
+        item_product, item_quantity, item_price = [], [], []
+
+        for order in orders:
+            amount.append(order.total_amount)
+            created_at.append(order.created_epoch or 0.0)
+            status.append(statuses.code(order.status))
+            payment_status.append(payment_statuses.code(order.payment_status))
+            customer_id = order.customer_id
+            customer.append(customers.code(customer_id) if customer_id else NO_CUSTOMER)
+
+            for item in order.items:
+                product_name = item.product_name
+                if not product_name:
+                    continue
+                item_product.append(products.code(product_name))
+                item_quantity.append(item.quantity)
+                item_price.append(item.price)
+            item_offsets.append(len(item_product))
+
+        return cls(
+            amount=np.array(amount, dtype=np.float64),
+            created_at=np.array(created_at, dtype=np.float64),
+            status=np.array(status, dtype=np.int16),
+            payment_status=np.array(payment_status, dtype=np.int16),
+            customer=np.array(customer, dtype=np.int32),
+            item_offsets=np.array(item_offsets, dtype=np.int64),
+            item_product=np.array(item_product, dtype=np.int32),
+            item_quantity=np.array(item_quantity, dtype=np.float64),
+            item_price=np.array(item_price, dtype=np.float64),
+            statuses=statuses.values,
+            payment_statuses=payment_statuses.values,
+            customer_ids=customers.values,
+            product_names=products.values,
+        )
+
+    def __len__(self) -> int:
+        return len(self.amount)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in ARRAYS)
+
+    # ---------- Disco ----------
+
+    def save(self, directory: Path) -> None:
+        """Guarda cada columna como .npy (mapeable en memoria) y los vocabularios como JSON."""
+        for name in ARRAYS:
+            np.save(directory / f"orders.{name}.npy", getattr(self, name))
+        vocabularies = {name: getattr(self, name) for name in VOCABULARIES}
+        (directory / "orders.vocabularies.json").write_text(json.dumps(vocabularies, ensure_ascii=False))
+
+    @classmethod
+    def load(cls, directory: Path) -> "OrderFrame":
+        """Abre un frame guardado con save() sin copiarlo: las columnas quedan
+        mapeadas en memoria (solo lectura) y varios procesos comparten las
+        mismas páginas."""
+        arrays = {name: np.load(directory / f"orders.{name}.npy", mmap_mode="r") for name in ARRAYS}
+        vocabularies = json.loads((directory / "orders.vocabularies.json").read_text())
+        return cls(**arrays, **vocabularies)
+
+    # ---------- Selección ----------
+
+    def top_rows(self, column: Text, k: int) -> List[int]:
+        """Filas de los k mayores valores de la columna, de mayor a menor
+        (ante empates, en el orden original)."""
+        values = getattr(self, column)
+        return np.argsort(-values, kind="stable")[:k].tolist()
+
+    # ---------- Agregados ----------
+
+    def status_counts(self) -> Counter:
+        return self._histogram(self.status, self.statuses)
+
+    def payment_counts(self) -> Counter:
+        return self._histogram(self.payment_status, self.payment_statuses)
+
+    @staticmethod
+    def _histogram(codes: "np.ndarray", values: List[Text]) -> Counter:
+        counts = np.bincount(codes, minlength=len(values))
+        return Counter({value: int(count) for value, count in zip(values, counts)})
+
+    def spend_by_customer(self) -> Dict[Text, Dict[Text, Any]]:
+        """{customer_id: {'total', 'orders', 'last_order'}} en orden de primera aparición.
+
+        last_order es el epoch de la orden más reciente del cliente (None si
+        ninguna de sus órdenes tiene fecha).
+        """
+        has_customer = self.customer != NO_CUSTOMER
+        customer = self.customer[has_customer]
+        size = len(self.customer_ids)
+        totals = np.bincount(customer, weights=self.amount[has_customer], minlength=size)
+        counts = np.bincount(customer, minlength=size)
+        last_order = np.zeros(size, dtype=np.float64)
+        np.maximum.at(last_order, customer, self.created_at[has_customer])
+        return {
+            cid: {'total': float(total), 'orders': int(count), 'last_order': float(last) or None}
+            for cid, total, count, last in zip(self.customer_ids, totals, counts, last_order)
+        }
+
+    def sales_by_product(self) -> Dict[Text, Dict[Text, float]]:
+        """{productName: {'quantity', 'revenue'}} en orden de primera aparición."""
+        size = len(self.product_names)
+        quantity = np.bincount(self.item_product, weights=self.item_quantity, minlength=size)
+        revenue = np.bincount(self.item_product, weights=self.item_quantity * self.item_price, minlength=size)
+        return {
+            name: {'quantity': _number(q), 'revenue': float(r)}
+            for name, q, r in zip(self.product_names, quantity, revenue)
+        }
+
+
+def _number(value: float) -> float:
+    # Las cantidades son enteras: se muestran sin ".0"
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def build_order_frame(orders: List[Order]) -> Optional[OrderFrame]:
+    """OrderFrame de las órdenes, o None si numpy no está instalado."""
+    return OrderFrame.from_orders(orders) if np is not None else None
@@ -0,0 +1,221 @@
+import re
+import unicodedata
+from datetime import date, datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional, Text, Tuple
+
+from .config import UTC_OFFSET_HOURS
+
+LOCAL_TZ = timezone(timedelta(hours=UTC_OFFSET_HOURS))
+_EPOCH = date(1970, 1, 1)
+
+MONTHS = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+          'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+
+_LAST_N = re.compile(r'(?:ultim\w*|pasad\w*)?\s*(\d+)\s*(dia|semana|mes|ano|anio)')
+_LAST_ONE = re.compile(r'\bultim\w*\s+(dia|semana|mes|ano|anio)\b')
+_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})|(\d{1,2})[/-](\d{1,2})(?:[/-](\d{2,4}))?')
+# "15 de marzo", "del 1 al 15 de marzo"
+_DAY_OF_MONTH = re.compile(r'\b(\d{1,2})(?:\s+(?:al|a|y|hasta)\s+(?:el\s+)?(\d{1,2}))?\s+de\s+([a-z]+)')
+_MONTH = re.compile(r'\b(' + '|'.join(MONTHS + ['setiembre']) + r')\b')
+_YEAR = re.compile(r'\b(\d{4})\b')
+_DIGIT = re.compile(r'\d')
+_NUMBERS = {'un': 1, 'una': 1, 'uno': 1, 'dos': 2, 'tres': 3, 'cuatro': 4, 'cinco': 5, 'seis': 6,
+            'siete': 7, 'ocho': 8, 'nueve': 9, 'diez': 10, 'once': 11, 'doce': 12}
+_PLURALS = {'dia': 'días', 'mes': 'meses', 'ano': 'años'}
+
+
+class Period(NamedTuple):
+    """Rango de fechas inclusivo (hora local) y cómo nombrarlo en la respuesta."""
+    start: date
+    end: date
+    label: Text
+
+
+# ============================================
+# DÍAS LOCALES
+# ============================================
+
+def today() -> date:
+    return datetime.now(LOCAL_TZ).date()
+
+
+def local_day(timestamp: float) -> int:
+    """Epoch (segundos, UTC) al número de día local (días desde 1970-01-01)."""
+    return int((timestamp + UTC_OFFSET_HOURS * 3600) // 86400)
+
+
+def day_number(day: date) -> int:
+    return (day - _EPOCH).days
+
+
+def period_bounds(period: Period) -> Tuple[float, float]:
+    """Rango de epochs [inicio, fin) que cubre los días locales del periodo."""
+    offset = UTC_OFFSET_HOURS * 3600
+    return day_number(period.start) * 86400 - offset, (day_number(period.end) + 1) * 86400 - offset
+
+
+# ============================================
+# INTERPRETACIÓN DEL PERIODO
+# ============================================
+
+def _fold(text: Text) -> Text:
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def _shift_months(day: date, months: int) -> date:
+    year, month = divmod(day.year * 12 + day.month - 1 + months, 12)
+    month += 1
+    return date(year, month, min(day.day, _month_end(year, month).day))
+
+
+def _month_end(year: int, month: int) -> date:
+    first_next = date(year + month // 12, month % 12 + 1, 1)
+    return first_next - timedelta(days=1)
+
+
+def _month_number(word: Text) -> Optional[int]:
+    if word == 'setiembre':
+        return 9
+    return MONTHS.index(word) + 1 if word in MONTHS else None
+
+
+def _month_year(month: int, text: Text, reference: date) -> int:
+    year_match = _YEAR.search(text)
+    if year_match:
+        return int(year_match.group(1))
+    # Un mes que todavía no llega se refiere al del año anterior
+    return reference.year if month <= reference.month else reference.year - 1
+
+
+def _dates(text: Text, reference: date) -> Optional[List[date]]:
+    """Fechas escritas con números ("01/03", "2024-03-01") o con el nombre
+    del mes ("15 de marzo", "del 1 al 15 de marzo"). None si alguna no existe."""
+    found = []
+    try:
+        for match in _DATE.finditer(text):
+            if match.group(1):
+                found.append(date(int(match.group(1)), int(match.group(2)), int(match.group(3))))
+            else:
+                year = match.group(6)
+                year = int(year) + (2000 if len(year) == 2 else 0) if year else reference.year
+                found.append(date(year, int(match.group(5)), int(match.group(4))))
+        for match in _DAY_OF_MONTH.finditer(text):
+            month = _month_number(match.group(3))
+            if month is None:
+                continue
+            year = _month_year(month, text, reference)
+            for day in match.group(1, 2):
+                if day:
+                    found.append(date(year, month, int(day)))
+    except ValueError:
+        return None  # fecha imposible (31/02...)
+    return found
+
+
+def _last(count: int, unit: Text, reference: date) -> Optional[Period]:
+    if count <= 0:
+        return None
+    if unit == 'dia':
+        start = reference - timedelta(days=count - 1)
+    elif unit == 'semana':
+        start = reference - timedelta(days=7 * count - 1)
+    elif unit == 'mes':
+        start = _shift_months(reference, -count) + timedelta(days=1)
+    else:
+        start = _shift_months(reference, -12 * count) + timedelta(days=1)
+    if count == 1:
+        label = {'dia': "del último día", 'semana': "de la última semana", 'mes': "del último mes",
+                 'ano': "del último año"}[unit]
+    elif unit == 'semana':
+        label = f"de las últimas {count} semanas"
+    else:
+        label = f"de los últimos {count} {_PLURALS[unit]}"
+    return Period(start, reference, label)
+
+
+def parse_period(text: Optional[Text], reference: Optional[date] = None) -> Optional[Period]:
+    """Interpreta "hoy", "ayer", "esta semana", "el mes pasado", "enero",
+    "marzo 2024", "el año 2024", "últimos 7 días", "el último mes",
+    "01/03 al 15/03", "del 1 al 15 de marzo"... Sin texto se asume hoy.
+
+    Devuelve None si no se reconoce el periodo o se reconoce solo en parte
+    ("hace un mes", "semana 12", un año que no llegó): la acción vuelve a
+    preguntar en lugar de responder por otro periodo.
+    """
+    reference = reference or today()
+    folded = _fold(text or '').strip()
+
+    words = folded.split()
+    # "del día" / "este día" es hoy; "últimos 7 día(s)" lo resuelve _LAST_N
+    if not words or 'hoy' in words or words[-2:] in (['dia'], ['del', 'dia'], ['este', 'dia']):
+        return Period(reference, reference, "de hoy")
+    if 'anteayer' in folded:
+        day = reference - timedelta(days=2)
+        return Period(day, day, "de anteayer")
+    if 'ayer' in folded:
+        day = reference - timedelta(days=1)
+        return Period(day, day, "de ayer")
+    if 'hace' in words:
+        return None  # "hace un mes": ¿ese día o todo el mes?
+
+    dates = _dates(folded, reference)
+    if dates is None:
+        return None
+    if len(dates) >= 2:
+        start, end = sorted(dates[:2])
+        return Period(start, end, f"del {start:%d/%m/%Y} al {end:%d/%m/%Y}")
+    if dates:
+        return Period(dates[0], dates[0], f"del {dates[0]:%d/%m/%Y}")
+
+    month_match = _MONTH.search(folded)
+    month = _month_number(month_match.group(1)) if month_match else None
+    year_match = _YEAR.search(folded)
+    if year_match:
+        if _DIGIT.search(_YEAR.sub('', folded, count=1)):
+            return None  # más números que el año: no se entendió el resto
+        year = int(year_match.group(1))
+        if month is not None:
+            start, end, label = date(year, month, 1), _month_end(year, month), f"de {MONTHS[month - 1]} {year}"
+        else:
+            start, end, label = date(year, 1, 1), date(year, 12, 31), f"del año {year}"
+        if start > reference:
+            return None
+        return Period(start, min(end, reference), label)
+
+    # "dos meses" -> "2 meses"
+    folded = ' '.join(str(_NUMBERS.get(word, word)) for word in words)
+    match = _LAST_N.search(folded) or _LAST_ONE.search(folded)
+    if match:
+        if match.re is _LAST_N:
+            count, unit = int(match.group(1)), match.group(2)
+        else:
+            count, unit = 1, match.group(1)
+        return _last(count, 'ano' if unit == 'anio' else unit, reference)
+    if 'ultim' in folded or _DIGIT.search(folded):
+        return None  # "últimos meses", "semana 12"
+
+    if month is not None:
+        year = _month_year(month, folded, reference)
+        start = date(year, month, 1)
+        return Period(start, min(_month_end(year, month), reference), f"de {MONTHS[month - 1]} {year}")
+
+    pasad = 'pasad' in folded or 'anterior' in folded
+    if 'semana' in folded:
+        monday = reference - timedelta(days=reference.weekday())
+        if pasad:
+            return Period(monday - timedelta(days=7), monday - timedelta(days=1), "de la semana pasada")
+        return Period(monday, reference, "de esta semana")
+    if 'mes' in folded:
+        first = reference.replace(day=1)
+        if pasad:
+            last = first - timedelta(days=1)
+            return Period(last.replace(day=1), last, "del mes pasado")
+        return Period(first, reference, "de este mes")
+    if 'ano' in words or 'anio' in words:
+        first = reference.replace(month=1, day=1)
+        if pasad:
+            return Period(first.replace(year=first.year - 1), first - timedelta(days=1), "del año pasado")
+        return Period(first, reference, "de este año")
+
+    return None
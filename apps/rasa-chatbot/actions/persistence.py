@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import time
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Text
+
+from .cache import SnapshotCache, snapshot_cache
+from .config import PERSIST_COLLECTIONS, PERSIST_DIR, PERSIST_INTERVAL
+from .shared_snapshot import MANIFEST, current_generation, open_generation, publish
+
+logger = logging.getLogger(__name__)
+
+
+class Persister:
+    """Guarda las colecciones en caché en disco y las restaura al reiniciar.
+
+    Usa el formato del snapshot compartido (actions.shared_snapshot): un
+    documento JSON por línea con su tabla de offsets, los índices como
+    posiciones y el OrderFrame de las órdenes, más los validadores de cada
+    colección (ETag, Last-Modified, watermark). Al arrancar, restore() mapea
+    la última generación en memoria y la pone en caché ya vencida: las
+    acciones la leen de inmediato (stale-while-revalidate) mientras se
+    revalida en segundo plano con peticiones condicionales y deltas, así un
+    reinicio no vuelve a descargar todo el historial de la API.
+
+    Cada `interval` segundos (y al detener el servidor, con flush) se
+    escribe una generación nueva si alguna colección cambió de versión.
+    """
+
+    def __init__(self, cache: SnapshotCache, root: Path, collections: Iterable[Text], interval: float):
+        self._cache = cache
+        self._root = root
+        self._collections: List[Text] = list(collections)
+        self._interval = interval
+        self._persisted: Optional[Any] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def restore(self) -> List[Text]:
+        """Pone en caché las colecciones guardadas; devuelve las restauradas."""
+        directory = current_generation(self._root)
+        if directory is None:
+            return []
+        try:
+            # Las versiones guardadas son las de la caché local: sin desplazar
+            entries = open_generation(directory, version_base=0)
+            age = time.time() - (directory / MANIFEST).stat().st_mtime
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("No se pudo restaurar el snapshot de %s: %s", directory, e)
+            return []
+
+        restored = [name for name in self._collections if name in entries]
+        for name in restored:
+            entry = entries[name]
+            # Vencida: se sirve mientras se revalida (304 / deltas) en lugar de esperar la API
+            entry.expires_at = time.monotonic()
+            self._cache.load(name, entry)
+        self._persisted = self._cache.peek(*self._collections).version
+        logger.info("Snapshot restaurado de disco (%s, de hace %.0fs): %s",
+                    directory.name, age, ", ".join(restored) or "ninguna colección")
+        return restored
+
+    def start(self) -> None:
+        """Lanza el guardado periódico en el event loop en curso (una sola vez)."""
+        if not self.running:
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def flush(self) -> bool:
+        """Guarda la versión en caché si cambió desde la última; True si escribió."""
+        snapshot = self._cache.peek(*self._collections)
+        if any(version is None for _, version in snapshot.version) or snapshot.version == self._persisted:
+            return False
+        started = time.monotonic()
+        # La escritura corre en un hilo para no frenar las acciones
+        generation = await asyncio.get_running_loop().run_in_executor(
+            None, publish, self._root, snapshot, self._collections)
+        self._persisted = snapshot.version
+        logger.info("Snapshot guardado en disco (%s) en %.2fs", generation, time.monotonic() - started)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning("No se pudo guardar el snapshot en disco: %s", e)
+
+
+persister = Persister(snapshot_cache, Path(PERSIST_DIR), PERSIST_COLLECTIONS, PERSIST_INTERVAL) if PERSIST_DIR else None
@@ -0,0 +1,20 @@
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+Key = Callable[[T], Any]
+
+
+def top_k(items: Iterable[T], k: int, key: Optional[Key] = None) -> List[T]:
+    """Los k mayores según key, de mayor a menor.
+
+    Equivale a sorted(items, key=key, reverse=True)[:k] (ante empates se
+    respeta el orden original), pero cuesta O(n log k) en lugar de
+    O(n log n) y no copia ni ordena la lista completa.
+    """
+    return heapq.nlargest(k, items, key=key)
+
+
+def bottom_k(items: Iterable[T], k: int, key: Optional[Key] = None) -> List[T]:
+    """Los k menores según key, de menor a mayor (sorted(items, key=key)[:k])."""
+    return heapq.nsmallest(k, items, key=key)
@@ -0,0 +1,303 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Text, Type
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa el json de la biblioteca estándar
+    orjson = None
+
+from .snapshot import parse_timestamp
+
+_MISSING = object()
+
+# Claves que no se guardan: versión interna de Mongoose
+_IGNORED = frozenset(("__v",))
+
+
+# ============================================
+# JSON
+# ============================================
+
+def loads(content: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def dumps(doc: Any) -> bytes:
+    """JSON compacto en UTF-8; los registros se escriben con la forma de la API."""
+    if orjson is not None:
+        return orjson.dumps(doc, default=_as_dict)
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=_as_dict).encode()
+
+
+def _as_dict(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.as_dict()
+    raise TypeError(f"{type(value).__name__} no es serializable a JSON")
+
+
+def _ref(value: Any) -> Any:
+    # Referencia poblada (documento) -> su ID
+    if isinstance(value, dict):
+        return value.get('_id') or value.get('id')
+    return value
+
+
+def _text(value: Any) -> Any:
+    # Estados y categorías se repiten en miles de documentos: una sola copia
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+# ============================================
+# REGISTROS
+# ============================================
+
+class Record(ABC):
+    """Documento de la API con campos fijos (__slots__) en lugar de un dict.
+
+    Las referencias pobladas se reducen a su ID, los valores por defecto
+    del modelo se aplican y los textos repetidos (estados) se comparten,
+    todo una sola vez al decodificar (from_doc): ocupa una fracción de la
+    memoria del dict y los bucles de agregación leen atributos
+    (order.total_amount) sin .get() ni alternativas. Las claves de la API
+    siguen funcionando (order.get('totalAmount'), order['orderNumber']),
+    así que un registro se usa donde se usaba el documento. Las claves que
+    el modelo no conoce se conservan en `extra`.
+    """
+
+    __slots__ = ("extra",)
+
+    # Clave de la API -> atributo (la primera clave de cada atributo es la que se escribe)
+    KEYS: Dict[Text, Text] = {}
+
+    extra: Optional[Dict[Text, Any]]
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls._known = frozenset(cls.KEYS) | _IGNORED
+        cls._output: Dict[Text, Text] = {}
+        for key, attribute in cls.KEYS.items():
+            cls._output.setdefault(attribute, key)
+
+    @classmethod
+    @abstractmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> Any:
+        """El registro del documento de la API (cada colección define el suyo)."""
+
+    @classmethod
+    def _extra(cls, doc: Dict[Text, Any]) -> Optional[Dict[Text, Any]]:
+        unknown = doc.keys() - cls._known
+        return {key: doc[key] for key in unknown} if unknown else None
+
+    def as_dict(self) -> Dict[Text, Any]:
+        """El documento con las claves de la API (para escribirlo como JSON)."""
+        doc = {}
+        for attribute, key in self._output.items():
+            value = getattr(self, attribute)
+            if value is not None:
+                doc[key] = value
+        if self.extra:
+            doc.update(self.extra)
+        return doc
+
+    # ---------- Lectura con las claves de la API ----------
+
+    def get(self, key: Text, default: Any = None) -> Any:
+        attribute = self.KEYS.get(key)
+        if attribute is None:
+            return self.extra.get(key, default) if self.extra else default
+        value = getattr(self, attribute)
+        return default if value is None else value
+
+    def __getitem__(self, key: Text) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _MISSING) is not _MISSING  # type: ignore[arg-type]
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, a) == getattr(other, a) for a in self._output) and self.extra == other.extra
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> Text:
+        return f"{type(self).__name__}({self.as_dict()!r})"
+
+
+class OrderItem(Record):
+    __slots__ = ("id", "product_id", "product_name", "quantity", "price")
+    KEYS = {"_id": "id", "id": "id", "productId": "product_id", "productName": "product_name",
+            "quantity": "quantity", "price": "price"}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> "OrderItem":
+        get = doc.get
+        item = cls.__new__(cls)
+        item.id = get('_id') or get('id')
+        item.product_id = _ref(get('productId'))
+        item.product_name = get('productName')
+        item.quantity = get('quantity') or 0
+        item.price = get('price') or 0
+        item.extra = cls._extra(doc)
+        return item
+
+
+class Order(Record):
+    __slots__ = ("id", "order_number", "customer_id", "customer_phone", "items", "total_amount", "status",
+                 "payment_status", "delivery_address", "notes", "created_at", "updated_at", "created_epoch")
+    KEYS = {"_id": "id", "id": "id", "orderNumber": "order_number", "customerId": "customer_id",
+            "customerPhone": "customer_phone", "items": "items", "totalAmount": "total_amount",
+            "status": "status", "paymentStatus": "payment_status", "deliveryAddress": "delivery_address",
+            "notes": "notes", "createdAt": "created_at", "updatedAt": "updated_at"}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> "Order":
+        get = doc.get
+        order = cls.__new__(cls)
+        order.id = get('_id') or get('id')
+        order.order_number = get('orderNumber')
+        order.customer_id = _ref(get('customerId'))
+        order.customer_phone = get('customerPhone')
+        order.items = tuple(map(OrderItem.from_doc, get('items') or ()))
+        order.total_amount = get('totalAmount') or 0
+        order.status = _text(get('status') or 'pending')
+        order.payment_status = _text(get('paymentStatus') or 'pending')
+        order.delivery_address = get('deliveryAddress')
+        order.notes = get('notes')
+        order.created_at = get('createdAt')
+        order.updated_at = get('updatedAt')
+        # createdAt en epoch (segundos), o None si falta o no se entiende
+        order.created_epoch = parse_timestamp(order.created_at)
+        order.extra = cls._extra(doc)
+        return order
+
+
+class Customer(Record):
+    __slots__ = ("id", "phone", "name", "email", "address", "total_orders", "total_spent",
+                 "created_at", "updated_at")
+    KEYS = {"_id": "id", "id": "id", "phone": "phone", "name": "name", "email": "email", "address": "address",
+            "totalOrders": "total_orders", "totalSpent": "total_spent",
+            "createdAt": "created_at", "updatedAt": "updated_at"}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> "Customer":
+        get = doc.get
+        customer = cls.__new__(cls)
+        customer.id = get('_id') or get('id')
+        customer.phone = get('phone')
+        customer.name = get('name')
+        customer.email = get('email')
+        customer.address = get('address')
+        customer.total_orders = get('totalOrders') or 0
+        customer.total_spent = get('totalSpent') or 0
+        customer.created_at = get('createdAt')
+        customer.updated_at = get('updatedAt')
+        customer.extra = cls._extra(doc)
+        return customer
+
+
+class Product(Record):
+    __slots__ = ("id", "name", "description", "price", "stock", "category", "image_url", "is_active",
+                 "created_at", "updated_at")
+    KEYS = {"_id": "id", "id": "id", "name": "name", "description": "description", "price": "price",
+            "stock": "stock", "category": "category", "imageUrl": "image_url", "isActive": "is_active",
+            "createdAt": "created_at", "updatedAt": "updated_at"}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> "Product":
+        get = doc.get
+        product = cls.__new__(cls)
+        product.id = get('_id') or get('id')
+        product.name = get('name')
+        product.description = get('description')
+        product.price = get('price') or 0
+        product.stock = get('stock') or 0
+        product.category = _text(get('category'))
+        product.image_url = get('imageUrl')
+        product.is_active = get('isActive', True)
+        product.created_at = get('createdAt')
+        product.updated_at = get('updatedAt')
+        product.extra = cls._extra(doc)
+        return product
+
+
+class Payment(Record):
+    __slots__ = ("id", "order_id", "order_number", "customer_id", "amount", "gateway", "culqi_order_id",
+                 "checkout_url", "method", "status", "transaction_id", "receipt_url", "created_at", "updated_at")
+    KEYS = {"_id": "id", "id": "id", "orderId": "order_id", "orderNumber": "order_number",
+            "customerId": "customer_id", "amount": "amount", "gateway": "gateway", "culqiOrderId": "culqi_order_id",
+            "checkoutUrl": "checkout_url", "method": "method", "status": "status",
+            "transactionId": "transaction_id", "receiptUrl": "receipt_url",
+            "createdAt": "created_at", "updatedAt": "updated_at"}
+
+    @classmethod
+    def from_doc(cls, doc: Dict[Text, Any]) -> "Payment":
+        get = doc.get
+        payment = cls.__new__(cls)
+        payment.id = get('_id') or get('id')
+        payment.order_id = _ref(get('orderId'))
+        payment.order_number = get('orderNumber')
+        payment.customer_id = _ref(get('customerId'))
+        payment.amount = get('amount') or 0
+        payment.gateway = _text(get('gateway'))
+        payment.culqi_order_id = get('culqiOrderId')
+        payment.checkout_url = get('checkoutUrl')
+        payment.method = _text(get('method'))
+        payment.status = _text(get('status') or 'pending')
+        payment.transaction_id = get('transactionId')
+        payment.receipt_url = get('receiptUrl')
+        payment.created_at = get('createdAt')
+        payment.updated_at = get('updatedAt')
+        payment.extra = cls._extra(doc)
+        return payment
+
+
+# Registro de cada colección de la API
+RECORDS: Dict[Text, Type[Record]] = {
+    "orders": Order,
+    "customers": Customer,
+    "products": Product,
+    "payments": Payment,
+}
+
+
+# ============================================
+# DECODIFICACIÓN
+# ============================================
+
+def to_record(collection: Text, doc: Any) -> Any:
+    """El documento como registro de su colección (sin cambios si la colección no tiene)."""
+    cls = RECORDS.get(collection)
+    if cls is None or not isinstance(doc, dict):
+        return doc
+    return cls.from_doc(doc)
+
+
+def to_records(collection: Text, docs: Iterable[Any]) -> List[Any]:
+    cls = RECORDS.get(collection)
+    if cls is None:
+        return list(docs)
+    from_doc = cls.from_doc
+    return [from_doc(doc) if isinstance(doc, dict) else doc for doc in docs]
+
+
+def decode(collection: Text, content: bytes) -> List[Any]:
+    """Decodifica la respuesta de la colección (un arreglo JSON) directo a registros."""
+    return to_records(collection, loads(content))
+
+
+def decoder(collection: Text) -> Callable[[bytes], Any]:
+    """Función que decodifica un documento de la colección (p. ej. una línea de un .jsonl)."""
+    cls = RECORDS.get(collection)
+    if cls is None:
+        return loads
+    from_doc = cls.from_doc
+    return lambda content: from_doc(loads(content))
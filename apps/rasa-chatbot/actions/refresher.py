@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Iterable, List, Optional, Text
+
+from .aggregator import sales_aggregator
+from .cache import SnapshotCache, snapshot_cache
+from .config import REFRESH_COLLECTIONS, REFRESH_IDLE_AFTER, REFRESH_INTERVAL
+from .executor import compute_executor
+from .sqlite_replica import sqlite_replica
+
+logger = logging.getLogger(__name__)
+
+
+class Refresher:
+    """Mantiene al día las colecciones en caché desde una tarea en segundo plano.
+
+    Cada `interval` segundos vuelve a descargar las colecciones a las que les
+    quedan menos de dos intervalos de vigencia (o que no están en caché),
+    reconstruye sus índices y pone al día el agregador de ventas (y la
+    réplica SQLite, si está activada). La entrada
+    nueva reemplaza a la anterior de una sola vez, y mientras tanto las
+    acciones siguen leyendo la anterior: la latencia de una conversación
+    nunca incluye una descarga completa.
+
+    Si pasan `idle_after` segundos sin que se llame a `touch()` (una acción
+    ejecutada), deja de descargar hasta la siguiente: un servidor sin
+    conversaciones no consulta la API. Con `idle_after=0` no se detiene.
+    """
+
+    def __init__(self, cache: SnapshotCache, collections: Iterable[Text], interval: float,
+                 idle_after: float = 0):
+        self._cache = cache
+        self._collections: List[Text] = list(collections)
+        self._interval = interval
+        self._idle_after = idle_after
+        self._last_action = time.monotonic()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def idle(self) -> bool:
+        return self._idle_after > 0 and time.monotonic() - self._last_action >= self._idle_after
+
+    def touch(self) -> None:
+        """Marca actividad: una acción acaba de empezar."""
+        self._last_action = time.monotonic()
+
+    def start(self) -> None:
+        """Lanza el refresco en el event loop en curso (una sola vez)."""
+        if not self.running:
+            self._last_action = time.monotonic()
+            self._task = asyncio.ensure_future(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            if not self.idle:
+                await self._refresh_due()
+            await asyncio.sleep(self._interval)
+
+    async def _refresh_due(self) -> None:
+        due = [name for name in self._collections if self._is_due(name)]
+        if due:
+            await asyncio.gather(*(self._refresh(name) for name in due))
+        try:
+            await sales_aggregator.sync()
+        except Exception as e:
+            logger.warning("Refresco: no se pudo sincronizar el agregador de ventas: %s", e)
+        if sqlite_replica is not None:
+            try:
+                await sqlite_replica.sync()
+            except Exception as e:
+                logger.warning("Refresco: no se pudo sincronizar la réplica SQLite: %s", e)
+
+    def _is_due(self, collection: Text) -> bool:
+        remaining = self._cache.expires_in(collection)
+        return remaining is None or remaining <= 2 * self._interval
+
+    async def _refresh(self, collection: Text) -> None:
+        try:
+            entry = await self._cache.refresh(collection)
+        except Exception as e:
+            logger.warning("Refresco: no se pudo descargar %s: %s", collection, e)
+            return
+        if entry is None:
+            return
+
+        if not self._cache.cacheable(collection, entry.nbytes):
+            # Sin TTL o más grande que la caché: refrescarla solo gasta ancho de banda
+            logger.warning("Refresco: %s no entra en la caché; se deja de refrescar", collection)
+            self._collections.remove(collection)
+            return
+
+        # Índices y agregados listos antes de que los pida una acción
+        snapshot = self._cache.peek(collection)
+        snapshot.build_indexes()
+        if collection == "orders":
+            try:
+                await compute_executor.order_stats(snapshot)
+            except Exception as e:
+                # La primera acción de ranking lo volverá a intentar
+                logger.warning("Refresco: no se pudieron calcular los agregados de órdenes: %s", e)
+
+
+refresher = Refresher(snapshot_cache, REFRESH_COLLECTIONS, REFRESH_INTERVAL, REFRESH_IDLE_AFTER)
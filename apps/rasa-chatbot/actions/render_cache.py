@@ -0,0 +1,73 @@
+import copy
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Text, Tuple
+
+from .config import RENDER_CACHE_MAX_BYTES
+
+Utterance = Tuple[Tuple[Any, ...], Dict[Text, Any]]
+
+# Lo que devuelve una ejecución: los mensajes enviados y los eventos
+Rendered = Tuple[List[Utterance], Any]
+
+
+class RenderCache:
+    """Respuestas ya armadas de las acciones de analíticas.
+
+    La clave lleva la versión de los datos que leyó la acción (ver
+    actions.singleflight.coalesced): mientras no cambien, la misma pregunta
+    recibe los mismos mensajes sin descargar ni calcular nada. Cuando los
+    datos cambian, las claves viejas dejan de pedirse y salen por LRU al
+    superar `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Rendered, int]]" = OrderedDict()
+        self._total_bytes = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Rendered]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            self._entries.move_to_end(key)
+        utterances, events = item[0]
+        # Los eventos se copian: quien los recibe (rasa_sdk) puede modificarlos
+        return utterances, copy.deepcopy(events)
+
+    def put(self, key: Hashable, utterances: List[Utterance], events: Any) -> None:
+        nbytes = _size(utterances, events)
+        if nbytes > self._max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[key] = ((utterances, copy.deepcopy(events)), nbytes)
+            self._total_bytes += nbytes
+            while self._total_bytes > self._max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+def _size(utterances: List[Utterance], events: Any) -> int:
+    # Aproximación: lo que ocuparían los mensajes y eventos serializados
+    return len(json.dumps([utterances, events], ensure_ascii=False, default=str).encode())
+
+
+render_cache = RenderCache(RENDER_CACHE_MAX_BYTES)
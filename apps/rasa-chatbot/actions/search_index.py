@@ -0,0 +1,153 @@
+import math
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Text
+
+from .ranking import top_k
+
+Document = Dict[Text, Any]
+
+# Fracción mínima de los trigramas de la consulta que debe tener un nombre
+# para contar como coincidencia aproximada (con errores de tipeo)
+MIN_COVERAGE = 0.5
+
+_EMPTY: FrozenSet[Any] = frozenset()
+
+
+def fold(text: Optional[Text]) -> Text:
+    """Texto para comparar: sin tildes, en minúsculas y solo letras y números.
+
+    "Café  Molido-500g" -> "cafe molido 500g". La ñ queda como n: en el
+    teclado del celular se escribe "pina" tanto como "piña".
+    """
+    decomposed = unicodedata.normalize("NFD", (text or "").casefold())
+    return " ".join("".join(
+        " " if not c.isalnum() else c for c in decomposed if not unicodedata.combining(c)
+    ).split())
+
+
+def trigrams(folded: Text) -> FrozenSet[Text]:
+    """Trigramas de cada palabra, con un espacio a cada lado ("cafe" -> " ca", "caf", "afe", "fe ")."""
+    grams: Set[Text] = set()
+    for token in folded.split():
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class SearchIndex:
+    """Índice invertido de trigramas para buscar por nombre.
+
+    Tolera tildes ("cafe" encuentra "Café"), mayúsculas y errores de tipeo
+    ("celuar" encuentra "Celular"). Los resultados se ordenan por:
+    coincidencia exacta, nombre que contiene la consulta, y luego por la
+    proporción de trigramas compartidos. Solo se comparan los nombres que
+    comparten algún trigrama con la consulta, no la colección entera.
+
+    Se actualiza por documento (updated): cuando llega una versión nueva de
+    la colección se aplican solo los documentos que cambiaron en lugar de
+    volver a indexar todo (ver CacheEntry.carry).
+    """
+
+    def __init__(self, text: Callable[[Document], Optional[Text]], key: Callable[[Document], Any],
+                 docs: Iterable[Document] = ()):
+        self._text = text
+        self._key = key
+        self._docs: Dict[Any, Document] = {}
+        self._names: Dict[Any, Text] = {}
+        self._grams: Dict[Any, FrozenSet[Text]] = {}
+        self._postings: Dict[Text, Set[Any]] = defaultdict(set)
+        # Posición de inserción: desempata igual que el orden de la colección
+        self._order: Dict[Any, int] = {}
+        self._next_order = 0
+        for doc in docs:
+            self.add(doc)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # ---------- Escritura ----------
+
+    def add(self, doc: Document) -> None:
+        """Indexa el documento (o reemplaza la versión anterior con el mismo _id)."""
+        key = self._key(doc)
+        if key is None:
+            key = id(doc)
+        if key in self._docs:
+            self.remove(key)
+        name = fold(self._text(doc))
+        grams = trigrams(name)
+        self._docs[key] = doc
+        self._names[key] = name
+        self._grams[key] = grams
+        if key not in self._order:
+            # Un contador y no len(): tras un borrado, len() repetiría una posición ya asignada
+            self._order[key] = self._next_order
+            self._next_order += 1
+        for gram in grams:
+            self._postings[gram].add(key)
+
+    def remove(self, key: Any) -> None:
+        if self._docs.pop(key, None) is None:
+            return
+        del self._names[key]
+        for gram in self._grams.pop(key):
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def updated(self, changed: Iterable[Document], removed: Iterable[Any]) -> "SearchIndex":
+        """Aplica los documentos nuevos o modificados y los borrados; devuelve el mismo índice."""
+        for key in removed:
+            self.remove(key)
+            self._order.pop(key, None)
+        for doc in changed:
+            self.add(doc)
+        return self
+
+    # ---------- Lectura ----------
+
+    def search(self, query: Optional[Text], limit: int = 5) -> List[Document]:
+        """Los documentos que mejor coinciden con la consulta, del mejor al peor."""
+        folded = fold(query)
+        if not folded:
+            return []
+        grams = trigrams(folded)
+
+        # 1) Los nombres que contienen la consulta. Tienen todos sus trigramas
+        # interiores (sin espacio): se intersecan sus listas, de la más corta
+        # a la más larga. Una o dos letras sueltas no tienen: se recorre.
+        interior = sorted((self._postings.get(gram, _EMPTY) for gram in grams if " " not in gram), key=len)
+        if interior:
+            candidates: Iterable[Any] = interior[0].intersection(*interior[1:])
+        else:
+            candidates = self._names
+        containing = {key for key in candidates if folded in self._names[key]}
+        found = top_k(containing, limit, key=lambda key: (
+            self._names[key] == folded, len(grams & self._grams[key]), -len(self._grams[key]), -self._order[key],
+        ))
+        if len(found) >= limit:
+            return [self._docs[key] for key in found]
+
+        # 2) Aproximados (errores de tipeo): por proporción de trigramas
+        # compartidos y, a igual proporción, los nombres más cortos (Dice)
+        shared: Counter = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        minimum = math.ceil(MIN_COVERAGE * len(grams))
+        by_count: Dict[int, List[Any]] = defaultdict(list)
+        for key, count in shared.items():
+            if count >= minimum and key not in containing:
+                by_count[count].append(key)
+        for count in sorted(by_count, reverse=True):
+            found += top_k(by_count[count], limit - len(found),
+                           key=lambda key: (-len(self._grams[key]), -self._order[key]))
+            if len(found) >= limit:
+                break
+        return [self._docs[key] for key in found]
+
+    def best(self, query: Optional[Text]) -> Optional[Document]:
+        found = self.search(query, limit=1)
+        return found[0] if found else None
+
@@ -0,0 +1,226 @@
+"""Action server multiproceso con un snapshot compartido.
+
+    cd apps/rasa-chatbot
+    python -m actions.server --workers 4 --port 5055
+
+Reemplaza a `rasa run actions` cuando un solo proceso no alcanza. El
+proceso principal es el cargador: descarga las colecciones (orders,
+customers, products y payments), las publica en archivos mapeados en
+memoria (actions.shared_snapshot) y las mantiene al día. Los workers
+atienden el mismo puerto (SO_REUSEPORT) y leen ese snapshot en lugar de
+descargar y guardar cada uno su copia.
+
+Este módulo solo importa la biblioteca estándar al cargarse: los workers
+se crean con "spawn" y deben definir su entorno antes de importar
+actions.config.
+"""
+import argparse
+import asyncio
+import inspect
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Text
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# WORKER
+# ============================================
+
+async def _shutdown(app: Any, loop: Any) -> None:
+    from . import http_client
+    from .executor import compute_executor
+
+    compute_executor.shutdown()
+    await http_client.close()
+
+
+def _serve(index: int, host: Text, port: int, cors: Text, env: Dict[Text, Text]) -> None:
+    os.environ.update(env)
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s [worker {index}] %(name)s %(levelname)s %(message)s")
+
+    from rasa_sdk import endpoint
+    from rasa_sdk.executor import ActionExecutor
+
+    from . import startup
+
+    executor = ActionExecutor()
+    executor.register_package("actions")
+    # rasa_sdk >= 3.7 recibe el executor; las versiones anteriores, el paquete
+    if "action_executor" in inspect.signature(endpoint.create_app).parameters:
+        app = endpoint.create_app(executor, cors_origins=cors)
+    else:
+        app = endpoint.create_app("actions", cors_origins=cors)
+    startup.install(app)
+    app.register_listener(_shutdown, "before_server_stop")
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+
+    # Sanic ya no debe crear procesos propios: cada worker es uno solo
+    options = {"sock": sock, "single_process": True, "access_log": False, "motd": False}
+    accepted = inspect.signature(app.run).parameters
+    app.run(**{name: value for name, value in options.items() if name in accepted})
+
+
+# ============================================
+# CARGADOR Y SUPERVISOR
+# ============================================
+
+class Supervisor:
+    """Lanza los workers y vuelve a lanzar los que terminan."""
+
+    def __init__(self, count: int, args: argparse.Namespace, env: Dict[Text, Text], metrics_port: int):
+        self._count = count
+        self._args = args
+        self._env = env
+        self._metrics_port = metrics_port
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[Optional[Any]] = [None] * count
+        self._stopping = False
+
+    def _spawn(self, index: int) -> None:
+        env = dict(self._env)
+        # Cada worker expone sus métricas en su propio puerto (0 las desactiva)
+        env["ACTIONS_METRICS_PORT"] = str(self._metrics_port + index if self._metrics_port > 0 else 0)
+        replica = os.getenv("ACTIONS_SQLITE_REPLICA", "")
+        if replica and replica != ":memory:":
+            # SQLite admite un solo escritor: cada worker mantiene su propio archivo
+            env["ACTIONS_SQLITE_REPLICA"] = f"{replica}.{index}"
+        worker = self._context.Process(
+            target=_serve, name=f"actions-worker-{index}",
+            args=(index, self._args.host, self._args.port, self._args.cors, env),
+        )
+        worker.start()
+        self._workers[index] = worker
+
+    def start(self) -> None:
+        for index in range(self._count):
+            self._spawn(index)
+
+    async def watch(self) -> None:
+        while not self._stopping:
+            for index, worker in enumerate(self._workers):
+                if worker is not None and not worker.is_alive() and not self._stopping:
+                    logger.warning("Worker %s terminó (código %s); se vuelve a lanzar", index, worker.exitcode)
+                    self._spawn(index)
+            await asyncio.sleep(1.0)
+
+    def stop(self) -> None:
+        self._stopping = True
+        for worker in self._workers:
+            if worker is not None and worker.is_alive():
+                worker.terminate()
+        for worker in self._workers:
+            if worker is not None:
+                worker.join(timeout=10)
+
+
+async def _publish_first(root: Path, collections: List[Text]) -> Any:
+    from .cache import snapshot_cache
+    from .shared_snapshot import publish
+
+    delay = 1.0
+    while True:
+        snapshot = await snapshot_cache.snapshot(*collections)
+        if all(getattr(snapshot, name) is not None for name in collections):
+            await asyncio.get_running_loop().run_in_executor(None, publish, root, snapshot, collections)
+            return snapshot.version
+        logger.warning("La API no devolvió %s; reintento en %.0fs", ", ".join(collections), delay)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+async def _run(args: argparse.Namespace, root: Path) -> None:
+    from . import http_client
+    from .cache import snapshot_cache
+    from .config import METRICS_PORT, REFRESH_COLLECTIONS, SHARED_SNAPSHOT_COLLECTIONS, SHARED_SNAPSHOT_INTERVAL
+    from .order_frame import np
+    from .persistence import persister
+    from .shared_snapshot import publish_forever
+
+    collections = list(SHARED_SNAPSHOT_COLLECTIONS)
+    if np is None:
+        logger.warning("numpy no está instalado: los rankings de órdenes recorrerán los documentos en cada worker")
+
+    if persister is not None:
+        # Con el snapshot guardado en disco, la primera publicación no espera a la API
+        persister.restore()
+    started = time.monotonic()
+    published = await _publish_first(root, collections)
+    logger.info("Snapshot compartido listo en %.2fs (%s)", time.monotonic() - started, root)
+
+    env = {
+        "ACTIONS_SHARED_SNAPSHOT_DIR": str(root),
+        # Lo compartido lo mantiene al día el cargador; cada worker refresca el resto
+        "ACTIONS_REFRESH_COLLECTIONS": ",".join(c for c in REFRESH_COLLECTIONS if c not in collections),
+        # El snapshot en disco lo guarda y restaura el cargador
+        "ACTIONS_PERSIST_DIR": "",
+    }
+    supervisor = Supervisor(args.workers, args, env, METRICS_PORT)
+    supervisor.start()
+    logger.info("%s workers atendiendo en %s:%s", args.workers, args.host, args.port)
+
+    loop = asyncio.get_running_loop()
+    stop = loop.create_future()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, lambda: stop.done() or stop.set_result(None))
+
+    tasks = [
+        asyncio.ensure_future(publish_forever(snapshot_cache, root, collections, SHARED_SNAPSHOT_INTERVAL,
+                                             published)),
+        asyncio.ensure_future(supervisor.watch()),
+    ]
+    if persister is not None:
+        persister.start()
+    try:
+        await stop
+    finally:
+        for task in tasks:
+            task.cancel()
+        supervisor.stop()
+        if persister is not None:
+            persister.stop()
+            await persister.flush()
+        await http_client.close()
+
+
+def main(argv: Optional[List[Text]] = None) -> None:
+    from .config import SERVER_WORKERS, SHARED_SNAPSHOT_DIR
+
+    parser = argparse.ArgumentParser(description="Action server multiproceso con snapshot compartido")
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="procesos que atienden acciones")
+    parser.add_argument("--host", default=os.getenv("SANIC_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=5055)
+    parser.add_argument("--cors", default="*")
+    parser.add_argument("--shared-dir", default=SHARED_SNAPSHOT_DIR,
+                        help="directorio del snapshot compartido (por defecto, uno temporal)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [cargador] %(name)s %(levelname)s %(message)s")
+    if not hasattr(socket, "SO_REUSEPORT"):
+        parser.error("este sistema no soporta SO_REUSEPORT; usa `rasa run actions`")
+
+    if args.shared_dir:
+        asyncio.run(_run(args, Path(args.shared_dir)))
+        return
+    # Directorio temporal propio: se borra al terminar (el de --shared-dir se conserva)
+    root = Path(tempfile.mkdtemp(prefix="actions-snapshot-"))
+    try:
+        asyncio.run(_run(args, root))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
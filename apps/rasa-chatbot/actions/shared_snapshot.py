@@ -0,0 +1,284 @@
+import asyncio
+import json
+import logging
+import math
+import mmap
+import os
+import shutil
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Text, Union
+
+from .cache import CacheEntry, SnapshotCache
+from .kernels import frame_stats, order_stats
+from .order_frame import OrderFrame, build_order_frame, np
+from .records import decoder, dumps
+from .snapshot import INDEXES, Document, Snapshot
+
+logger = logging.getLogger(__name__)
+
+# Archivo con el nombre de la generación vigente (se reemplaza de forma atómica)
+CURRENT = "current"
+MANIFEST = "manifest.json"
+
+# Generaciones anteriores que se conservan para los workers que aún las leen
+KEEP_GENERATIONS = 3
+
+# Las versiones del cargador se desplazan para no coincidir nunca con las que
+# asigna la caché propia de un worker a la misma colección
+VERSION_BASE = 1 << 40
+
+
+# ============================================
+# LECTURA (WORKERS)
+# ============================================
+
+class SharedDocuments(Sequence[Document]):
+    """Documentos de una colección guardados en un archivo mapeado en memoria.
+
+    El archivo tiene un documento JSON por línea y su tabla de offsets al
+    lado: todos los procesos mapean las mismas páginas (no hay una copia por
+    worker) y cada documento se decodifica (como registro de su colección,
+    según el nombre del archivo) solo cuando se lee.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._decode = decoder(path.stem)
+        self._documents = _map(path)
+        self._offsets = memoryview(_map(path.with_suffix(".offsets"))).cast("q")
+
+    def __reduce__(self) -> Any:
+        # Hacia otro proceso (pool de cálculo) viaja la ruta, no los documentos
+        return SharedDocuments, (self.path,)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return self._decode(self._documents[self._offsets[index]:self._offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[Document]:
+        offsets, documents, decode = self._offsets, self._documents, self._decode
+        for i in range(len(self)):
+            yield decode(documents[offsets[i]:offsets[i + 1]])
+
+    def save(self, path: Path) -> int:
+        """Guarda los documentos en `path` (y sus offsets) sin decodificarlos.
+
+        Enlaza los archivos mapeados si todavía existen; si no (generación ya
+        borrada u otro sistema de archivos) escribe la memoria mapeada.
+        Devuelve los bytes de los documentos.
+        """
+        try:
+            os.link(self.path, path)
+            os.link(self.path.with_suffix(".offsets"), path.with_suffix(".offsets"))
+        except OSError:
+            path.write_bytes(self._documents[:])
+            path.with_suffix(".offsets").write_bytes(self._offsets.tobytes())
+        return self._offsets[-1]
+
+
+class SharedIndex(Mapping[Any, Document]):
+    """Índice hash de Snapshot sobre documentos compartidos.
+
+    Guarda solo clave -> posición: buscar decodifica un único documento en
+    lugar de tener la colección entera decodificada en cada worker.
+    """
+
+    def __init__(self, documents: SharedDocuments, positions: Dict[Any, int]):
+        self._documents = documents
+        self.positions = positions
+
+    def __getitem__(self, key: Any) -> Document:
+        return self._documents[self.positions[key]]
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+def _map(path: Path) -> Any:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        # El mapa sigue siendo válido aunque el archivo se borre o se cierre
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class SharedSnapshotReader:
+    """Entradas de caché servidas desde la generación vigente del directorio compartido.
+
+    Se conecta con SnapshotCache.attach(reader.entry). Cada `check_interval`
+    segundos mira si el cargador publicó una generación nueva y, si es así,
+    la abre; los Snapshot ya entregados siguen leyendo la anterior. Cada
+    colección trae sus índices hash y las órdenes su OrderFrame mapeado en
+    memoria: ni las búsquedas ni los rankings recorren los documentos.
+    """
+
+    def __init__(self, root: Path, check_interval: float = 1.0):
+        self._root = root
+        self._check_interval = check_interval
+        self._checked_at = -math.inf
+        self._generation: Optional[Text] = None
+        self._entries: Dict[Text, CacheEntry] = {}
+
+    def entry(self, collection: Text) -> Optional[CacheEntry]:
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            self._reload()
+        return self._entries.get(collection)
+
+    def _reload(self) -> None:
+        try:
+            generation = (self._root / CURRENT).read_text().strip()
+            if generation != self._generation:
+                self._entries = open_generation(self._root / generation)
+                self._generation = generation
+        except OSError as e:
+            # Sin publicar todavía, o borrada mientras se abría: se reintenta luego
+            logger.debug("Snapshot compartido no disponible: %s", e)
+
+
+def current_generation(root: Path) -> Optional[Path]:
+    """Directorio de la generación vigente, o None si no se publicó ninguna."""
+    try:
+        return root / (root / CURRENT).read_text().strip()
+    except OSError:
+        return None
+
+
+def open_generation(directory: Path, version_base: int = VERSION_BASE) -> Dict[Text, CacheEntry]:
+    """Entradas de caché (sin vencimiento) de cada colección de la generación."""
+    manifest = json.loads((directory / MANIFEST).read_text())
+    entries = {}
+    for name, info in manifest["collections"].items():
+        documents = SharedDocuments(directory / f"{name}.jsonl")
+        entry = CacheEntry(documents, info["nbytes"], math.inf, version_base + info["version"],
+                           info.get("etag"), info.get("last_modified"), info.get("watermark"))
+        if info.get("full_time"):
+            # El reloj monotónico no sobrevive a un reinicio: se guarda la hora real
+            entry.full_at = time.monotonic() - max(0.0, time.time() - info["full_time"])
+        indexes = json.loads((directory / f"{name}.indexes.json").read_text())
+        for builder, pairs in indexes.items():
+            index = SharedIndex(documents, {key: position for key, position in pairs})
+            entry.derive(builder, lambda index=index: index)
+        entries[name] = entry
+
+    orders = entries.get("orders")
+    if orders is not None and manifest.get("frame") and np is not None:
+        frame = OrderFrame.load(directory)
+        orders.derive(build_order_frame.__name__, lambda: frame)
+        orders.derive(order_stats.__name__, lambda: frame_stats(frame))
+    return entries
+
+
+# ============================================
+# ESCRITURA (CARGADOR)
+# ============================================
+
+def publish(root: Path, snapshot: Snapshot, collections: List[Text]) -> Text:
+    """Escribe una generación nueva con las colecciones del snapshot y la
+    marca como vigente. Devuelve el nombre de la generación."""
+    root.mkdir(parents=True, exist_ok=True)
+    generation = f"gen-{time.time_ns()}"
+    staging = root / f"{generation}.tmp"
+    staging.mkdir()
+
+    manifest: Dict[Text, Any] = {"collections": {}, "frame": False}
+    for name in collections:
+        entry = snapshot.entry(name)
+        docs = entry.data
+        # Índices como pares [clave, posición] (las claves conservan su tipo)
+        if isinstance(docs, SharedDocuments):
+            # Sin cambios desde que se mapeó de otra generación: no se decodifica nada
+            nbytes = docs.save(staging / f"{name}.jsonl")
+            indexes = {
+                builder.__name__: list(snapshot.derive(name, builder).positions.items())
+                for builder in INDEXES.get(name, ())
+            }
+        else:
+            nbytes = _write_documents(staging / f"{name}.jsonl", docs)
+            positions = {id(doc): i for i, doc in enumerate(docs)}
+            indexes = {
+                builder.__name__: [[key, positions[id(doc)]] for key, doc in snapshot.derive(name, builder).items()]
+                for builder in INDEXES.get(name, ())
+            }
+        (staging / f"{name}.indexes.json").write_text(json.dumps(indexes, ensure_ascii=False))
+
+        manifest["collections"][name] = {
+            "version": entry.version, "count": len(docs), "nbytes": nbytes,
+            # Validadores, para revalidar (304 / deltas) al restaurar desde disco
+            "etag": entry.etag, "last_modified": entry.last_modified, "watermark": entry.watermark,
+            "full_time": time.time() - (time.monotonic() - entry.full_at) if entry.full_at else None,
+        }
+
+    if "orders" in collections:
+        frame = snapshot.derive("orders", build_order_frame)
+        if frame is not None:
+            frame.save(staging)
+            manifest["frame"] = True
+
+    (staging / MANIFEST).write_text(json.dumps(manifest))
+    staging.rename(root / generation)
+
+    pointer = root / f"{CURRENT}.{os.getpid()}.tmp"
+    pointer.write_text(generation)
+    os.replace(pointer, root / CURRENT)
+
+    _prune(root, generation)
+    return generation
+
+
+def _write_documents(path: Path, docs: Sequence[Document]) -> int:
+    offsets = array("q", [0])
+    with open(path, "wb") as f:
+        for doc in docs:
+            line = dumps(doc) + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+    path.with_suffix(".offsets").write_bytes(offsets.tobytes())
+    return offsets[-1]
+
+
+def _prune(root: Path, current: Text) -> None:
+    # Los workers que aún tienen mapeada una generación borrada la siguen leyendo sin problema
+    generations = sorted(p for p in root.glob("gen-*") if p.is_dir() and p.name != current)
+    for old in generations[:max(0, len(generations) - (KEEP_GENERATIONS - 1))]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+async def publish_forever(cache: SnapshotCache, root: Path, collections: List[Text], interval: float,
+                          published: Optional[Any] = None) -> None:
+    """Mantiene publicada la última versión de las colecciones (bucle del cargador).
+
+    Las colecciones se obtienen de la caché (con su TTL, deltas y peticiones
+    condicionales) y solo se escribe una generación cuando alguna cambió de
+    versión (`published` es la versión ya publicada, si la hay). La
+    escritura corre en un hilo para no frenar las descargas.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            snapshot = await cache.snapshot(*collections)
+            if all(getattr(snapshot, name) is not None for name in collections):
+                if snapshot.version != published:
+                    started = time.monotonic()
+                    generation = await loop.run_in_executor(None, publish, root, snapshot, collections)
+                    published = snapshot.version
+                    logger.info("Snapshot compartido %s publicado en %.2fs", generation, time.monotonic() - started)
+            else:
+                logger.warning("Snapshot compartido: la API no devolvió todas las colecciones")
+        except Exception as e:
+            logger.warning("Snapshot compartido: no se pudo publicar: %s", e)
+        await asyncio.sleep(interval)
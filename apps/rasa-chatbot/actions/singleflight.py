@@ -0,0 +1,101 @@
+import asyncio
+import copy
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Text, Tuple
+
+from . import metrics
+from .render_cache import Rendered, Utterance, render_cache
+
+
+class SingleFlight:
+    """Une las llamadas concurrentes con la misma clave en una sola ejecución.
+
+    La primera llamada ejecuta la función; las que llegan mientras sigue en
+    curso esperan ese mismo resultado (o excepción). Al terminar, la clave
+    se libera: esto no es una caché, solo evita repetir trabajo simultáneo.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Devuelve (resultado, compartido): compartido es True si se esperó la ejecución de otra llamada."""
+        future = self._inflight.get(key)
+        shared = future is not None
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._forget(key, f))
+        # shield: si esta llamada se cancela, la ejecución sigue para las demás
+        return await asyncio.shield(future), shared
+
+    def _forget(self, key: Hashable, future: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # evita el aviso si nadie la esperaba
+
+
+flights = SingleFlight()
+
+
+class _RecordingDispatcher:
+    """Guarda los mensajes de una ejecución para repetirlos a cada llamada unida."""
+
+    def __init__(self) -> None:
+        self.utterances: List[Utterance] = []
+        self.errors = False
+
+    def utter_message(self, *args: Any, **kwargs: Any) -> None:
+        text = kwargs.get("text") or (args[0] if args else None)
+        if isinstance(text, str) and text.startswith("❌"):
+            self.errors = True
+        self.utterances.append((args, kwargs))
+
+
+def coalesced(version: Callable[[], Optional[Hashable]], slots: Sequence[Text] = ()) -> Callable[..., Any]:
+    """Une las ejecuciones simultáneas e idénticas de una acción de analíticas
+    y guarda su respuesta en render_cache.
+
+    La clave es (acción, valores de `slots`, version()): version() debe
+    cambiar cuando cambian los datos que lee la acción, así una consulta
+    que empieza después de un cambio no recibe la respuesta anterior. Si
+    devuelve None (datos sin descargar o por sincronizar) las llamadas se
+    unen igual, pero la respuesta no se guarda. Tampoco se guardan las
+    respuestas de error ("❌") ni las de una ejecución durante la cual
+    cambiaron los datos. Cada llamada recibe los mismos mensajes en su
+    dispatcher y su propia copia de los eventos.
+
+    Va debajo de @instrumented, que mide cada llamada por separado.
+    """
+
+    def decorator(run: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(run)
+        async def wrapper(self: Any, dispatcher: Any, tracker: Any, domain: Any) -> Any:
+            token = version()
+            key = (self.name(), tuple(tracker.get_slot(name) for name in slots), token)
+
+            rendered = render_cache.get(key) if token is not None else None
+            if rendered is not None:
+                metrics.record_render_hit()
+                utterances, events = rendered
+            else:
+                async def execute() -> Rendered:
+                    recorder = _RecordingDispatcher()
+                    events = await run(self, recorder, tracker, domain)
+                    if token is not None and not recorder.errors and version() == token:
+                        render_cache.put(key, recorder.utterances, events)
+                    return recorder.utterances, events
+
+                (utterances, events), shared = await flights.do(key, execute)
+                if shared:
+                    metrics.record_coalesced()
+                events = copy.deepcopy(events)
+
+            for args, kwargs in utterances:
+                dispatcher.utter_message(*args, **kwargs)
+            return events
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,206 @@
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Text, Tuple
+
+from .search_index import SearchIndex
+
+Document = Dict[Text, Any]
+
+
+def doc_id(doc: Document) -> Optional[Text]:
+    return doc.get('_id') or doc.get('id')
+
+
+def ref_id(value: Any) -> Optional[Text]:
+    """Normaliza una referencia: puede venir como ID o como documento poblado."""
+    if isinstance(value, dict):
+        return doc_id(value)
+    return value
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Fecha ISO de la API ("2025-01-01T10:00:00.000Z") a epoch en segundos."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def normalize_name(name: Optional[Text]) -> Text:
+    return " ".join((name or "").casefold().split())
+
+
+# ============================================
+# CONSTRUCTORES DE ÍNDICES
+# ============================================
+
+def _index_by(docs: List[Document], key: Callable[[Document], Any]) -> Dict[Any, Document]:
+    index: Dict[Any, Document] = {}
+    for doc in docs:
+        value = key(doc)
+        if value:
+            # Igual que next(): ante duplicados gana el primero
+            index.setdefault(value, doc)
+    return index
+
+
+def _orders_by_number(orders: List[Document]) -> Dict[Text, Document]:
+    return _index_by(orders, lambda o: o.get('orderNumber'))
+
+
+def _customers_by_id(customers: List[Document]) -> Dict[Text, Document]:
+    return _index_by(customers, doc_id)
+
+
+def _customers_by_email(customers: List[Document]) -> Dict[Text, Document]:
+    return _index_by(customers, lambda c: (c.get('email') or '').casefold())
+
+
+def _customers_by_name(customers: List[Document]) -> Dict[Text, Document]:
+    return _index_by(customers, lambda c: normalize_name(c.get('name')))
+
+
+def _products_by_name(products: List[Document]) -> Dict[Text, Document]:
+    return _index_by(products, lambda p: normalize_name(p.get('name')))
+
+
+# Índices de cada colección (los que usan las búsquedas de Snapshot)
+INDEXES: Dict[Text, Tuple[Callable[[List[Document]], Dict[Any, Document]], ...]] = {
+    "orders": (_orders_by_number,),
+    "customers": (_customers_by_id, _customers_by_email, _customers_by_name),
+    "products": (_products_by_name,),
+}
+
+
+def _customers_search(customers: List[Document]) -> SearchIndex:
+    return SearchIndex(lambda c: c.get('name'), doc_id, customers)
+
+
+def _products_search(products: List[Document]) -> SearchIndex:
+    return SearchIndex(lambda p: p.get('name'), doc_id, products)
+
+
+# Índices de búsqueda aproximada por nombre (sin tildes, con errores de tipeo)
+SEARCH_INDEXES: Dict[Text, Callable[[List[Document]], SearchIndex]] = {
+    "customers": _customers_search,
+    "products": _products_search,
+}
+
+
+class Snapshot:
+    """Vista de solo lectura de las colecciones en caché con índices hash.
+
+    Los índices se construyen una sola vez por cada descarga de la colección
+    (quedan guardados en su entrada de caché), así que las búsquedas de las
+    acciones cuestan O(1) en lugar de recorrer la lista completa.
+    """
+
+    def __init__(self, entries: Dict[Text, Any]):
+        self._entries = entries
+
+    def _data(self, collection: Text) -> Optional[List[Document]]:
+        entry = self._entries.get(collection)
+        return entry.data if entry is not None else None
+
+    def entry(self, collection: Text) -> Optional[Any]:
+        """La entrada de caché de la colección (con sus validadores), o None."""
+        return self._entries.get(collection)
+
+    def derive(self, collection: Text, builder: Callable[[List[Document]], Any]) -> Optional[Any]:
+        """Derivado de la colección (índice, agregado...) calculado una vez por versión."""
+        entry = self._entries.get(collection)
+        if entry is None:
+            return None
+        return entry.derive(builder.__name__, lambda: builder(entry.data))
+
+    async def derive_async(self, collection: Text, builder: Callable[[List[Document]], Any],
+                           run: Callable[..., Awaitable[Any]]) -> Optional[Any]:
+        """Como derive, pero el cálculo se hace con `run(builder, datos)` fuera del event loop."""
+        entry = self._entries.get(collection)
+        if entry is None:
+            return None
+        return await entry.derive_async(builder.__name__, run, builder, entry.data)
+
+    def derived(self, collection: Text, builder: Callable[[List[Document]], Any]) -> Optional[Any]:
+        """El derivado si ya se calculó para esta versión (None si no; no lo calcula)."""
+        entry = self._entries.get(collection)
+        if entry is None:
+            return None
+        return entry.derived(builder.__name__)
+
+    def build_indexes(self) -> None:
+        """Construye por adelantado todos los índices de las colecciones presentes."""
+        for collection, builders in INDEXES.items():
+            for builder in builders:
+                self.derive(collection, builder)
+        for collection, search_builder in SEARCH_INDEXES.items():
+            self.derive(collection, search_builder)
+
+    def _index(self, collection: Text, builder: Callable[[List[Document]], Dict[Any, Document]]) -> Dict[Any, Document]:
+        index = self.derive(collection, builder)
+        return index if index is not None else {}
+
+    @property
+    def orders(self) -> Optional[List[Document]]:
+        return self._data("orders")
+
+    @property
+    def customers(self) -> Optional[List[Document]]:
+        return self._data("customers")
+
+    @property
+    def products(self) -> Optional[List[Document]]:
+        return self._data("products")
+
+    @property
+    def payments(self) -> Optional[List[Document]]:
+        return self._data("payments")
+
+    @property
+    def version(self) -> Tuple[Tuple[Text, Optional[int]], ...]:
+        return tuple(
+            (name, entry.version if entry is not None else None)
+            for name, entry in sorted(self._entries.items())
+        )
+
+    # ---------- Órdenes ----------
+
+    def order_by_number(self, order_number: Optional[Text]) -> Optional[Document]:
+        return self._index("orders", _orders_by_number).get(order_number)
+
+    # ---------- Clientes ----------
+
+    def customer(self, customer_ref: Any) -> Optional[Document]:
+        return self._index("customers", _customers_by_id).get(ref_id(customer_ref))
+
+    def customer_by_email(self, email: Optional[Text]) -> Optional[Document]:
+        return self._index("customers", _customers_by_email).get((email or '').casefold())
+
+    def find_customer(self, name: Optional[Text]) -> Optional[Document]:
+        """Busca por nombre exacto (O(1)) y si no, el más parecido (sin tildes, con errores de tipeo)."""
+        found = self._index("customers", _customers_by_name).get(normalize_name(name))
+        if found is None:
+            found = next(iter(self.search_customers(name, limit=1)), None)
+        return found
+
+    def search_customers(self, name: Optional[Text], limit: int = 5) -> List[Document]:
+        index = self.derive("customers", _customers_search)
+        return index.search(name, limit) if index is not None else []
+
+    # ---------- Productos ----------
+
+    def product_by_name(self, name: Optional[Text]) -> Optional[Document]:
+        return self._index("products", _products_by_name).get(normalize_name(name))
+
+    def find_product(self, name: Optional[Text]) -> Optional[Document]:
+        """Busca por nombre exacto (O(1)) y si no, el más parecido (sin tildes, con errores de tipeo)."""
+        found = self.product_by_name(name)
+        if found is None:
+            found = next(iter(self.search_products(name, limit=1)), None)
+        return found
+
+    def search_products(self, name: Optional[Text], limit: int = 5) -> List[Document]:
+        """Productos ordenados del que mejor coincide con el nombre al que menos."""
+        index = self.derive("products", _products_search)
+        return index.search(name, limit) if index is not None else []
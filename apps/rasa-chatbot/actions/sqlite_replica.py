@@ -0,0 +1,347 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Text, Tuple
+
+from .api_client import Page, api
+from .cache import snapshot_cache
+from .config import SQLITE_RECONCILE_INTERVAL, SQLITE_REPLICA, SQLITE_SYNC_INTERVAL
+from .snapshot import Document, doc_id, parse_timestamp, ref_id
+
+logger = logging.getLogger(__name__)
+
+# Filas que se insertan por tanda al cargar una tabla completa
+BATCH_SIZE = 5000
+
+
+class Table(NamedTuple):
+    """Cómo se guarda una colección: columnas, fila de cada documento e índices."""
+    columns: Tuple[Text, ...]
+    row: Callable[[Document], Tuple[Any, ...]]
+    indexes: Tuple[Tuple[Text, ...], ...]
+    # Campos que se piden a la API en los deltas
+    fields: Tuple[Text, ...]
+
+
+def _order_row(order: Document) -> Tuple[Any, ...]:
+    return (doc_id(order), order.get('orderNumber'), order.get('status'), order.get('paymentStatus'),
+            ref_id(order.get('customerId')), order.get('totalAmount') or 0,
+            parse_timestamp(order.get('createdAt')), order.get('updatedAt'))
+
+
+def _payment_row(payment: Document) -> Tuple[Any, ...]:
+    return (doc_id(payment), ref_id(payment.get('orderId')), payment.get('status'),
+            payment.get('amount') or 0, payment.get('updatedAt'))
+
+
+TABLES: Dict[Text, Table] = {
+    "orders": Table(
+        columns=("id", "orderNumber", "status", "paymentStatus", "customerId", "totalAmount", "createdAt", "updatedAt"),
+        row=_order_row,
+        # (status, paymentStatus) también sirve para filtrar solo por status
+        indexes=(("status", "paymentStatus"), ("paymentStatus",), ("createdAt",), ("customerId",), ("orderNumber",)),
+        fields=('_id', 'orderNumber', 'status', 'paymentStatus', 'customerId', 'totalAmount', 'createdAt', 'updatedAt'),
+    ),
+    "payments": Table(
+        columns=("id", "orderId", "status", "amount", "updatedAt"),
+        row=_payment_row,
+        indexes=(("status",), ("orderId",)),
+        fields=('_id', 'orderId', 'status', 'amount', 'updatedAt'),
+    ),
+}
+
+
+class SQLiteReplica:
+    """Copia de las órdenes y los pagos en SQLite para listarlos con filtros.
+
+    Los listados (por estado, estado de pago, cliente, número de orden o
+    rango de fechas, en cualquier combinación) se responden con una
+    consulta indexada con LIMIT y un COUNT sobre el mismo índice, en lugar
+    de recorrer la colección: su costo depende de cuántas órdenes cumplen
+    el filtro y no del historial completo. Las filas se devuelven en el
+    orden de la colección (rowid), igual que la API sin `sort`.
+
+    Se mantiene como el agregador de ventas: una carga completa desde la
+    caché de colecciones (reconciliación, cada SQLITE_RECONCILE_INTERVAL)
+    y deltas por updatedSince cada SQLITE_SYNC_INTERVAL. Con una ruta de
+    archivo, la réplica y sus watermarks sobreviven a un reinicio y solo
+    se piden los cambios desde entonces.
+
+    Toda la E/S de SQLite corre en un único hilo propio: la conexión nunca
+    se comparte entre hilos y el event loop no espera al disco. Mientras
+    la réplica no está cargada, las consultas devuelven None (el llamador
+    consulta la API) y la carga se lanza en segundo plano.
+    """
+
+    def __init__(self, path: Text):
+        self._path = path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="actions-sqlite")
+        self._db: Optional[sqlite3.Connection] = None  # solo desde el hilo de _executor
+        self._opened = False
+        self._watermarks: Dict[Text, Optional[Text]] = {}
+        # Epoch de la última carga completa: se guarda en la réplica, vale entre reinicios
+        self._reconciled_at: Optional[float] = None
+        self._synced_at = 0.0
+        self._sync_lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[bool]"] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._reconciled_at is not None
+
+    # ---------- Consultas ----------
+
+    async def list_orders(self, status: Optional[Text] = None,
+                          payment_status: Optional[Text] = None,
+                          customer_id: Optional[Text] = None,
+                          order_number: Optional[Text] = None,
+                          since: Optional[float] = None,
+                          until: Optional[float] = None,
+                          limit: Optional[int] = None) -> Optional[Page]:
+        """Órdenes que cumplen los filtros (createdAt en [since, until), en epoch)
+        y cuántas son; None si la réplica todavía no está cargada.
+
+        Cada orden trae las columnas de la tabla (createdAt en epoch).
+        """
+        conditions = [(f"{column} = ?", value) for column, value in (
+            ("status", status), ("paymentStatus", payment_status),
+            ("customerId", customer_id), ("orderNumber", order_number),
+        ) if value is not None]
+        if since is not None:
+            conditions.append(("createdAt >= ?", since))
+        if until is not None:
+            conditions.append(("createdAt < ?", until))
+        if not await self._fresh():
+            return None
+        return await self._call(self._select, "orders", conditions, limit)
+
+    async def payment_totals(self, status: Text) -> Optional[Tuple[int, float]]:
+        """(cantidad, monto total) de los pagos con ese estado; None si no está cargada."""
+        if not await self._fresh():
+            return None
+        return await self._call(self._totals, "payments", "amount", [("status = ?", status)])
+
+    # ---------- Escritura desde las acciones ----------
+
+    def apply(self, collection: Text, doc: Document) -> None:
+        """Aplica un documento que la acción acaba de modificar en la API.
+
+        La escritura se encola en el hilo de la réplica, delante de las
+        consultas siguientes: la próxima respuesta ya la ve.
+        """
+        if self.ready:
+            self._executor.submit(self._upsert, collection, [TABLES[collection].row(doc)])
+
+    def remove(self, collection: Text, key: Text) -> None:
+        if self.ready:
+            self._executor.submit(self._delete, collection, key)
+
+    # ---------- Sincronización ----------
+
+    async def sync(self) -> bool:
+        """Pone al día la réplica; devuelve False si no hay datos disponibles."""
+        async with self._sync_lock:
+            if not self._opened:
+                self._reconciled_at, self._watermarks = await self._call(self._open)
+                self._opened = True
+                if self.ready:
+                    logger.info("Réplica SQLite %s abierta (cargada hace %.0fs)",
+                                self._path, time.time() - self._reconciled_at)
+
+            if self._reconcile_due():
+                if not await self._reconcile():
+                    return self.ready
+            elif time.monotonic() - self._synced_at >= SQLITE_SYNC_INTERVAL:
+                await self._pull_deltas()
+            return True
+
+    async def _fresh(self) -> bool:
+        """True si la réplica puede responder; si no, lanza la carga en segundo plano."""
+        if self._sync_lock.locked():
+            # Carga o delta en curso: se responde con lo que ya está
+            return self.ready
+        if not self.ready or self._reconcile_due():
+            # La carga completa nunca corre dentro de una conversación
+            if self._task is None or self._task.done():
+                self._task = asyncio.ensure_future(self.sync())
+                self._task.add_done_callback(_log_failure)
+            return self.ready
+        return await self.sync()
+
+    def _reconcile_due(self) -> bool:
+        # Una tabla vacía queda sin marca de agua pero ya está cargada: sus
+        # deltas se piden sin updatedSince hasta que llegue el primer documento
+        return (self._reconciled_at is None
+                or time.time() - self._reconciled_at >= SQLITE_RECONCILE_INTERVAL)
+
+    async def _reconcile(self) -> bool:
+        started = time.monotonic()
+        watermarks: Dict[Text, Optional[Text]] = {}
+        try:
+            for name, table in TABLES.items():
+                # Se carga en una tabla aparte, por tandas: las consultas siguen
+                # leyendo la anterior entre tanda y tanda
+                await self._call(self._create, f"{name}_new", table)
+                watermark = None
+                async with snapshot_cache.stream(name) as docs:
+                    if docs is None:
+                        return False
+                    batch: List[Tuple[Any, ...]] = []
+                    async for doc in docs:
+                        batch.append(table.row(doc))
+                        updated_at = doc.get('updatedAt')
+                        if updated_at and (watermark is None or updated_at > watermark):
+                            watermark = updated_at
+                        if len(batch) >= BATCH_SIZE:
+                            await self._call(self._insert, f"{name}_new", table, batch)
+                            batch = []
+                    await self._call(self._insert, f"{name}_new", table, batch)
+                for number, columns in enumerate(table.indexes):
+                    await self._call(self._index, f"{name}_new", columns, number)
+                watermarks[name] = watermark
+        except BaseException:
+            for name in TABLES:
+                self._executor.submit(self._drop, f"{name}_new")
+            raise
+
+        reconciled_at = time.time()
+        await self._call(self._swap, watermarks, reconciled_at)
+        self._watermarks = watermarks
+        self._reconciled_at = reconciled_at
+        self._synced_at = time.monotonic()
+        logger.info("Réplica SQLite cargada en %.2fs", time.monotonic() - started)
+        return True
+
+    async def _pull_deltas(self) -> None:
+        pages = await asyncio.gather(
+            api.list_orders(updated_since=self._watermarks["orders"], fields=TABLES["orders"].fields),
+            api.list_payments(updated_since=self._watermarks["payments"], fields=TABLES["payments"].fields),
+        )
+        synced = True
+        for (name, table), page in zip(TABLES.items(), pages):
+            if page is None:
+                synced = False
+                continue
+            if not page.items:
+                continue
+            updates = [d['updatedAt'] for d in page.items if d.get('updatedAt')]
+            if self._watermarks[name]:
+                updates.append(self._watermarks[name])
+            watermark = max(updates, default=None)
+            await self._call(self._upsert, name, [table.row(d) for d in page.items], watermark)
+            self._watermarks[name] = watermark
+        if synced:
+            self._synced_at = time.monotonic()
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # ---------- En el hilo de la réplica ----------
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self._path, isolation_level=None)
+            # WAL: escribir un delta no bloquea el archivo para leer (sin efecto en :memory:)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return self._db
+
+    def _open(self) -> Tuple[Optional[float], Dict[Text, Optional[Text]]]:
+        db = self._connection()
+        for name, table in TABLES.items():
+            if db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is None:
+                self._create(name, table)
+                for number, columns in enumerate(table.indexes):
+                    self._index(name, columns, number)
+        meta = dict(db.execute("SELECT key, value FROM meta"))
+        reconciled_at = float(meta["reconciled_at"]) if "reconciled_at" in meta else None
+        return reconciled_at, {name: meta.get(f"watermark:{name}") for name in TABLES}
+
+    def _create(self, name: Text, table: Table) -> None:
+        db = self._connection()
+        db.execute(f"DROP TABLE IF EXISTS {name}")
+        columns = ", ".join(("id TEXT PRIMARY KEY",) + table.columns[1:])
+        db.execute(f"CREATE TABLE {name} ({columns})")
+
+    def _index(self, name: Text, columns: Sequence[Text], number: int) -> None:
+        # El nombre lleva la hora de creación: la tabla nueva se renombra y sus
+        # índices no deben chocar con los de la próxima carga
+        stamp = time.time_ns()
+        self._connection().execute(
+            f"CREATE INDEX ix_{name}_{number}_{stamp} ON {name} ({', '.join(columns)})")
+
+    def _insert(self, name: Text, table: Table, rows: List[Tuple[Any, ...]]) -> None:
+        db = self._connection()
+        placeholders = ", ".join("?" * len(table.columns))
+        with db:
+            db.executemany(f"INSERT OR REPLACE INTO {name} VALUES ({placeholders})", rows)
+
+    def _swap(self, watermarks: Dict[Text, Optional[Text]], reconciled_at: float) -> None:
+        db = self._connection()
+        db.execute("BEGIN")
+        try:
+            for name in TABLES:
+                db.execute(f"DROP TABLE IF EXISTS {name}")
+                db.execute(f"ALTER TABLE {name}_new RENAME TO {name}")
+                db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"watermark:{name}", watermarks[name]))
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('reconciled_at', ?)", (repr(reconciled_at),))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _upsert(self, name: Text, rows: List[Tuple[Any, ...]], watermark: Optional[Text] = None) -> None:
+        table = TABLES[name]
+        db = self._connection()
+        placeholders = ", ".join("?" * len(table.columns))
+        # ON CONFLICT ... DO UPDATE conserva el rowid: la orden no cambia de lugar
+        updates = ", ".join(f"{column} = excluded.{column}" for column in table.columns[1:])
+        with db:
+            db.executemany(f"INSERT INTO {name} VALUES ({placeholders}) "
+                           f"ON CONFLICT(id) DO UPDATE SET {updates}", rows)
+            if watermark is not None:
+                db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (f"watermark:{name}", watermark))
+
+    def _delete(self, name: Text, key: Text) -> None:
+        db = self._connection()
+        with db:
+            db.execute(f"DELETE FROM {name} WHERE id = ?", (key,))
+
+    def _drop(self, name: Text) -> None:
+        self._connection().execute(f"DROP TABLE IF EXISTS {name}")
+
+    def _select(self, name: Text, conditions: List[Tuple[Text, Any]], limit: Optional[int]) -> Page:
+        columns = TABLES[name].columns
+        where, params = _where(conditions)
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(columns)} FROM {name}{where} ORDER BY rowid LIMIT ?",
+            params + [limit if limit is not None else -1])
+        items = [dict(zip(columns, row)) for row in cursor]
+        if limit is None or len(items) < limit:
+            total = len(items)
+        else:
+            total = self._connection().execute(f"SELECT COUNT(*) FROM {name}{where}", params).fetchone()[0]
+        return Page(items, total)
+
+    def _totals(self, name: Text, column: Text, conditions: List[Tuple[Text, Any]]) -> Tuple[int, float]:
+        where, params = _where(conditions)
+        count, total = self._connection().execute(
+            f"SELECT COUNT(*), TOTAL({column}) FROM {name}{where}", params).fetchone()
+        return count, total
+
+
+def _where(conditions: List[Tuple[Text, Any]]) -> Tuple[Text, List[Any]]:
+    if not conditions:
+        return "", []
+    return " WHERE " + " AND ".join(c for c, _ in conditions), [v for _, v in conditions]
+
+
+def _log_failure(task: "asyncio.Task[bool]") -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("No se pudo cargar la réplica SQLite: %s", task.exception())
+
+
+sqlite_replica = SQLiteReplica(SQLITE_REPLICA) if SQLITE_REPLICA else None
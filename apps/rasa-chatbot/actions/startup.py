@@ -0,0 +1,232 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional, Text
+
+from . import metrics
+from .aggregator import sales_aggregator
+from .cache import snapshot_cache
+from .config import REFRESH_ENABLED, SHARED_SNAPSHOT_DIR, WARM_START, WARM_START_COLLECTIONS, WARM_START_TIMEOUT
+from .executor import compute_executor
+from .persistence import persister
+from .refresher import refresher
+from .shared_snapshot import SharedSnapshotReader
+from .sqlite_replica import sqlite_replica
+
+logger = logging.getLogger(__name__)
+
+# Se activa cuando termina la precarga (de inmediato si está desactivada).
+# Es un threading.Event porque lo consulta GET /ready desde el hilo de métricas.
+_ready = threading.Event()
+_task: Optional["asyncio.Future[bool]"] = None
+
+_started = False      # precarga / refresco ya lanzados
+_deferred = False     # respaldo: se lanzan con la primera acción si no arrancó ningún servidor
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+# ============================================
+# PRECARGA
+# ============================================
+
+async def warm_start(collections: Iterable[Text] = WARM_START_COLLECTIONS,
+                     timeout: float = WARM_START_TIMEOUT) -> bool:
+    """Descarga e indexa las colecciones antes de recibir tráfico.
+
+    Deja en caché las colecciones con sus índices y los agregados de ranking,
+    el agregador de ventas reconciliado, la réplica SQLite cargada (si está
+    activada) y una conexión keep-alive abierta hacia la API. Si la API todavía no responde reintenta con espera
+    creciente hasta `timeout`; al terminar (bien o no) marca el servidor
+    como listo. Devuelve True si la precarga se completó.
+    """
+    collections = tuple(collections)
+    started = time.monotonic()
+    delay = 1.0
+    try:
+        while True:
+            results = await asyncio.gather(*(snapshot_cache.get(name) for name in collections),
+                                           return_exceptions=True)
+            missing = [
+                f"{name} ({type(result).__name__}: {result})" if isinstance(result, BaseException) else name
+                for name, result in zip(collections, results)
+                if result is None or isinstance(result, BaseException)
+            ]
+            if not missing:
+                break
+            if time.monotonic() - started + delay > timeout:
+                logger.warning("Precarga incompleta tras %.0fs (%s); se atiende en frío",
+                               time.monotonic() - started, ", ".join(missing))
+                return False
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+        snapshot = snapshot_cache.peek(*collections)
+        snapshot.build_indexes()
+        await compute_executor.order_stats(snapshot)
+        # Con las órdenes en caché, la reconciliación las recorre sin descargarlas
+        await sales_aggregator.sync()
+        if sqlite_replica is not None:
+            await sqlite_replica.sync()
+
+        logger.info("Precarga lista en %.2fs: %s", time.monotonic() - started, ", ".join(collections))
+        return True
+    finally:
+        _ready.set()
+
+
+def schedule() -> Optional["asyncio.Future[bool]"]:
+    """Lanza warm_start en el event loop en curso (una sola vez)."""
+    global _task
+    if _task is None:
+        _task = asyncio.ensure_future(warm_start())
+    return _task
+
+
+# ============================================
+# ENGANCHE CON EL ACTION SERVER
+# ============================================
+
+def _start_background() -> None:
+    global _started
+    if _started:
+        return
+    _started = True
+    # /metrics y /ready del proceso que atiende las acciones
+    metrics.start_server(ready=is_ready)
+    if SHARED_SNAPSHOT_DIR:
+        snapshot_cache.attach(SharedSnapshotReader(Path(SHARED_SNAPSHOT_DIR)).entry)
+    if persister is not None:
+        persister.restore()
+    if WARM_START:
+        schedule()
+    if REFRESH_ENABLED:
+        metrics.on_action(refresher.touch)
+        refresher.start()
+    if persister is not None:
+        persister.start()
+
+
+def _start_deferred() -> None:
+    if not _started:
+        logger.warning("El action server arrancó sin el listener de startup.py; precarga y refresco "
+                       "empiezan con la primera acción")
+        _start_background()
+
+
+async def _after_server_start(app: Any, loop: Any) -> None:
+    _start_background()
+
+
+async def _before_server_stop(app: Any, loop: Any) -> None:
+    if persister is not None:
+        try:
+            await persister.flush()
+        except Exception as e:
+            logger.warning("No se pudo guardar el snapshot en disco al detener: %s", e)
+    metrics.stop_server()
+
+
+async def _ready_route(request: Any) -> Any:
+    from sanic.response import text
+
+    if is_ready():
+        return text("ready\n")
+    return text("warming up\n", status=503)
+
+
+def _listen(app: Any) -> None:
+    """Registra los listeners de arranque y parada y GET /ready en la app."""
+    if getattr(app.ctx, "actions_startup", False):
+        return
+    app.ctx.actions_startup = True
+    app.register_listener(_after_server_start, "after_server_start")
+    app.register_listener(_before_server_stop, "before_server_stop")
+    # En el puerto de las acciones: ahí lo alcanza el readiness probe del contenedor
+    app.add_route(_ready_route, "/ready", methods=["GET"], name="actions_ready")
+
+
+def _patch_loader(loader: Any) -> None:
+    """Hace que `loader.load()` (el AppLoader de Sanic) registre _listen en
+    la app "rasa_sdk" que crea, en cada proceso donde se llame."""
+    load = loader.load
+    if getattr(load, "_actions_startup", False):
+        return
+
+    @functools.wraps(load)
+    def load_app(self: Any, *args: Any, **kwargs: Any) -> Any:
+        app = load(self, *args, **kwargs)
+        if getattr(app, "name", None) == "rasa_sdk":
+            _listen(app)
+        return app
+
+    load_app._actions_startup = True  # type: ignore[attr-defined]
+    loader.load = load_app
+
+
+def _sanic_app() -> Optional[Any]:
+    try:
+        from sanic import Sanic
+
+        return Sanic.get_app("rasa_sdk")
+    except Exception:
+        return None  # sin Sanic, o la app todavía no existe
+
+
+def install(app: Any = None) -> None:
+    """Programa la precarga y el refresco para cuando arranque el action server.
+
+    Todo arranca en el listener after_server_start de la app de Sanic que
+    atiende las acciones, en el event loop donde viven la sesión HTTP y las
+    descargas en curso: también el endpoint de métricas, que así publica
+    las mediciones del worker. Al importar el paquete no se lanza nada.
+
+    rasa_sdk >= 3.7 importa las acciones antes de crear la app, en el
+    proceso principal y de nuevo en cada worker de Sanic, que la crea con
+    su AppLoader: por eso se intercepta AppLoader.load y los listeners
+    quedan en la app de cada worker. Con versiones que crean la app antes
+    de importar las acciones se registran en ella directamente, y
+    actions.server la pasa en `app`. Si aun así ningún servidor arranca, la
+    primera acción los lanza.
+
+    GET /ready, en el puerto de las acciones, responde 503 hasta que
+    termina la precarga; sin ACTIONS_WARM_START=1, 200 de inmediato. Con
+    ACTIONS_SHARED_SNAPSHOT_DIR la caché lee primero el snapshot publicado
+    por el proceso cargador. Con ACTIONS_PERSIST_DIR restaura al arrancar
+    las colecciones guardadas en disco, las guarda periódicamente y una
+    última vez al detener el servidor.
+    """
+    global _deferred
+    if not WARM_START:
+        _ready.set()
+    if app is not None:
+        _listen(app)
+        return
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        # Ya dentro del event loop que atiende las acciones
+        _start_background()
+        return
+
+    current = _sanic_app()
+    if current is not None:
+        _listen(current)
+    try:
+        from sanic.worker.loader import AppLoader
+    except ImportError:
+        pass
+    else:
+        _patch_loader(AppLoader)
+
+    if not _deferred:
+        _deferred = True
+        metrics.on_action(_start_deferred)
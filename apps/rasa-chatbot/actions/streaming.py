@@ -0,0 +1,103 @@
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, List
+
+from . import metrics
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+class JsonArrayParser:
+    """Parser incremental de un arreglo JSON que llega por partes.
+
+    Recibe los bytes tal como llegan de la red y devuelve cada elemento del
+    arreglo apenas está completo, así nunca se tiene en memoria más que el
+    pedazo pendiente y el elemento en curso (no la respuesta entera ni la
+    lista completa de documentos). Cada elemento se decodifica con el
+    decodificador en C de la librería estándar.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._expect_comma = False
+        self._after_comma = False  # la coma ya se leyó y falta el elemento que la sigue
+        self._finished = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Agrega bytes y devuelve los elementos que quedaron completos."""
+        self._buffer += self._utf8.decode(chunk)
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        """Termina el parseo; falla si el arreglo quedó incompleto."""
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self._finished or self._buffer.strip(_WHITESPACE):
+            raise ValueError("Respuesta JSON incompleta: se esperaba un arreglo cerrado")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        buffer = self._buffer
+        pos = 0
+        size = len(buffer)
+
+        while not self._finished:
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == size:
+                break
+
+            char = buffer[pos]
+            if not self._started:
+                if char != "[":
+                    raise ValueError("Se esperaba un arreglo JSON")
+                self._started = True
+                pos += 1
+            elif char == "]":
+                if self._after_comma:
+                    raise ValueError(f"Coma sobrante antes de ']' en la posición {pos}")
+                self._finished = True
+                pos += 1
+            elif self._expect_comma:
+                if char != ",":
+                    raise ValueError(f"Se esperaba ',' en la posición {pos}")
+                self._expect_comma = False
+                self._after_comma = True
+                pos += 1
+            else:
+                try:
+                    item, end = self._decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if final:
+                        raise
+                    break  # elemento incompleto: esperar más bytes
+                # Un número cortado ("12" de "12.5") se decodifica igual: solo
+                # se acepta el elemento si ya llegó el separador que lo sigue
+                if not final and (end == size or buffer[end] not in _DELIMITERS):
+                    break
+                items.append(item)
+                self._expect_comma = True
+                self._after_comma = False
+                pos = end
+
+        self._buffer = buffer[pos:]
+        return items
+
+
+async def iter_json_array(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """Recorre los elementos de un arreglo JSON a medida que llegan sus bytes."""
+    parser = JsonArrayParser()
+    async for chunk in chunks:
+        with metrics.phase("decode"):
+            items = parser.feed(chunk)
+        for item in items:
+            yield item
+    with metrics.phase("decode"):
+        items = parser.close()
+    for item in items:
+        yield item
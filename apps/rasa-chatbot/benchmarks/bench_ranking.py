@@ -0,0 +1,77 @@
+"""Benchmark: ordenar todo vs. top-k con heap para las acciones de ranking.
+
+Uso (desde apps/rasa-chatbot):
+
+    python -m benchmarks.bench_ranking
+    python -m benchmarks.bench_ranking --sizes 100000 1000000 --repeat 5
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from actions.ranking import bottom_k, top_k
+
+
+def make_orders(n: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    return [
+        {
+            'orderNumber': f"ORD-{i:07d}",
+            'totalAmount': round(rng.uniform(5, 2000), 2),
+            'createdAt': (start + timedelta(seconds=rng.randrange(60 * 60 * 24 * 365))).isoformat(),
+            'stock': rng.randrange(0, 500),
+        }
+        for i in range(n)
+    ]
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run(sizes: List[int], k: int, repeat: int) -> None:
+    recent_key = lambda o: o['createdAt']
+    stock_key = lambda o: o['stock']
+
+    print(f"{'n':>9} {'caso':<22} {'sorted (ms)':>12} {'heap (ms)':>10} {'speedup':>8}")
+    for n in sizes:
+        orders = make_orders(n)
+        cases = [
+            (
+                f"últimas {k} órdenes",
+                lambda: sorted(orders, key=recent_key, reverse=True)[:k],
+                lambda: top_k(orders, k, key=recent_key),
+            ),
+            (
+                "menor stock",
+                lambda: sorted(orders, key=stock_key)[0],
+                lambda: bottom_k(orders, 1, key=stock_key)[0],
+            ),
+        ]
+        for name, baseline, candidate in cases:
+            assert baseline() == candidate(), name
+            t_sorted = best_of(repeat, baseline)
+            t_heap = best_of(repeat, candidate)
+            print(f"{n:>9} {name:<22} {t_sorted * 1000:>12.1f} {t_heap * 1000:>10.1f} "
+                  f"{t_sorted / t_heap:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: documentos como dict (json.loads) vs. registros (actions.records).
+
+Mide, por colección, el tiempo de decodificar la respuesta de la API, la
+memoria que ocupa la lista decodificada y el tiempo de una pasada de
+agregación sobre las órdenes (la de OrderStats) leyendo claves con .get()
+en los dicts y atributos en los registros.
+
+Uso (desde apps/rasa-chatbot):
+
+    python -m benchmarks.bench_records
+    python -m benchmarks.bench_records --orders 10000 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from actions.kernels import collect_stats
+from actions.records import decode, orjson
+from actions.snapshot import parse_timestamp, ref_id
+from benchmarks.synthetic import generate
+
+Document = Dict[str, Any]
+
+
+def dict_stats(orders: List[Document]) -> Tuple[Counter, Dict[str, float], Dict[str, float]]:
+    """La pasada de OrderStats como era sobre dicts: .get() con valores por defecto."""
+    statuses: Counter = Counter()
+    customers: Dict[str, float] = {}
+    products: Dict[str, float] = {}
+    for order in orders:
+        statuses[order.get('status') or ''] += 1
+        customer_id = ref_id(order.get('customerId'))
+        if customer_id:
+            customers[customer_id] = customers.get(customer_id, 0) + order.get('totalAmount', 0)
+        parse_timestamp(order.get('createdAt'))
+        for item in order.get('items', []):
+            name = item.get('productName', '')
+            if name:
+                products[name] = products.get(name, 0) + item.get('price', 0) * item.get('quantity', 0)
+    return statuses, customers, products
+
+
+def measure(decoder: Callable[[], List[Any]]) -> Tuple[List[Any], float, int]:
+    """(documentos, segundos de decodificación, bytes que ocupan)."""
+    start = time.perf_counter()
+    docs = decoder()
+    elapsed = time.perf_counter() - start
+    del docs
+    tracemalloc.start()
+    docs = decoder()
+    nbytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return docs, elapsed, nbytes
+
+
+def run(sizes: List[int]) -> None:
+    print(f"orjson: {'sí' if orjson is not None else 'no (json estándar)'}")
+    print(f"{'colección':<10} {'n':>7} {'dict (ms)':>10} {'registros (ms)':>15} {'dict (MB)':>10} "
+          f"{'registros (MB)':>15} {'memoria':>8}")
+    for n in sizes:
+        data = generate(orders=n)
+        for name, docs in data.items():
+            content = json.dumps(docs, ensure_ascii=False).encode()
+            dicts, t_dict, m_dict = measure(lambda: json.loads(content))
+            records, t_records, m_records = measure(lambda name=name: decode(name, content))
+            print(f"{name:<10} {len(docs):>7} {t_dict * 1000:>10.1f} {t_records * 1000:>15.1f} "
+                  f"{m_dict / 2**20:>10.1f} {m_records / 2**20:>15.1f} {m_records / m_dict:>7.0%}")
+            if name == "orders":
+                start = time.perf_counter()
+                dict_stats(dicts)
+                t_loop_dict = time.perf_counter() - start
+                start = time.perf_counter()
+                collect_stats(records)
+                t_loop_records = time.perf_counter() - start
+                print(f"{'':<10} {'':>7} agregación: dict {t_loop_dict * 1000:.1f} ms, "
+                      f"registros {t_loop_records * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args()
+    run(args.orders)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark: búsqueda por nombre recorriendo la lista vs. índice de trigramas.
+
+Compara la búsqueda que hacían ActionGetProductStock y ActionSearchCustomer
+(nombre exacto y si no, el primero que contiene el texto) con
+actions.search_index, en tiempo por consulta y en aciertos para consultas
+escritas como en WhatsApp: exactas, sin tildes y con un error de tipeo.
+
+Uso (desde apps/rasa-chatbot):
+
+    python -m benchmarks.bench_search
+    python -m benchmarks.bench_search --sizes 1000 10000 50000 --queries 300
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from actions.search_index import SearchIndex, fold
+from actions.snapshot import doc_id, normalize_name
+from benchmarks.synthetic import generate
+
+Document = Dict[str, Any]
+
+PRODUCT_NAMES = [
+    "Café Molido", "Azúcar Rubia", "Leche Evaporada", "Atún en Aceite", "Piña en Almíbar", "Galletas de Soda",
+    "Jabón de Tocador", "Champú Anticaspa", "Plátano de Isla", "Limón Sutil", "Ají Amarillo", "Té Verde",
+]
+
+
+def make_products(n: int, seed: int = 42) -> List[Document]:
+    """Productos con nombres con tildes y ñ (los sintéticos no tienen)."""
+    rng = random.Random(seed)
+    products = generate(orders=0, products=n, customers=1)["products"]
+    for product in products:
+        product["name"] = f"{rng.choice(PRODUCT_NAMES)} {rng.choice(['500g', '1kg', 'x6', 'Premium', 'Familiar'])} " \
+                          f"{product['name'].split()[1]}"
+    return products
+
+
+def scan(docs: List[Document], query: str) -> Optional[Document]:
+    """La búsqueda anterior: nombre exacto y si no, el primero que lo contiene."""
+    key = normalize_name(query)
+    exact = next((d for d in docs if normalize_name(d.get('name')) == key), None)
+    return exact or next((d for d in docs if key in normalize_name(d.get('name'))), None)
+
+
+def typo(text: str, rng: random.Random) -> str:
+    """Un error de tipeo: dos letras vecinas intercambiadas o una letra de menos."""
+    words = text.split()
+    i = max(range(len(words)), key=lambda j: len(words[j]))
+    word = words[i]
+    if len(word) > 3:
+        j = rng.randrange(1, len(word) - 2)
+        word = word[:j] + word[j + 1] + word[j] + word[j + 2:] if rng.random() < 0.5 else word[:j] + word[j + 1:]
+    words[i] = word
+    return " ".join(words)
+
+
+def make_queries(docs: List[Document], count: int, seed: int = 7) -> Dict[str, List[Tuple[str, Any]]]:
+    rng = random.Random(seed)
+    targets = [rng.choice(docs) for _ in range(count)]
+    return {
+        "exacta": [(t['name'].lower(), doc_id(t)) for t in targets],
+        "sin tildes": [(fold(t['name']), doc_id(t)) for t in targets],
+        "con error": [(typo(fold(t['name']), rng), doc_id(t)) for t in targets],
+    }
+
+
+def measure(queries: List[Tuple[str, Any]], find: Callable[[str], Optional[Document]]) -> Tuple[float, float]:
+    """(microsegundos por consulta, proporción de consultas que encuentran su documento)."""
+    hits = 0
+    start = time.perf_counter()
+    for query, expected in queries:
+        found = find(query)
+        hits += found is not None and doc_id(found) == expected
+    return (time.perf_counter() - start) / len(queries) * 1e6, hits / len(queries)
+
+
+def run(sizes: List[int], count: int) -> None:
+    print(f"{'colección':<10} {'n':>7} {'consulta':<11} {'scan (µs)':>10} {'índice (µs)':>12} "
+          f"{'speedup':>8} {'aciertos scan':>14} {'aciertos índice':>16}")
+    for n in sizes:
+        collections = {
+            "productos": make_products(n),
+            "clientes": generate(orders=0, customers=n, products=20)["customers"],
+        }
+        for label, docs in collections.items():
+            start = time.perf_counter()
+            index = SearchIndex(lambda d: d.get('name'), doc_id, docs)
+            built = time.perf_counter() - start
+            for kind, queries in make_queries(docs, count).items():
+                t_scan, hits_scan = measure(queries, lambda q: scan(docs, q))
+                t_index, hits_index = measure(queries, index.best)
+                print(f"{label:<10} {n:>7} {kind:<11} {t_scan:>10.1f} {t_index:>12.1f} "
+                      f"{t_scan / t_index:>7.1f}x {hits_scan:>14.0%} {hits_index:>16.0%}")
+            print(f"{label:<10} {n:>7} (construir el índice: {built * 1000:.0f} ms)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5_000, 20_000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    run(args.sizes, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark de las acciones contra un stub de la API con datos sintéticos.
+
+Para cada escala (cantidad de órdenes) levanta benchmarks.stub_api en otro
+proceso y ejecuta cada Action.run de actions/actions.py en un proceso
+medidor propio por acción: cada una empieza con las cachés vacías y su RSS
+no incluye lo que cargaron las demás. Por acción reporta la primera
+llamada, p50/p99 de las siguientes, el pico de RSS de su proceso (con el
+intérprete y las dependencias) y los bytes y peticiones a la API por
+llamada. El refresco en segundo plano, la persistencia y el endpoint de
+métricas quedan desactivados: el stub solo cuenta el tráfico de la acción.
+
+Uso (desde apps/rasa-chatbot, con las dependencias del action server):
+
+    python -m benchmarks.run_actions
+    python -m benchmarks.run_actions --scales 1000 100000 --iterations 50
+    python -m benchmarks.run_actions --cold --actions TopProducts Dashboard
+    python -m benchmarks.run_actions --json resultados.json
+
+--cold vacía las cachés y el agregador antes de cada llamada (peor caso);
+sin él se mide el estado estable, con la caché caliente. Las acciones que
+escriben (cancelar / actualizar orden) se omiten salvo --include-writes;
+con él corren al final y cada una sobre otra orden, así no borran ni
+cambian la que consultan las de lectura.
+La escala 10^6 necesita varios GB de RAM para el stub.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_SCALES = [1_000, 10_000, 100_000, 1_000_000]
+WRITE_ACTIONS = {"ActionCancelOrder", "ActionUpdateOrderStatus"}
+STUB_STARTUP_TIMEOUT = 900
+
+Result = Dict[str, Any]
+
+
+# ============================================
+# PROCESO PRINCIPAL
+# ============================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--actions", nargs="*", default=[], help="filtra por parte del nombre de la clase")
+    parser.add_argument("--cold", action="store_true")
+    parser.add_argument("--include-writes", action="store_true")
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--list", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--action", help=argparse.SUPPRESS)
+    parser.add_argument("--sample", type=int, default=0, help=argparse.SUPPRESS)
+    parser.add_argument("--api", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        if args.list:
+            print(json.dumps(_action_names(args)))
+        else:
+            print(json.dumps(asyncio.run(_measure(args))))
+        return
+
+    all_results: List[Result] = []
+    for scale in args.scales:
+        results = _run_scale(scale, args)
+        _print_table(scale, results)
+        all_results.extend(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(all_results, indent=2, ensure_ascii=False))
+
+
+def _run_scale(scale: int, args: argparse.Namespace) -> List[Result]:
+    port = _free_port()
+    api = f"http://127.0.0.1:{port}/api"
+    stub = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stub_api", "--orders", str(scale), "--port", str(port)],
+        cwd=ROOT,
+    )
+    try:
+        _wait_ready(f"http://127.0.0.1:{port}/__stats", stub)
+
+        # Nada en segundo plano que descargue, restaure o publique por su cuenta
+        env = dict(os.environ, API_BASE_URL=api, ACTIONS_REFRESH="0", ACTIONS_WARM_START="0",
+                   ACTIONS_PERSIST_DIR="", ACTIONS_SHARED_SNAPSHOT_DIR="", ACTIONS_METRICS_PORT="0")
+        # Descargar 10^6 órdenes toma más que el timeout por defecto
+        env.setdefault("ACTIONS_HTTP_TIMEOUT", "600")
+        command = [sys.executable, "-m", "benchmarks.run_actions", "--worker", "--api", api,
+                   "--iterations", str(args.iterations), "--actions", *args.actions]
+        if args.cold:
+            command.append("--cold")
+        if args.include_writes:
+            command.append("--include-writes")
+
+        results = []
+        writes = 0
+        for name in _worker_output([*command, "--list"], env):
+            # Cada acción que escribe usa su propia orden, distinta de la de lectura
+            sample = 0
+            if name in WRITE_ACTIONS:
+                writes += 1
+                sample = writes
+            result = _worker_output([*command, "--action", name, "--sample", str(sample)], env)
+            result["scale"] = scale
+            results.append(result)
+        return results
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+def _worker_output(command: List[str], env: Dict[str, str]) -> Any:
+    output = subprocess.run(command, cwd=ROOT, env=env, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(url: str, process: subprocess.Popen) -> None:
+    deadline = time.monotonic() + STUB_STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("El stub de la API terminó al iniciar")
+        try:
+            urllib.request.urlopen(url, timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError("El stub de la API no respondió a tiempo")
+
+
+def _print_table(scale: int, results: List[Result]) -> None:
+    print(f"\n== {scale:,} órdenes ==")
+    print(f"{'acción':<34} {'1ª (ms)':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'RSS (MB)':>9} {'KB/llamada':>11} {'req/llamada':>11} {'errores':>7}")
+    for r in results:
+        print(f"{r['action']:<34} {r['first_ms']:>9.1f} {r['p50_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['peak_rss_mb']:>9.1f} {r['kb_per_call']:>11.1f} {r['requests_per_call']:>11.1f} "
+              f"{r['errors']:>7}")
+
+
+# ============================================
+# PROCESO MEDIDOR
+# ============================================
+
+async def _measure(args: argparse.Namespace) -> Result:
+    """Mide una sola acción (--action) en este proceso."""
+    # Se importan aquí: API_BASE_URL ya apunta al stub
+    from rasa_sdk import Tracker
+    from rasa_sdk.executor import CollectingDispatcher
+
+    from actions import actions as module
+    from actions import http_client
+    from actions.aggregator import sales_aggregator
+    from actions.cache import snapshot_cache
+    from actions.customer_scope import customer_scope
+
+    stats_url = args.api.rsplit("/api", 1)[0]
+    slots = await _sample_slots(http_client, args.sample)
+    # El remitente es el cliente de la orden, como lo envía WhatsApp
+    tracker = Tracker(sender_id=f"{slots['customer_phone']}@c.us", slots=slots, latest_message={}, events=[],
+                      paused=False, followup_action=None, active_loop={}, latest_action_name=None)
+
+    action = getattr(module, args.action)()
+    await _stub_call(stats_url, "POST", "/__reset")
+    latencies, errors = [], 0
+
+    for _ in range(1 + args.iterations):
+        if args.cold:
+            snapshot_cache.invalidate()
+            sales_aggregator.invalidate()
+            customer_scope.clear()
+        dispatcher = CollectingDispatcher()
+        start = time.perf_counter()
+        await action.run(dispatcher, tracker, {})
+        latencies.append((time.perf_counter() - start) * 1000)
+        errors += any((m.get("text") or "").startswith("❌") for m in dispatcher.messages)
+
+    stats = await _stub_call(stats_url, "GET", "/__stats")
+    await http_client.close()
+    calls = len(latencies)
+    warm = sorted(latencies[1:]) or latencies
+    return {
+        "action": args.action,
+        "cold": args.cold,
+        "calls": calls,
+        "first_ms": latencies[0],
+        "p50_ms": _percentile(warm, 50),
+        "p99_ms": _percentile(warm, 99),
+        # Proceso propio: el pico es el de esta acción (más el intérprete)
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "kb_per_call": stats["bytes"] / calls / 1024,
+        "requests_per_call": stats["requests"] / calls,
+        "errors": errors,
+    }
+
+
+def _action_names(args: argparse.Namespace) -> List[str]:
+    """Clases de acción a medir, con las que escriben al final."""
+    from actions import actions as module
+
+    names = []
+    for name, value in vars(module).items():
+        if not (isinstance(value, type) and issubclass(value, module.Action) and value is not module.Action):
+            continue
+        if value.__module__ != module.__name__:
+            continue
+        if name in WRITE_ACTIONS and not args.include_writes:
+            continue
+        if args.actions and not any(part.lower() in name.lower() for part in args.actions):
+            continue
+        names.append(name)
+    return sorted(names, key=lambda name: name in WRITE_ACTIONS)
+
+
+async def _sample_slots(http_client: Any, offset: int = 0) -> Dict[str, Any]:
+    """Slots que apuntan a datos reales del stub: una orden del medio, o la
+    que está `offset` lugares después (las acciones que escriben)."""
+    total = int((await http_client.get("/orders", params={"limit": "1"})).headers["X-Total-Count"])
+    skip = min(total // 2 + offset, total - 1)
+    response = await http_client.get("/orders", params={"limit": "1", "skip": str(skip)})
+    order = response.json()[0]
+    customer = order["customerId"]
+    return {
+        "order_id": order["_id"],
+        "order_number": order["orderNumber"],
+        "order_status": "pending",
+        "customer_id": customer["_id"],
+        "customer_name": customer["name"],
+        "customer_email": customer["email"],
+        "customer_phone": customer["phone"],
+        "product_name": order["items"][0]["productName"],
+        "time_period": "este mes",
+    }
+
+
+async def _stub_call(base: str, method: str, path: str) -> Any:
+    def call() -> Any:
+        request = urllib.request.Request(f"{base}{path}", method=method)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+    return await asyncio.get_running_loop().run_in_executor(None, call)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    # Nearest-rank sobre valores ya ordenados
+    index = max(0, math.ceil(percent / 100 * len(values)) - 1)
+    return values[index]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Stub de la API de Node para benchmarks: sirve datos sintéticos en memoria.
+
+Implementa las rutas y parámetros que usan las acciones (filtros, limit,
+skip, sort, fields con X-Total-Count, /orders/customer/:id,
+/customers/phone/:phone, /products/search, populate de GET /orders y
+GET /payments, ETag y 304 en los listados completos) y cuenta los bytes
+enviados. El runner consulta y reinicia
+esos contadores en /__stats y /__reset.
+
+Uso (desde apps/rasa-chatbot):
+
+    python -m benchmarks.stub_api --orders 100000 --port 3999
+"""
+import argparse
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+
+from benchmarks.synthetic import Document, generate, iso
+
+LIST_FILTERS = {
+    "orders": {"status": "status", "paymentStatus": "paymentStatus", "orderNumber": "orderNumber",
+               "customerId": "customerId"},
+    "payments": {"status": "status", "orderId": "orderId"},
+    "customers": {"email": "email"},
+    "products": {},
+}
+MAX_LIMIT = 500
+
+
+def _ref(value: Any) -> Any:
+    return value.get("_id") if isinstance(value, dict) else value
+
+
+class StubApi:
+    def __init__(self, data: Dict[str, List[Document]]):
+        self.data = data
+        self.by_id = {name: {doc["_id"]: doc for doc in docs} for name, docs in data.items()}
+        self.requests = 0
+        self.bytes_sent = 0
+        self._full_bodies: Dict[str, bytes] = {}
+        self._etags: Dict[str, str] = {}
+
+    # ---------- Serialización ----------
+
+    def _populated(self, collection: str, doc: Document) -> Document:
+        if collection == "orders":
+            products = self.by_id["products"]
+            items = [dict(item, productId=products.get(item["productId"], item["productId"]))
+                     for item in doc["items"]]
+            return dict(doc, items=items)
+        if collection == "payments":
+            return dict(doc, orderId=self.by_id["orders"].get(doc["orderId"], doc["orderId"]),
+                        customerId=self.by_id["customers"].get(doc["customerId"], doc["customerId"]))
+        return doc
+
+    def _respond(self, payload: Any = None, body: Optional[bytes] = None, status: int = 200,
+                 headers: Optional[Dict[str, str]] = None) -> web.Response:
+        if status == 304:
+            self.requests += 1
+            return web.Response(status=304, headers=headers)
+        if body is None:
+            body = json.dumps(payload, ensure_ascii=False).encode()
+        self.requests += 1
+        self.bytes_sent += len(body)
+        return web.Response(body=body, status=status, headers=headers, content_type="application/json")
+
+    def _full_body(self, collection: str) -> bytes:
+        # GET sin filtros: se serializa una vez (lo más caro del stub) y se reutiliza
+        body = self._full_bodies.get(collection)
+        if body is None:
+            docs = [self._populated(collection, doc) for doc in self.data[collection]]
+            body = self._full_bodies[collection] = json.dumps(docs, ensure_ascii=False).encode()
+        return body
+
+    def _etag(self, collection: str) -> str:
+        # Igual que la API: cantidad de documentos y updatedAt más reciente
+        etag = self._etags.get(collection)
+        if etag is None:
+            docs = self.data[collection]
+            latest = max((doc.get("updatedAt", "") for doc in docs), default="")
+            etag = self._etags[collection] = f'W/"{len(docs)}-{latest}"'
+        return etag
+
+    def _changed(self) -> None:
+        # Los pagos embeben la orden: cualquier escritura invalida todo
+        self._full_bodies.clear()
+        self._etags.clear()
+
+    # ---------- Handlers ----------
+
+    async def list(self, request: web.Request) -> web.Response:
+        collection = request.match_info["collection"]
+        if collection not in self.data:
+            return self._respond({"error": "not found"}, status=404)
+
+        query = request.query
+        if not query:
+            headers = {"ETag": self._etag(collection)}
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return self._respond(status=304, headers=headers)
+            return self._respond(body=self._full_body(collection), headers=headers)
+
+        docs = self.data[collection]
+        for param, field in LIST_FILTERS[collection].items():
+            if param in query:
+                value = query[param]
+                docs = [doc for doc in docs if _ref(doc.get(field)) == value]
+        if "updatedSince" in query:
+            since = query["updatedSince"]
+            docs = [doc for doc in docs if doc.get("updatedAt", "") >= since]
+        if "sort" in query:
+            for key in reversed(query["sort"].split()):
+                field = key.lstrip("-")
+                docs = sorted(docs, key=lambda doc: doc.get(field) or "", reverse=key.startswith("-"))
+
+        headers = {}
+        total = len(docs)
+        if "skip" in query or "limit" in query:
+            skip = int(query.get("skip", 0))
+            limit = min(int(query.get("limit", MAX_LIMIT)), MAX_LIMIT)
+            docs = docs[skip:skip + limit]
+        if "limit" in query:
+            headers["X-Total-Count"] = str(total)
+
+        if "fields" in query:
+            fields = query["fields"].split(",")
+            docs = [{"_id": doc["_id"], **{f: _ref(doc[f]) if f == "customerId" else doc[f]
+                                         for f in fields if f in doc}} for doc in docs]
+        else:
+            docs = [self._populated(collection, doc) for doc in docs]
+        return self._respond(docs, headers=headers)
+
+    async def get_one(self, request: web.Request) -> web.Response:
+        collection, doc_id = request.match_info["collection"], request.match_info["id"]
+        doc = self.by_id.get(collection, {}).get(doc_id)
+        if doc is None:
+            return self._respond({"error": "not found"}, status=404)
+        return self._respond(self._populated(collection, doc))
+
+    async def orders_by_customer(self, request: web.Request) -> web.Response:
+        customer_id = request.match_info["id"]
+        return self._respond([self._populated("orders", doc) for doc in self.data["orders"]
+                              if _ref(doc["customerId"]) == customer_id])
+
+    async def customer_by_phone(self, request: web.Request) -> web.Response:
+        phone = request.match_info["phone"]
+        doc = next((c for c in self.data["customers"] if c["phone"] == phone), None)
+        return self._respond(doc or {"error": "not found"}, status=200 if doc else 404)
+
+    async def search_products(self, request: web.Request) -> web.Response:
+        pattern = re.compile(request.query.get("q", ""), re.IGNORECASE)
+        return self._respond([p for p in self.data["products"] if pattern.search(p["name"])])
+
+    async def update_order(self, request: web.Request) -> web.Response:
+        doc = self.by_id["orders"].get(request.match_info["id"])
+        if doc is None:
+            return self._respond({"error": "not found"}, status=404)
+        doc.update(await request.json())
+        doc["updatedAt"] = iso(datetime.now(timezone.utc))
+        self._changed()
+        return self._respond(self._populated("orders", doc))
+
+    async def delete_order(self, request: web.Request) -> web.Response:
+        doc = self.by_id["orders"].pop(request.match_info["id"], None)
+        if doc is None:
+            return self._respond({"error": "not found"}, status=404)
+        self.data["orders"].remove(doc)
+        self._changed()
+        return self._respond({"message": "Orden eliminada"})
+
+    # ---------- Contadores ----------
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "bytes": self.bytes_sent})
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.requests = self.bytes_sent = 0
+        return web.json_response({"ok": True})
+
+
+def create_app(data: Dict[str, List[Document]]) -> web.Application:
+    stub = StubApi(data)
+    app = web.Application()
+    app.router.add_get("/__stats", stub.stats)
+    app.router.add_post("/__reset", stub.reset)
+    app.router.add_get("/api/orders/customer/{id}", stub.orders_by_customer)
+    app.router.add_get("/api/customers/phone/{phone}", stub.customer_by_phone)
+    app.router.add_get("/api/products/search", stub.search_products)
+    app.router.add_put("/api/orders/{id}", stub.update_order)
+    app.router.add_delete("/api/orders/{id}", stub.delete_order)
+    app.router.add_get("/api/{collection}", stub.list)
+    app.router.add_get("/api/{collection}/{id}", stub.get_one)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3999)
+    args = parser.parse_args()
+
+    data = generate(args.orders, seed=args.seed)
+    web.run_app(create_app(data), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
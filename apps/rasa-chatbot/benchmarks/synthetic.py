@@ -0,0 +1,145 @@
+"""Generador de datos sintéticos con la forma que devuelve la API.
+
+Los documentos siguen los modelos de apps/api/src/models (ObjectId de 24
+caracteres, fechas ISO con "Z", GET /orders con customerId poblado) para que
+las acciones recorran exactamente las mismas estructuras que en producción.
+
+    from benchmarks.synthetic import generate
+    data = generate(orders=100_000)   # {"orders": [...], "customers": [...], ...}
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+Document = Dict[str, Any]
+
+ORDER_STATUSES = ["pending", "confirmed", "preparing", "shipped", "delivered", "cancelled"]
+ORDER_STATUS_WEIGHTS = [30, 15, 10, 10, 30, 5]
+PAYMENT_STATUSES = ["pending", "paid", "refunded", "failed"]
+PAYMENT_STATUS_WEIGHTS = [35, 55, 5, 5]
+PAYMENT_METHODS = ["card", "billetera_movil", "pagoefectivo"]
+CATEGORIES = ["Bebidas", "Snacks", "Lácteos", "Limpieza", "Abarrotes", "Panadería"]
+FIRST_NAMES = ["Ana", "José", "María", "Luis", "Carmen", "Jorge", "Rosa", "Carlos", "Lucía", "Miguel"]
+LAST_NAMES = ["Quispe", "Flores", "Sánchez", "Rojas", "García", "Huamán", "Torres", "Díaz", "Vargas", "Castillo"]
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def object_id(kind: int, index: int) -> str:
+    return f"{kind:08x}{index:016x}"
+
+
+def iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def generate(orders: int, customers: int = 0, products: int = 0, seed: int = 42) -> Dict[str, List[Document]]:
+    """Colecciones sintéticas. Por defecto: un cliente cada 10 órdenes (mínimo
+    10) y un producto cada 100 órdenes (entre 20 y 5000)."""
+    rng = random.Random(seed)
+    customers = customers or max(10, orders // 10)
+    products = products or min(5000, max(20, orders // 100))
+
+    product_docs = [_product(rng, i) for i in range(products)]
+    customer_docs = [_customer(rng, i) for i in range(customers)]
+
+    # Como en Mongo, el orden de inserción (y el orderNumber) sigue a createdAt
+    offsets = sorted(rng.randrange(SPAN_SECONDS) for _ in range(orders))
+    order_docs: List[Document] = []
+    payment_docs: List[Document] = []
+    for i, offset in enumerate(offsets):
+        order = _order(rng, i, offset, customer_docs, product_docs)
+        order_docs.append(order)
+        if order["paymentStatus"] != "pending" or rng.random() < 0.5:
+            payment_docs.append(_payment(rng, len(payment_docs), order))
+
+    return {
+        "orders": order_docs,
+        "customers": customer_docs,
+        "products": product_docs,
+        "payments": payment_docs,
+    }
+
+
+def _product(rng: random.Random, i: int) -> Document:
+    created = START + timedelta(seconds=rng.randrange(SPAN_SECONDS // 4))
+    return {
+        "_id": object_id(1, i),
+        "name": f"Producto {i:05d} {rng.choice(CATEGORIES)}",
+        "description": "Producto de prueba generado para benchmarks",
+        "price": round(rng.uniform(1, 250), 2),
+        "stock": rng.randrange(0, 500),
+        "category": rng.choice(CATEGORIES),
+        "isActive": rng.random() > 0.05,
+        "createdAt": iso(created),
+        "updatedAt": iso(created),
+        "__v": 0,
+    }
+
+
+def _customer(rng: random.Random, i: int) -> Document:
+    created = START + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        "_id": object_id(2, i),
+        "phone": f"519{i:08d}",
+        "name": f"{first} {last} {i}",
+        "email": f"cliente{i}@example.com",
+        "address": f"Av. Siempre Viva {rng.randrange(1, 2000)}, Lima",
+        "totalOrders": 0,
+        "totalSpent": 0,
+        "createdAt": iso(created),
+        "updatedAt": iso(created),
+        "__v": 0,
+    }
+
+
+def _order(rng: random.Random, i: int, offset: int, customers: List[Document], products: List[Document]) -> Document:
+    customer = rng.choice(customers)
+    items = []
+    for product in rng.sample(products, k=min(len(products), rng.randint(1, 5))):
+        items.append({
+            "productId": product["_id"],
+            "productName": product["name"],
+            "quantity": rng.randint(1, 6),
+            "price": product["price"],
+            "_id": object_id(9, i * 8 + len(items)),
+        })
+    created = START + timedelta(seconds=offset)
+    updated = created + timedelta(seconds=rng.randrange(0, 3 * 24 * 3600))
+    return {
+        "_id": object_id(3, i),
+        "orderNumber": f"ORD-{i + 1:06d}",
+        # GET /orders puebla el cliente
+        "customerId": {"_id": customer["_id"], "name": customer["name"], "phone": customer["phone"],
+                       "email": customer["email"]},
+        "customerPhone": customer["phone"],
+        "items": items,
+        "totalAmount": round(sum(item["price"] * item["quantity"] for item in items), 2),
+        "status": rng.choices(ORDER_STATUSES, ORDER_STATUS_WEIGHTS)[0],
+        "paymentStatus": rng.choices(PAYMENT_STATUSES, PAYMENT_STATUS_WEIGHTS)[0],
+        "deliveryAddress": customer["address"],
+        "createdAt": iso(created),
+        "updatedAt": iso(updated),
+        "__v": 0,
+    }
+
+
+def _payment(rng: random.Random, i: int, order: Document) -> Document:
+    status = {"paid": "completed", "refunded": "refunded", "failed": "failed"}.get(order["paymentStatus"], "pending")
+    return {
+        "_id": object_id(4, i),
+        "orderId": order["_id"],
+        "orderNumber": order["orderNumber"],
+        "customerId": order["customerId"]["_id"],
+        "amount": order["totalAmount"],
+        "gateway": "culqi",
+        "culqiOrderId": f"ord_live_{i:012d}",
+        "checkoutUrl": f"https://checkout.example.com/{i}",
+        "method": rng.choice(PAYMENT_METHODS),
+        "status": status,
+        "createdAt": order["createdAt"],
+        "updatedAt": order["updatedAt"],
+        "__v": 0,
+    }
@@ -0,0 +1,118 @@
+import asyncio
+import sys
+import threading
+import time
+import types
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import pytest
+
+# Las pruebas importan el paquete actions desde apps/rasa-chatbot
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+class Clock:
+    """Reloj manual: reemplaza `time` en los módulos que miden vencimientos."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self._wall = time.time()
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self._wall + self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Any:
+    """Clock ya instalado con clock.install(modulo, ...)."""
+    manual = Clock()
+
+    def install(*modules: Any) -> Clock:
+        fake = types.SimpleNamespace(monotonic=manual.monotonic, time=manual.time, time_ns=time.time_ns)
+        for module in modules:
+            monkeypatch.setattr(module, "time", fake)
+        return manual
+
+    manual.install = install  # type: ignore[attr-defined]
+    return manual
+
+
+class FakeCollections:
+    """Sustituye a snapshot_cache: recorre colecciones en memoria."""
+
+    def __init__(self, **collections: Optional[List[Dict[str, Any]]]) -> None:
+        self.collections = collections
+        self.streams: List[str] = []
+
+    @asynccontextmanager
+    async def stream(self, name: str) -> AsyncIterator[Optional[AsyncIterator[Dict[str, Any]]]]:
+        self.streams.append(name)
+        docs = self.collections.get(name)
+        if docs is None:
+            yield None
+            return
+
+        async def iterate() -> AsyncIterator[Dict[str, Any]]:
+            for doc in list(docs):
+                yield doc
+
+        yield iterate()
+
+
+def order(number: int, status: str = "pending", payment_status: str = "pending", amount: float = 10.0,
+          created_at: str = "2026-03-01T12:00:00.000Z", updated_at: str = "2026-03-01T12:00:00.000Z",
+          customer: str = "c1") -> Dict[str, Any]:
+    return {
+        "_id": f"o{number}", "orderNumber": f"ORD-{number:06d}", "customerId": customer,
+        "items": [{"productName": "Café", "quantity": 1, "price": amount}],
+        "totalAmount": amount, "status": status, "paymentStatus": payment_status,
+        "createdAt": created_at, "updatedAt": updated_at,
+    }
+
+
+class FakeApp:
+    """Lo que startup.py usa de la app de Sanic."""
+
+    def __init__(self, name="rasa_sdk"):
+        self.name = name
+        self.ctx = types.SimpleNamespace()
+        self.listeners = {}
+        self.routes = {}
+
+    def register_listener(self, listener, event):
+        self.listeners.setdefault(event, []).append(listener)
+
+    def add_route(self, handler, uri, methods=None, name=None):
+        self.routes[uri] = handler
+
+    async def start(self):
+        for listener in self.listeners.get("after_server_start", []):
+            await listener(self, asyncio.get_running_loop())
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    """startup.py como recién importado, sin refresco ni persistencia y con
+    el endpoint de métricas desactivado."""
+    from actions import metrics, startup
+
+    monkeypatch.setattr(startup, "_ready", threading.Event())
+    monkeypatch.setattr(startup, "_task", None)
+    monkeypatch.setattr(startup, "_started", False)
+    monkeypatch.setattr(startup, "_deferred", False)
+    monkeypatch.setattr(startup, "WARM_START", False)
+    monkeypatch.setattr(startup, "REFRESH_ENABLED", False)
+    monkeypatch.setattr(startup, "SHARED_SNAPSHOT_DIR", "")
+    monkeypatch.setattr(startup, "persister", None)
+    monkeypatch.setattr(startup, "sqlite_replica", None)
+    monkeypatch.setattr(metrics, "_on_action", [])
+    monkeypatch.setattr(metrics, "METRICS_PORT", 0)
+    return startup
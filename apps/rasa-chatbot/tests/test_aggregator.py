@@ -0,0 +1,107 @@
+import asyncio
+import random
+
+from actions import aggregator as aggregator_module
+from actions.aggregator import DailyRollup, SalesAggregator
+from actions.api_client import Page
+
+from conftest import FakeCollections, order
+
+
+class FakeApi:
+    """Responde los deltas de órdenes y registra desde qué marca se pidieron."""
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.since = []
+
+    async def list_orders(self, updated_since=None, fields=None, **filters):
+        self.since.append(updated_since)
+        items = [doc for doc in self.orders if updated_since is None or doc["updatedAt"] >= updated_since]
+        return Page(items, len(items))
+
+
+def test_daily_rollup_matches_brute_force():
+    rng = random.Random(7)
+    rollup = DailyRollup()
+    rows = []
+    for step in range(500):
+        if rows and rng.random() < 0.3:
+            day, cents, paid = rows.pop(rng.randrange(len(rows)))
+            rollup.add(day, cents, paid, -1)
+        else:
+            row = (rng.randrange(100), rng.randrange(1, 10000), rng.random() < 0.5)
+            rows.append(row)
+            rollup.add(*row, 1)
+        if step % 7 == 0:
+            first = rng.randrange(100)
+            last = first + rng.randrange(30)
+            inside = [row for row in rows if first <= row[0] <= last]
+            totals = rollup.between(first, last)
+            assert totals.total_cents == sum(cents for _, cents, _ in inside)
+            assert totals.orders == len(inside)
+            assert totals.paid_cents == sum(cents for _, cents, paid in inside if paid)
+            assert totals.paid == sum(1 for *_, paid in inside if paid)
+
+
+def test_apply_replaces_previous_contribution():
+    aggregator = SalesAggregator()
+    aggregator.reset([order(1, amount=10.10), order(2, payment_status="paid", amount=5.05)])
+    assert (aggregator.total_cents, aggregator.paid_cents, aggregator.abandoned_count) == (1515, 505, 1)
+
+    aggregator.apply(order(1, status="delivered", payment_status="paid", amount=10.10))
+    assert (aggregator.total_cents, aggregator.paid_cents, aggregator.abandoned_count) == (1515, 1515, 0)
+    assert aggregator.status_counts["delivered"] == 1
+
+    aggregator.remove("o2")
+    assert (aggregator.total_count, aggregator.total_amount, aggregator.paid_amount) == (1, 10.10, 10.10)
+
+
+def test_local_apply_does_not_move_watermark(monkeypatch):
+    api = FakeApi([])
+    monkeypatch.setattr(aggregator_module, "api", api)
+    monkeypatch.setattr(aggregator_module, "AGGREGATOR_SYNC_INTERVAL", 0)
+    aggregator = SalesAggregator()
+    aggregator.reset([order(1, updated_at="2026-03-01T10:00:00.000Z")])
+
+    # Escritura del bot más reciente que la marca: el delta sigue pidiendo desde la marca
+    aggregator.apply(order(1, status="delivered", updated_at="2026-03-05T10:00:00.000Z"))
+    api.orders = [order(2, updated_at="2026-03-02T10:00:00.000Z")]
+
+    async def main():
+        assert await aggregator.sync()
+        assert api.since == ["2026-03-01T10:00:00.000Z"]
+        assert aggregator.total_count == 2
+        # Lo que llega por el delta sí avanza la marca
+        assert await aggregator.sync()
+        assert api.since[-1] == "2026-03-02T10:00:00.000Z"
+
+    asyncio.run(main())
+
+
+def test_sync_reconciles_from_stream(monkeypatch):
+    collections = FakeCollections(orders=[order(1), order(2, payment_status="paid")])
+    monkeypatch.setattr(aggregator_module, "snapshot_cache", collections)
+    monkeypatch.setattr(aggregator_module, "api", FakeApi([]))
+    aggregator = SalesAggregator()
+
+    async def main():
+        assert not aggregator.ready
+        assert await aggregator.sync()
+        assert aggregator.ready and aggregator.total_count == 2 and aggregator.paid_count == 1
+
+        # Una orden borrada en la API desaparece en la reconciliación siguiente
+        collections.collections["orders"] = [order(1)]
+        aggregator.invalidate()
+        assert await aggregator.sync()
+        assert aggregator.total_count == 1
+        assert collections.streams == ["orders", "orders"]
+
+    asyncio.run(main())
+
+
+def test_sync_without_data_reports_not_ready(monkeypatch):
+    monkeypatch.setattr(aggregator_module, "snapshot_cache", FakeCollections(orders=None))
+    aggregator = SalesAggregator()
+    assert asyncio.run(aggregator.sync()) is False
+    assert not aggregator.ready
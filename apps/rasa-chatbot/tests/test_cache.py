@@ -0,0 +1,179 @@
+import asyncio
+import json
+
+from actions import cache as cache_module
+from actions.cache import SnapshotCache
+from actions.http_client import ApiResponse
+
+from conftest import order
+
+
+class FakeApi:
+    """API en memoria: responde ETag / 304 y ?updatedSince= como la real."""
+
+    def __init__(self, **collections):
+        self.collections = collections
+        self.calls = []
+        self.gate = None
+
+    async def fetch(self, collection, params=None, headers=None):
+        self.calls.append((collection, params, headers))
+        if self.gate is not None:
+            await self.gate.wait()
+        docs = self.collections[collection]
+        if params and "updatedSince" in params:
+            docs = [doc for doc in docs if doc["updatedAt"] >= params["updatedSince"]]
+            return ApiResponse(200, json.dumps(docs).encode())
+        body = json.dumps(docs).encode()
+        etag = f'"{len(body)}-{hash(body)}"'
+        if headers and headers.get("If-None-Match") == etag:
+            return ApiResponse(304, b"")
+        return ApiResponse(200, body, {"ETag": etag})
+
+
+def test_ttl_reuses_until_expiry_then_revalidates_with_etag(clock):
+    clock.install(cache_module)
+    api = FakeApi(orders=[order(1), order(2)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6)
+
+    async def main():
+        first = await cache.get("orders")
+        assert await cache.get("orders") is first
+        assert len(api.calls) == 1
+        version = cache.peek("orders").entry("orders").version
+
+        clock.advance(31)
+        assert await cache.get("orders") is first  # 304: misma lista
+        assert len(api.calls) == 2
+        assert api.calls[1][2]["If-None-Match"] == cache.peek("orders").entry("orders").etag
+        assert cache.peek("orders").entry("orders").version == version
+
+        api.collections["orders"] = [order(1), order(2), order(3)]
+        clock.advance(31)
+        assert [doc.get("_id") for doc in await cache.get("orders")] == ["o1", "o2", "o3"]
+        assert cache.peek("orders").entry("orders").version == version + 1
+
+    asyncio.run(main())
+
+
+def test_concurrent_gets_share_one_request():
+    api = FakeApi(orders=[order(1)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6)
+
+    async def main():
+        api.gate = asyncio.Event()
+        tasks = [asyncio.ensure_future(cache.get("orders")) for _ in range(5)]
+        await asyncio.sleep(0)
+        api.gate.set()
+        results = await asyncio.gather(*tasks)
+        assert len(api.calls) == 1
+        assert all(result is results[0] for result in results)
+
+    asyncio.run(main())
+
+
+def test_lru_evicts_least_recently_used_collection():
+    docs = [{"_id": str(i), "name": "x" * 50} for i in range(10)]
+    size = len(json.dumps(docs).encode())
+    api = FakeApi(a=docs, b=docs, c=docs)
+    cache = SnapshotCache(api.fetch, {"a": 30, "b": 30, "c": 30}, size * 2 + size // 2)
+
+    async def main():
+        await cache.get("a")
+        await cache.get("b")
+        await cache.get("a")  # "a" pasa a ser la más reciente
+        await cache.get("c")
+        present = cache.peek("a", "b", "c")
+        assert present.entry("a") is not None
+        assert present.entry("b") is None
+        assert present.entry("c") is not None
+
+    asyncio.run(main())
+
+
+def test_stale_entry_served_while_revalidating(clock):
+    clock.install(cache_module)
+    api = FakeApi(orders=[order(1)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6, stale_grace=60)
+
+    async def main():
+        first = await cache.get("orders")
+        api.collections["orders"] = [order(1), order(2)]
+        api.gate = asyncio.Event()
+        clock.advance(31)
+        # Vencida pero dentro del margen: responde sin esperar la descarga
+        assert await cache.get("orders") is first
+        api.gate.set()
+        await cache.refresh("orders")
+        assert len(await cache.get("orders")) == 2
+        assert len(api.calls) == 2  # la revalidación y refresh comparten la descarga
+
+    asyncio.run(main())
+
+
+def test_delta_merges_changed_documents(clock):
+    clock.install(cache_module)
+    api = FakeApi(orders=[order(1), order(2)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6, delta_collections=["orders"],
+                          full_sync_interval=600)
+
+    async def main():
+        before = await cache.get("orders")
+        api.collections["orders"] = [
+            order(1),
+            order(2, status="delivered", updated_at="2026-03-02T08:00:00.000Z"),
+            order(3, updated_at="2026-03-02T09:00:00.000Z"),
+        ]
+        clock.advance(31)
+        after = await cache.get("orders")
+        assert api.calls[1][1] == {"updatedSince": "2026-03-01T12:00:00.000Z"}
+        assert [doc.get("status") for doc in after] == ["pending", "delivered", "pending"]
+        assert before[1].get("status") == "pending"  # la versión anterior no cambia
+        assert cache.peek("orders").entry("orders").watermark == "2026-03-02T09:00:00.000Z"
+
+        # Sin cambios desde el watermark: se renueva la misma versión
+        version = cache.peek("orders").entry("orders").version
+        clock.advance(31)
+        assert await cache.get("orders") is after
+        assert cache.peek("orders").entry("orders").version == version
+
+    asyncio.run(main())
+
+
+def test_delta_keeps_nbytes_stable(clock):
+    clock.install(cache_module)
+    api = FakeApi(orders=[order(i) for i in range(20)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6, delta_collections=["orders"],
+                          full_sync_interval=10 ** 6)
+
+    async def main():
+        await cache.get("orders")
+        initial = cache.peek("orders").entry("orders").nbytes
+        for minute in range(10, 40):
+            status = "pending" if minute % 2 else "delivered"
+            api.collections["orders"][5] = order(5, status=status, updated_at=f"2026-03-02T08:{minute}:00.000Z")
+            clock.advance(31)
+            await cache.get("orders")
+        # Reemplazar un documento no suma su tamaño otra vez
+        assert abs(cache.peek("orders").entry("orders").nbytes - initial) < 50
+
+    asyncio.run(main())
+
+
+def test_invalidate_during_fetch_discards_response():
+    api = FakeApi(orders=[order(1)])
+    cache = SnapshotCache(api.fetch, {"orders": 30}, 10 ** 6)
+
+    async def main():
+        api.gate = asyncio.Event()
+        task = asyncio.ensure_future(cache.get("orders"))
+        while not api.calls:  # la descarga ya empezó
+            await asyncio.sleep(0)
+        cache.invalidate("orders")
+        api.gate.set()
+        assert len(await task) == 1  # quien la pidió recibe la respuesta...
+        assert cache.peek("orders").entry("orders") is None  # ...pero no se guarda
+        await cache.get("orders")
+        assert len(api.calls) == 2
+
+    asyncio.run(main())
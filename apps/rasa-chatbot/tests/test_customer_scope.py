@@ -0,0 +1,157 @@
+import asyncio
+
+import pytest
+
+from actions import customer_scope as scope_module
+from actions.customer_scope import CustomerScope, sender_phones
+
+from conftest import order
+
+
+class FakeApi:
+    """Clientes por teléfono y órdenes por cliente; `down` simula la API caída."""
+
+    def __init__(self, customers, orders):
+        self.customers = customers
+        self.orders = orders
+        self.calls = []
+        self.down = False
+
+    async def customer_by_phone(self, phone, not_found=None):
+        self.calls.append(("phone", phone))
+        await asyncio.sleep(0)
+        if self.down:
+            return None
+        return self.customers.get(phone, not_found)
+
+    async def orders_by_customer(self, customer_id):
+        self.calls.append(("orders", customer_id))
+        return None if self.down else list(self.orders.get(customer_id, []))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    fake = FakeApi(
+        customers={"987654321": {"_id": "c1", "name": "Ana", "phone": "987654321"},
+                   "51912345678": {"_id": "c2", "name": "Luis", "phone": "51912345678"}},
+        orders={"c1": [order(1, created_at="2026-03-01T12:00:00.000Z"),
+                       order(2, created_at="2026-03-05T12:00:00.000Z")],
+                "c2": [order(3, customer="c2")]},
+    )
+    monkeypatch.setattr(scope_module, "api", fake)
+    monkeypatch.setattr(scope_module, "CUSTOMER_PHONE_COUNTRY_CODE", "51")
+    return fake
+
+
+@pytest.mark.parametrize("sender_id, phones", [
+    ("51987654321@c.us", ["987654321", "51987654321"]),
+    ("whatsapp:+51987654321", ["987654321", "51987654321"]),
+    ("987654321", ["987654321"]),
+    ("default", []),
+    (None, []),
+])
+def test_sender_phones(monkeypatch, sender_id, phones):
+    monkeypatch.setattr(scope_module, "CUSTOMER_PHONE_COUNTRY_CODE", "51")
+    assert sender_phones(sender_id) == phones
+
+
+def test_partition_loaded_once_and_sorted(api):
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        partition = await scope.get("51987654321@c.us")
+        assert partition.customer.id == "c1"
+        assert [o.id for o in partition.orders] == ["o2", "o1"]  # la más reciente primero
+        assert await scope.get("whatsapp:+51987654321") is partition
+        assert api.calls == [("phone", "987654321"), ("orders", "c1")]
+
+        # Registrado con el código de país: se prueba el número completo después
+        other = await scope.get("51912345678@c.us")
+        assert other.customer.id == "c2"
+
+    asyncio.run(main())
+
+
+def test_concurrent_messages_share_one_load(api):
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        results = await asyncio.gather(*(scope.get("51987654321@c.us") for _ in range(3)))
+        assert all(result is results[0] for result in results)
+        assert len(api.calls) == 2
+
+    asyncio.run(main())
+
+
+def test_ttl_expiry_reloads(api, clock):
+    clock.install(scope_module)
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        await scope.get("51987654321@c.us")
+        clock.advance(31)
+        await scope.get("51987654321@c.us")
+        assert len(api.calls) == 4
+
+    asyncio.run(main())
+
+
+def test_lru_drops_least_recent_sender(api):
+    scope = CustomerScope(2, 30)
+    api.customers["51900000001"] = {"_id": "c3", "name": "Eva"}
+
+    async def main():
+        await scope.get("51987654321")
+        await scope.get("51912345678")
+        await scope.get("51987654321")  # Ana pasa a ser la más reciente
+        await scope.get("51900000001")
+        assert len(scope) == 2
+        calls = len(api.calls)
+        await scope.get("51987654321")
+        assert len(api.calls) == calls
+        await scope.get("51912345678")
+        assert len(api.calls) > calls
+
+    asyncio.run(main())
+
+
+def test_invalidate_by_order_or_customer(api):
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        await scope.get("51987654321")
+        await scope.get("51912345678")
+        scope.invalidate(order_id="o1")
+        assert len(scope) == 1
+        scope.invalidate(customer_id="c2")
+        assert len(scope) == 0
+
+    asyncio.run(main())
+
+
+def test_unknown_sender_is_cached_after_404(api):
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        partition = await scope.get("51999999999")
+        assert partition.customer is None and partition.orders == ()
+        assert api.calls == [("phone", "999999999"), ("phone", "51999999999")]
+        assert await scope.get("51999999999") is partition
+        assert len(api.calls) == 2
+
+    asyncio.run(main())
+
+
+def test_api_failure_is_not_cached(api):
+    scope = CustomerScope(10, 30)
+
+    async def main():
+        api.down = True
+        assert await scope.get("51987654321") is None
+        assert len(scope) == 0
+        # Al volver la API el cliente aparece: la falla no se recordó como "sin cuenta"
+        api.down = False
+        partition = await scope.get("51987654321")
+        assert partition.customer.id == "c1"
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from actions.executor import ComputeBusy, ComputeExecutor
+
+
+@pytest.fixture
+def make_executor():
+    executors = []
+
+    def make(mode="thread", workers=1, queue_size=1, queue_timeout=0.2):
+        executor = ComputeExecutor(mode, workers, queue_size, queue_timeout)
+        executors.append(executor)
+        return executor
+
+    yield make
+    for executor in executors:
+        executor.shutdown()
+
+
+def test_full_queue_raises_busy_within_timeout(make_executor):
+    executor = make_executor(workers=1, queue_size=1, queue_timeout=0.2)
+    release = threading.Event()
+
+    async def main():
+        # Uno calculando y otro esperando turno: la cola queda llena
+        busy = [asyncio.ensure_future(executor.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+
+        start = time.monotonic()
+        with pytest.raises(ComputeBusy):
+            await executor.run(release.wait)
+        assert 0.15 <= time.monotonic() - start < 1.0
+
+        release.set()
+        assert await asyncio.gather(*busy) == [True, True]
+        # Los lugares se liberaron
+        assert await executor.run(sum, [1, 2]) == 3
+
+    asyncio.run(main())
+
+
+def test_slot_is_held_until_computation_ends(make_executor):
+    executor = make_executor(workers=1, queue_size=0, queue_timeout=0.1)
+    release = threading.Event()
+
+    async def main():
+        task = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        task.cancel()  # quien esperaba se va, pero el cálculo sigue ocupando el hilo
+        with pytest.raises(ComputeBusy):
+            await executor.run(sum, [1])
+        release.set()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            try:
+                assert await executor.run(sum, [1]) == 1
+                return
+            except ComputeBusy:
+                pass
+        raise AssertionError("el lugar no se liberó")
+
+    asyncio.run(main())
+
+
+@pytest.mark.parametrize("mode, same_thread", [("inline", True), ("thread", False), ("nada", False)])
+def test_modes_choose_where_to_compute(make_executor, mode, same_thread):
+    executor = make_executor(mode)
+    assert executor.mode == (mode if mode != "nada" else "thread")
+
+    async def main():
+        return await executor.run(threading.get_ident)
+
+    # asyncio.run corre el loop en este hilo
+    assert (asyncio.run(main()) == threading.get_ident()) is same_thread
+
+
+def test_process_mode_runs_in_another_process(make_executor):
+    executor = make_executor("process", queue_timeout=60)
+
+    async def main():
+        assert await executor.run(os.getpid) != os.getpid()
+        # Con documentos en memoria (no compartidos) derive calcula en un hilo
+        assert await executor._run_for(lambda data: os.getpid(), [1]) == os.getpid()
+
+    asyncio.run(main())
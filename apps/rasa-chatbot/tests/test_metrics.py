@@ -0,0 +1,74 @@
+import asyncio
+import socket
+import urllib.error
+import urllib.request
+
+from actions import metrics
+
+from conftest import FakeApp
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(port, path):
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode()
+
+
+class ProbeAction:
+    def name(self):
+        return "action_metrics_probe"
+
+    @metrics.instrumented
+    async def run(self, dispatcher, tracker, domain):
+        metrics.record_http(1234)
+        dispatcher.utter_message(text="listo")
+        return []
+
+
+class Dispatcher:
+    def utter_message(self, *args, **kwargs):
+        pass
+
+
+def test_scrape_after_action_in_server_process(fresh, monkeypatch):
+    port = _free_port()
+    monkeypatch.setattr(metrics, "METRICS_HOST", "127.0.0.1")
+    monkeypatch.setattr(metrics, "METRICS_PORT", port)
+    app = FakeApp()
+    fresh.install(app)
+    assert metrics._server is None  # nada se abre antes de arrancar el servidor
+
+    async def main():
+        await app.start()
+        await ProbeAction().run(Dispatcher(), None, {})
+
+    try:
+        asyncio.run(main())
+        status, body = _get(port, "/metrics")
+        assert status == 200
+        assert 'rasa_action_calls_total{action="action_metrics_probe",outcome="ok"} 1' in body
+        assert 'rasa_action_http_response_bytes_total{action="action_metrics_probe"} 1234' in body
+        assert _get(port, "/ready") == (200, "ready\n")
+    finally:
+        for listener in app.listeners["before_server_stop"]:
+            asyncio.run(listener(app, None))
+    assert metrics._server is None
+
+
+def test_ready_is_503_while_warming_up(monkeypatch):
+    port = _free_port()
+    monkeypatch.setattr(metrics, "_server", None)
+    metrics.start_server("127.0.0.1", port, ready=lambda: False)
+    try:
+        assert _get(port, "/ready") == (503, "warming up\n")
+    finally:
+        metrics.stop_server()
+        monkeypatch.setattr(metrics, "_readiness", lambda: True)
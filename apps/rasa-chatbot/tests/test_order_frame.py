@@ -0,0 +1,55 @@
+import heapq
+import random
+
+import pytest
+
+from actions.kernels import collect_stats, frame_stats
+from actions.order_frame import OrderFrame
+from actions.records import Order
+
+from conftest import order
+
+pytest.importorskip("numpy")
+
+
+def _orders(count, seed=3):
+    rng = random.Random(seed)
+    orders = []
+    for number in range(count):
+        doc = order(number, status=rng.choice(["pending", "delivered", "cancelled"]),
+                    payment_status=rng.choice(["pending", "paid"]), amount=rng.choice([5.0, 12.5, 20.0]),
+                    created_at=f"2026-03-{rng.randrange(1, 29):02d}T12:00:00.000Z",
+                    customer=rng.choice(["c1", "c2", "c3", None]))
+        doc["items"] = [{"productName": rng.choice(["Café", "Té", "Pan", None]), "quantity": rng.randrange(1, 4),
+                         "price": rng.choice([1.5, 3.0])} for _ in range(rng.randrange(0, 3))]
+        if number % 10 == 0:
+            del doc["createdAt"]
+        orders.append(Order.from_doc(doc))
+    return orders
+
+
+@pytest.mark.parametrize("count", [0, 1, 200])
+def test_frame_stats_matches_collect_stats(count):
+    orders = _orders(count)
+    expected, actual = collect_stats(orders), frame_stats(OrderFrame.from_orders(orders))
+    for name in ("product_sales", "customer_totals", "status_counts", "payment_counts"):
+        assert getattr(actual, name) == getattr(expected, name), name
+        # Mismo orden de primera aparición: los empates se resuelven igual
+        assert list(getattr(actual, name)) == list(getattr(expected, name)), name
+
+
+@pytest.mark.parametrize("column", ["amount", "created_at"])
+@pytest.mark.parametrize("k", [0, 1, 7, 500])
+def test_top_rows_breaks_ties_like_heapq(column, k):
+    orders = _orders(200)
+    frame = OrderFrame.from_orders(orders)
+    values = getattr(frame, column).tolist()
+    assert frame.top_rows(column, k) == heapq.nlargest(k, range(len(values)), key=values.__getitem__)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    frame = OrderFrame.from_orders(_orders(50))
+    frame.save(tmp_path)
+    loaded = OrderFrame.load(tmp_path)
+    assert len(loaded) == len(frame) and loaded.nbytes == frame.nbytes
+    assert frame_stats(loaded).customer_totals == frame_stats(frame).customer_totals
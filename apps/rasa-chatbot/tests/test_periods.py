@@ -0,0 +1,79 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from actions.periods import LOCAL_TZ, day_number, local_day, parse_period, period_bounds
+
+# Domingo: la semana empieza el lunes 12
+REFERENCE = date(2026, 10, 18)
+
+
+@pytest.mark.parametrize("text, start, end", [
+    ("", date(2026, 10, 18), date(2026, 10, 18)),
+    ("ventas de hoy", date(2026, 10, 18), date(2026, 10, 18)),
+    ("ventas del día", date(2026, 10, 18), date(2026, 10, 18)),
+    ("pedidos de este dia", date(2026, 10, 18), date(2026, 10, 18)),
+    ("ayer", date(2026, 10, 17), date(2026, 10, 17)),
+    ("anteayer", date(2026, 10, 16), date(2026, 10, 16)),
+    ("esta semana", date(2026, 10, 12), date(2026, 10, 18)),
+    ("la semana pasada", date(2026, 10, 5), date(2026, 10, 11)),
+    ("este mes", date(2026, 10, 1), date(2026, 10, 18)),
+    ("el mes pasado", date(2026, 9, 1), date(2026, 9, 30)),
+    ("este año", date(2026, 1, 1), date(2026, 10, 18)),
+    ("el año pasado", date(2025, 1, 1), date(2025, 12, 31)),
+    ("ventas del año 2024", date(2024, 1, 1), date(2024, 12, 31)),
+    ("octubre", date(2026, 10, 1), date(2026, 10, 18)),
+    ("marzo", date(2026, 3, 1), date(2026, 3, 31)),
+    ("noviembre", date(2025, 11, 1), date(2025, 11, 30)),
+    ("marzo de 2024", date(2024, 3, 1), date(2024, 3, 31)),
+    ("setiembre", date(2026, 9, 1), date(2026, 9, 30)),
+    ("del 1 al 15 de marzo", date(2026, 3, 1), date(2026, 3, 15)),
+    ("del 1 al 15 de marzo de 2024", date(2024, 3, 1), date(2024, 3, 15)),
+    ("del 20 de diciembre al 5 de enero", date(2025, 12, 20), date(2026, 1, 5)),
+    ("15 de marzo", date(2026, 3, 15), date(2026, 3, 15)),
+    ("01/03 al 15/03", date(2026, 3, 1), date(2026, 3, 15)),
+    ("2024-03-05", date(2024, 3, 5), date(2024, 3, 5)),
+    ("últimos 7 días", date(2026, 10, 12), date(2026, 10, 18)),
+    ("últimos 7 dia", date(2026, 10, 12), date(2026, 10, 18)),
+    ("ultimos 7 dia", date(2026, 10, 12), date(2026, 10, 18)),
+    ("ventas de 3 dias", date(2026, 10, 16), date(2026, 10, 18)),
+    ("el último día", date(2026, 10, 18), date(2026, 10, 18)),
+    ("ultimas 2 semanas", date(2026, 10, 5), date(2026, 10, 18)),
+    ("ultimos dos meses", date(2026, 8, 19), date(2026, 10, 18)),
+    ("el último mes", date(2026, 9, 19), date(2026, 10, 18)),
+    ("la última semana", date(2026, 10, 12), date(2026, 10, 18)),
+    ("último año", date(2025, 10, 19), date(2026, 10, 18)),
+])
+def test_parse_period(text, start, end):
+    period = parse_period(text, REFERENCE)
+    assert period is not None
+    assert (period.start, period.end) == (start, end)
+
+
+@pytest.mark.parametrize("text", [
+    "hace un mes",
+    "31 de febrero",
+    "semana 12",
+    "ultimos meses",
+    "el año 2030",
+    "diciembre 2026",
+    "cualquier cosa",
+])
+def test_unrecognized_period_returns_none(text):
+    assert parse_period(text, REFERENCE) is None
+
+
+def test_labels_name_the_period():
+    assert parse_period("ventas del año 2024", REFERENCE).label == "del año 2024"
+    assert parse_period("marzo 2024", REFERENCE).label == "de marzo 2024"
+    assert parse_period("ultimos 3 meses", REFERENCE).label == "de los últimos 3 meses"
+
+
+def test_period_bounds_cover_local_days():
+    period = parse_period("el mes pasado", REFERENCE)
+    start, end = period_bounds(period)
+    assert local_day(start) == day_number(period.start)
+    assert local_day(end - 1) == day_number(period.end)
+    assert local_day(end) == day_number(period.end + timedelta(days=1))
+    # Medianoche local del primer día
+    assert datetime.fromtimestamp(start, LOCAL_TZ) == datetime(2026, 9, 1, tzinfo=LOCAL_TZ)
@@ -0,0 +1,97 @@
+import asyncio
+import json
+
+from actions import cache as cache_module
+from actions import persistence as persistence_module
+from actions import shared_snapshot
+from actions.cache import SnapshotCache
+from actions.http_client import ApiResponse
+from actions.persistence import Persister
+from actions.shared_snapshot import current_generation
+
+from conftest import order
+
+COLLECTIONS = ["orders", "customers"]
+
+
+class FakeApi:
+    """Listados con ETag / Last-Modified (304 si no cambiaron) y deltas por updatedSince."""
+
+    def __init__(self, **collections):
+        self.collections = collections
+        self.calls = []
+
+    async def fetch(self, collection, params=None, headers=None):
+        self.calls.append((collection, params, headers))
+        docs = self.collections[collection]
+        if params and "updatedSince" in params:
+            changed = [doc for doc in docs if doc["updatedAt"] > params["updatedSince"]]
+            return ApiResponse(200, json.dumps(changed).encode())
+        etag = f'W/"{collection}-{len(docs)}"'
+        if headers and headers.get("If-None-Match") == etag:
+            return ApiResponse(304, b"")
+        return ApiResponse(200, json.dumps(docs).encode(),
+                           {"ETag": etag, "Last-Modified": "Sun, 01 Mar 2026 12:00:00 GMT"})
+
+
+def make_cache(api):
+    return SnapshotCache(api.fetch, {"orders": 30, "customers": 30}, 10 ** 6, stale_grace=60,
+                         delta_collections=["orders"], full_sync_interval=600)
+
+
+def test_save_restart_restore(clock, tmp_path):
+    clock.install(cache_module, persistence_module, shared_snapshot)
+    api = FakeApi(orders=[order(1), order(2, updated_at="2026-03-02T08:00:00.000Z")],
+                  customers=[{"_id": "c1", "name": "Ana"}])
+    cache = make_cache(api)
+    persister = Persister(cache, tmp_path, COLLECTIONS, 60)
+
+    async def save():
+        await cache.snapshot(*COLLECTIONS)
+        await cache.refresh("customers")  # 304: misma versión
+        api.collections["orders"].append(order(3, updated_at="2026-03-03T08:00:00.000Z"))
+        clock.advance(31)
+        await cache.refresh("orders")  # delta: versión 2
+        assert await persister.flush()
+        assert not await persister.flush()  # nada cambió desde la última
+        return cache.peek(*COLLECTIONS)
+
+    saved = asyncio.run(save())
+    assert saved.entry("orders").version == 2
+
+    # Reinicio: caché vacía, se restaura de disco sin pedir nada a la API
+    api.calls.clear()
+    restarted = make_cache(api)
+    loaded = {}
+    load = restarted.load
+    restarted.load = lambda name, entry: loaded.setdefault(name, entry) and load(name, entry)
+    assert Persister(restarted, tmp_path, COLLECTIONS, 60).restore() == COLLECTIONS
+    assert not api.calls
+
+    generation = current_generation(tmp_path)
+    for name in COLLECTIONS:
+        before, after = saved.entry(name), loaded[name]
+        assert after.version == before.version
+        assert (after.etag, after.last_modified, after.watermark) == (before.etag, before.last_modified,
+                                                                       before.watermark)
+        assert after.nbytes == (generation / f"{name}.jsonl").stat().st_size
+        assert list(after.data) == list(before.data)
+    assert loaded["orders"].watermark == "2026-03-03T08:00:00.000Z"
+
+    api.collections["orders"].append(order(4, updated_at="2026-03-04T08:00:00.000Z"))
+
+    async def revalidate():
+        # Vencida pero servible: responde ya y revalida con los validadores guardados
+        assert len(await restarted.get("orders")) == 3
+        await restarted.refresh("customers")
+        assert len((await restarted.refresh("orders")).data) == 4
+
+    asyncio.run(revalidate())
+    requests = {}
+    for name, params, headers in api.calls:
+        requests.setdefault(name, (params, headers))  # la primera de cada colección
+    assert requests["orders"][0] == {"updatedSince": "2026-03-03T08:00:00.000Z"}
+    assert requests["customers"][1]["If-None-Match"] == 'W/"customers-1"'
+    # Las versiones nuevas siguen a las restauradas
+    assert restarted.peek("customers").entry("customers").version == saved.entry("customers").version
+    assert restarted.peek("orders").entry("orders").version == 3
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from actions.ranking import bottom_k, top_k
+
+ROWS = [("a", 3), ("b", 1), ("c", 3), ("d", 2), ("e", 1), ("f", 3)]
+
+
+def _score(row):
+    return row[1]
+
+
+def test_ties_keep_original_order():
+    assert top_k(ROWS, 3, key=_score) == [("a", 3), ("c", 3), ("f", 3)]
+    assert bottom_k(ROWS, 3, key=_score) == [("b", 1), ("e", 1), ("d", 2)]
+
+
+@pytest.mark.parametrize("k", [0, 1, 4, len(ROWS), len(ROWS) + 5])
+def test_matches_sorted(k):
+    assert top_k(ROWS, k, key=_score) == sorted(ROWS, key=_score, reverse=True)[:k]
+    assert bottom_k(ROWS, k, key=_score) == sorted(ROWS, key=_score)[:k]
+
+
+def test_k_zero_or_empty_input():
+    assert top_k(ROWS, 0, key=_score) == []
+    assert bottom_k([], 3) == []
+
+
+def test_accepts_generators_and_no_key():
+    rng = random.Random(5)
+    values = [rng.randrange(100) for _ in range(200)]
+    assert top_k(iter(values), 10) == sorted(values, reverse=True)[:10]
+    assert bottom_k((value for value in values), 10) == sorted(values)[:10]
@@ -0,0 +1,73 @@
+import pytest
+
+from actions import records
+from actions.records import Customer, Order, Product, Record, decode, decoder, dumps, loads, to_record
+
+from conftest import order
+
+
+def test_record_needs_from_doc():
+    with pytest.raises(TypeError):
+        Record()
+
+    class Partial(Record):
+        __slots__ = ()
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_get_reads_api_keys_and_extra():
+    doc = dict(order(1, amount=12.5), customerId={"_id": "c9", "name": "Ana"}, source="whatsapp")
+    record = Order.from_doc(doc)
+    assert record.get("totalAmount") == 12.5
+    assert record["orderNumber"] == "ORD-000001"
+    assert record.get("customerId") == "c9"  # referencia poblada -> su ID
+    assert record.get("source") == "whatsapp"  # clave desconocida, en extra
+    assert record.get("notes", "-") == "-"
+    assert "status" in record and "notes" not in record
+    with pytest.raises(KeyError):
+        record["notes"]
+    assert record.items[0].get("productName") == "Café"
+
+
+def test_defaults_are_applied():
+    record = Order.from_doc({"_id": "o1"})
+    assert (record.status, record.payment_status, record.total_amount, record.items) == ("pending", "pending", 0, ())
+    assert Product.from_doc({"_id": "p1"}).get("isActive") is True
+
+
+def test_equality_compares_fields_and_extra():
+    doc = order(1)
+    assert Order.from_doc(doc) == Order.from_doc(dict(doc))
+    assert Order.from_doc(doc) != Order.from_doc(dict(doc, status="delivered"))
+    assert Order.from_doc(doc) != Order.from_doc(dict(doc, source="web"))
+    assert Customer.from_doc({"_id": "x"}) != Product.from_doc({"_id": "x"})
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_round_trip(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(records, "orjson", None)
+    elif records.orjson is None:
+        pytest.skip("orjson no está instalado")
+    docs = [dict(order(1), source="whatsapp"), order(2, status="delivered", payment_status="paid")]
+    decoded = decode("orders", dumps(docs))
+    assert decoded == [Order.from_doc(doc) for doc in docs]
+    # Los registros se escriben con las claves de la API y se leen igual
+    assert decode("orders", dumps(decoded)) == decoded
+    assert loads(dumps(decoded[0])) == docs[0]
+    assert decoder("orders")(dumps(docs[0])) == decoded[0]
+
+
+def test_as_dict_keeps_api_keys():
+    doc = order(1)
+    assert Order.from_doc(doc).as_dict()["items"][0].as_dict() == doc["items"][0]
+    assert {key: value for key, value in Order.from_doc(doc).as_dict().items() if key != "items"} == \
+        {key: value for key, value in doc.items() if key != "items"}
+
+
+def test_collections_without_record_pass_through():
+    doc = {"_id": "x"}
+    assert to_record("carts", doc) is doc
+    assert decode("carts", b'[{"_id":"x"}]') == [doc]
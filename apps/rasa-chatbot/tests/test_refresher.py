@@ -0,0 +1,45 @@
+import asyncio
+
+from actions import refresher as refresher_module
+from actions.refresher import Refresher
+
+
+async def _spin(times=5):
+    for _ in range(times):
+        await asyncio.sleep(0)
+
+
+def test_refresh_stops_while_idle_and_resumes_on_action(clock):
+    clock.install(refresher_module)
+    passes = []
+    refresher = Refresher(None, ["orders"], 0, idle_after=60)
+
+    async def refresh_due():
+        passes.append(clock.now)
+
+    refresher._refresh_due = refresh_due
+
+    async def main():
+        refresher.start()
+        await _spin()
+        assert passes  # arranca refrescando, sin esperar a la primera acción
+
+        clock.advance(61)
+        passes.clear()
+        await _spin()
+        assert not passes and refresher.idle
+
+        refresher.touch()
+        await _spin()
+        assert passes and not refresher.idle
+        refresher.stop()
+
+    asyncio.run(main())
+
+
+def test_without_idle_after_never_idles(clock):
+    clock.install(refresher_module)
+    refresher = Refresher(None, [], 5)
+    refresher.touch()
+    clock.advance(10 ** 6)
+    assert not refresher.idle
@@ -0,0 +1,88 @@
+import math
+
+from actions.cache import CacheEntry
+from actions.records import to_records
+from actions.search_index import SearchIndex, fold
+from actions.snapshot import Snapshot, _customers_by_id, _customers_search, doc_id
+
+
+def customer(number, name):
+    return {"_id": f"c{number}", "name": name}
+
+
+def names(docs):
+    return [doc["name"] for doc in docs]
+
+
+def index_of(docs):
+    return SearchIndex(lambda doc: doc.get("name"), doc_id, docs)
+
+
+def test_search_tolerates_accents_case_and_typos():
+    index = index_of([customer(1, "Ana Pérez"), customer(2, "Anabel Díaz"), customer(3, "Celular Nokia")])
+    assert fold("  Café  Molido-500g") == "cafe molido 500g"
+    assert names(index.search("ana perez")) == ["Ana Pérez"]
+    assert names(index.search("ANA")) == ["Ana Pérez", "Anabel Díaz"]
+    assert names(index.search("celuar")) == ["Celular Nokia"]
+    assert index.search("") == [] and index.best("zzz") is None
+
+
+def test_updated_adds_changes_and_removes():
+    index = index_of([customer(1, "Ana"), customer(2, "Luis"), customer(3, "Luisa")])
+    same = index.updated([customer(2, "Luis Alberto"), customer(4, "Marta")], ["c3"])
+    assert same is index and len(index) == 3
+    assert names(index.search("luis")) == ["Luis Alberto"]  # Luisa ya no está
+    assert names(index.search("marta")) == ["Marta"]
+    assert "Luisa" not in names(index.search("luisa"))
+
+
+def test_changed_document_keeps_its_position_for_ties():
+    index = index_of([customer(1, "Ana Uno"), customer(2, "Ana Dos")])
+    index.updated([customer(1, "Ana Sol")], [])
+    # Mismo largo y mismos trigramas de "ana": desempata el orden de la colección
+    assert names(index.search("ana")) == ["Ana Sol", "Ana Dos"]
+
+    # Borrado y vuelto a agregar: pasa al final
+    index.updated([], ["c1"]).updated([customer(1, "Ana Uno")], [])
+    assert names(index.search("ana")) == ["Ana Dos", "Ana Uno"]
+
+
+def entry(docs, version):
+    return CacheEntry(to_records("customers", docs), 0, math.inf, version)
+
+
+def test_carry_applies_only_the_changes_across_versions():
+    first = entry([customer(1, "Ana"), customer(2, "Luis"), customer(3, "Marta")], 1)
+    old = Snapshot({"customers": first})
+    search = old.derive("customers", _customers_search)
+    old.derive("customers", _customers_by_id)
+
+    second = entry([customer(1, "Ana"), customer(2, "Luis Alberto"), customer(4, "Rosa")], 2)
+    updated = []
+    original = search.updated
+    search.updated = lambda changed, removed: updated.append((names(changed), removed)) or original(changed, removed)
+    first.carry(second)
+
+    new = Snapshot({"customers": second})
+    assert updated == [(["Luis Alberto", "Rosa"], ["c3"])]  # "Ana" no cambió: no se reindexa
+    assert new.derive("customers", _customers_search) is search
+    assert names(new.search_customers("rosa")) == ["Rosa"]
+    assert new.search_customers("marta") == []
+    # Los índices hash no son incrementales: la versión nueva arma los suyos
+    assert second.derived(_customers_by_id.__name__) is None
+    assert new.customer("c4")["name"] == "Rosa" and new.customer("c3") is None
+
+
+def test_older_snapshot_sees_newer_documents():
+    first = entry([customer(1, "Ana"), customer(2, "Luis")], 1)
+    old = Snapshot({"customers": first})
+    old.derive("customers", _customers_search)
+    first.carry(entry([customer(1, "Ana"), customer(3, "Rosa")], 2))
+
+    # El índice se actualiza en el lugar: una acción que aún tiene el
+    # Snapshot anterior ya busca sobre la versión nueva...
+    assert names(old.search_customers("rosa")) == ["Rosa"]
+    assert old.search_customers("luis") == []
+    # ...mientras que sus listas e índices hash siguen siendo los de su versión
+    assert names(old.customers) == ["Ana", "Luis"]
+    assert old.customer("c2")["name"] == "Luis"
@@ -0,0 +1,92 @@
+import math
+
+from actions import server
+from actions import shared_snapshot
+from actions.cache import CacheEntry
+from actions.records import to_records
+from actions.shared_snapshot import (CURRENT, KEEP_GENERATIONS, VERSION_BASE, SharedDocuments,
+                                     SharedSnapshotReader, current_generation, publish)
+from actions.snapshot import Snapshot
+
+from conftest import order
+
+
+def customer(number, name):
+    return {"_id": f"c{number}", "name": name, "email": f"{name.lower()}@example.com", "phone": f"9{number:08d}"}
+
+
+def local_snapshot(version=1, orders=None):
+    orders = orders if orders is not None else [order(1, customer="c1"), order(2, customer="c2")]
+    customers = [customer(1, "Ana"), customer(2, "Luis")]
+    return Snapshot({
+        "orders": CacheEntry(to_records("orders", orders), 100, math.inf, version, etag='"o"',
+                             watermark="2026-03-01T12:00:00.000Z", full_at=1.0),
+        "customers": CacheEntry(to_records("customers", customers), 100, math.inf, version),
+    })
+
+
+def reader_snapshot(reader):
+    return Snapshot({name: reader.entry(name) for name in ("orders", "customers")})
+
+
+def test_reader_serves_published_collections_with_indexes(tmp_path):
+    publish(tmp_path, local_snapshot(), ["orders", "customers"])
+    reader = SharedSnapshotReader(tmp_path, check_interval=0)
+    entry = reader.entry("orders")
+    assert isinstance(entry.data, SharedDocuments)
+    assert entry.version == VERSION_BASE + 1
+    assert (entry.etag, entry.watermark) == ('"o"', "2026-03-01T12:00:00.000Z")
+    assert [doc["orderNumber"] for doc in entry.data] == ["ORD-000001", "ORD-000002"]
+    assert entry.data[-1] == local_snapshot().orders[-1]
+
+    snap = reader_snapshot(reader)
+    assert snap.order_by_number("ORD-000002")["customerId"] == "c2"
+    assert snap.customer("c1")["name"] == "Ana"
+    assert snap.customer({"_id": "c2", "name": "Luis"})["name"] == "Luis"
+    assert snap.order_by_number("ORD-999999") is None and snap.customer("c9") is None
+
+
+def test_new_generation_reaches_reader_and_old_snapshots_keep_reading(tmp_path):
+    publish(tmp_path, local_snapshot(), ["orders", "customers"])
+    reader = SharedSnapshotReader(tmp_path, check_interval=0)
+    before = reader_snapshot(reader)
+
+    # Se vuelve a publicar lo mapeado (sin decodificar) junto con órdenes nuevas
+    republished = Snapshot({"orders": local_snapshot(2, [order(3)]).entry("orders"),
+                            "customers": reader.entry("customers")})
+    publish(tmp_path, republished, ["orders", "customers"])
+    after = reader_snapshot(reader)
+    assert [doc["orderNumber"] for doc in after.orders] == ["ORD-000003"]
+    assert after.customer("c2")["name"] == "Luis"
+    assert [doc["orderNumber"] for doc in before.orders] == ["ORD-000001", "ORD-000002"]
+
+
+def test_prune_keeps_recent_generations(monkeypatch, tmp_path):
+    names = [publish(tmp_path, local_snapshot(version), ["customers"]) for version in range(KEEP_GENERATIONS + 2)]
+    kept = sorted(path.name for path in tmp_path.glob("gen-*"))
+    assert kept == names[-KEEP_GENERATIONS:]
+    assert current_generation(tmp_path).name == names[-1]
+    assert (tmp_path / CURRENT).read_text() == names[-1]
+    assert not list(tmp_path.glob("*.tmp"))
+
+    # Una generación borrada que un worker aún tiene mapeada sigue legible
+    mapped = SharedDocuments(tmp_path / names[-1] / "customers.jsonl")
+    monkeypatch.setattr(shared_snapshot, "KEEP_GENERATIONS", 1)
+    shared_snapshot._prune(tmp_path, "gen-0")
+    assert not list(tmp_path.glob("gen-*"))
+    assert [doc["name"] for doc in mapped] == ["Ana", "Luis"]
+
+
+def test_server_removes_its_temporary_directory(monkeypatch, tmp_path):
+    roots = []
+
+    async def run(args, root):
+        (root / "marker").write_text("x")
+        roots.append(root)
+
+    monkeypatch.setattr(server, "_run", run)
+    server.main(["--workers", "1"])
+    assert not roots[-1].exists()
+
+    server.main(["--workers", "1", "--shared-dir", str(tmp_path)])
+    assert roots[-1] == tmp_path and (tmp_path / "marker").exists()
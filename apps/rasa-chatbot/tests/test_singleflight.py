@@ -0,0 +1,143 @@
+import asyncio
+
+import pytest
+
+from actions import singleflight as singleflight_module
+from actions.render_cache import RenderCache
+from actions.singleflight import SingleFlight, coalesced
+
+
+class Tracker:
+    def __init__(self, **slots):
+        self.slots = slots
+
+    def get_slot(self, name):
+        return self.slots.get(name)
+
+
+class Dispatcher:
+    def __init__(self):
+        self.messages = []
+
+    def utter_message(self, text=None, **kwargs):
+        self.messages.append(text)
+
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(4)))
+        assert [result for result, _ in results] == ["ok"] * 4
+        assert [shared for _, shared in results] == [False, True, True, True]
+        # La clave se libera al terminar: no es una caché
+        await flights.do("key", work)
+
+    asyncio.run(main())
+    assert len(runs) == 2
+
+
+
+def test_errors_reach_every_caller():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("caída")
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("key", fail) for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+    asyncio.run(main())
+
+
+
+def make_action(version, replies):
+    class Action:
+        runs = 0
+
+        def name(self):
+            return "action_test"
+
+        @coalesced(version, slots=("period",))
+        async def run(self, dispatcher, tracker, domain):
+            Action.runs += 1
+            await asyncio.sleep(0)
+            dispatcher.utter_message(text=replies[tracker.get_slot("period")])
+            return [{"event": "slot", "name": "period", "value": None}]
+
+    return Action()
+
+
+
+def test_coalesced_replays_messages_to_every_caller():
+    # Sin versión (datos por sincronizar) las llamadas se unen pero no se guardan
+    action = make_action(lambda: None, {"hoy": "Ventas de hoy"})
+
+    async def main():
+        dispatchers = [Dispatcher() for _ in range(3)]
+        events = await asyncio.gather(*(action.run(d, Tracker(period="hoy"), {}) for d in dispatchers))
+        assert all(d.messages == ["Ventas de hoy"] for d in dispatchers)
+        assert events[0] == events[1] and events[0] is not events[1]  # cada llamada con su copia
+        assert type(action).runs == 1
+
+        await action.run(Dispatcher(), Tracker(period="hoy"), {})
+        assert type(action).runs == 2
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def render_cache(monkeypatch):
+    cache = RenderCache(10 ** 6)
+    monkeypatch.setattr(singleflight_module, "render_cache", cache)
+    return cache
+
+
+
+def test_coalesced_replays_messages_and_caches_by_version(render_cache):
+    state = {"version": 1}
+    action = make_action(lambda: state["version"], {"hoy": "Ventas de hoy", "ayer": "Ventas de ayer"})
+
+    async def main():
+        dispatchers = [Dispatcher() for _ in range(3)]
+        events = await asyncio.gather(*(action.run(d, Tracker(period="hoy"), {}) for d in dispatchers))
+        assert all(d.messages == ["Ventas de hoy"] for d in dispatchers)
+        assert events[0] == events[1] and events[0] is not events[1]  # cada llamada con su copia
+        assert type(action).runs == 1
+
+        await action.run(Dispatcher(), Tracker(period="hoy"), {})
+        assert type(action).runs == 1  # desde render_cache
+        await action.run(Dispatcher(), Tracker(period="ayer"), {})
+        assert type(action).runs == 2  # otro valor de slot, otra clave
+
+        state["version"] = 2
+        await action.run(Dispatcher(), Tracker(period="hoy"), {})
+        assert type(action).runs == 3  # los datos cambiaron
+
+    asyncio.run(main())
+
+
+
+def test_coalesced_does_not_cache_without_version_or_on_error(render_cache):
+    async def main():
+        unsynced = make_action(lambda: None, {"hoy": "Ventas de hoy"})
+        await unsynced.run(Dispatcher(), Tracker(period="hoy"), {})
+        await unsynced.run(Dispatcher(), Tracker(period="hoy"), {})
+        assert type(unsynced).runs == 2
+
+        failing = make_action(lambda: 1, {"hoy": "❌ Error al consultar las ventas"})
+        await failing.run(Dispatcher(), Tracker(period="hoy"), {})
+        await failing.run(Dispatcher(), Tracker(period="hoy"), {})
+        assert type(failing).runs == 2
+        assert len(render_cache) == 0
+
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+import math
+
+import pytest
+
+from actions.cache import CacheEntry
+from actions.records import to_records
+from actions.snapshot import INDEXES, Snapshot, normalize_name, parse_timestamp, ref_id
+
+from conftest import order
+
+CUSTOMERS = [
+    {"_id": "c1", "name": "Ana  Pérez", "email": "Ana@Example.com"},
+    {"_id": "c2", "name": "Luis Díaz", "email": "luis@example.com"},
+    {"_id": "c1", "name": "Duplicada", "email": "otra@example.com"},
+    {"_id": "c3", "name": "", "email": ""},
+]
+PRODUCTS = [{"_id": "p1", "name": "Café Molido"}, {"_id": "p2", "name": "Té Verde", "stock": 0}]
+
+
+def snapshot(**collections):
+    return Snapshot({name: CacheEntry(to_records(name, docs), 0, math.inf, 1) for name, docs in collections.items()})
+
+
+@pytest.fixture
+def snap():
+    return snapshot(orders=[order(1, customer="c1"), order(2, customer="c2")], customers=CUSTOMERS,
+                    products=PRODUCTS)
+
+
+def test_ref_id_accepts_populated_and_bare_ids():
+    assert ref_id("c1") == "c1"
+    assert ref_id({"_id": "c1", "name": "Ana"}) == "c1"
+    assert ref_id({"id": "c1"}) == "c1"
+    assert ref_id(None) is None
+
+
+def test_customer_by_bare_or_populated_reference(snap):
+    assert snap.customer("c2")["name"] == "Luis Díaz"
+    assert snap.customer({"_id": "c2", "name": "Luis Díaz"})["email"] == "luis@example.com"
+    assert snap.customer(snap.order_by_number("ORD-000001")["customerId"])["name"] == "Ana  Pérez"
+    # Ante duplicados gana el primero, igual que next()
+    assert snap.customer("c1")["name"] == "Ana  Pérez"
+
+
+@pytest.mark.parametrize("lookup, value", [
+    ("customer", "c9"), ("customer", {"_id": "c9"}), ("customer", None), ("customer", {}),
+    ("customer_by_email", "nadie@example.com"), ("customer_by_email", None),
+    ("order_by_number", "ORD-999999"), ("order_by_number", None),
+    ("product_by_name", "Pan"), ("product_by_name", None),
+])
+def test_misses_return_none(snap, lookup, value):
+    assert getattr(snap, lookup)(value) is None
+
+
+def test_normalized_lookups(snap):
+    assert snap.customer_by_email("ana@EXAMPLE.com")["_id"] == "c1"
+    assert snap.find_customer("ana pérez")["_id"] == "c1"
+    assert snap.find_customer("luis dias")["_id"] == "c2"  # aproximada
+    assert snap.product_by_name("  café   MOLIDO ")["_id"] == "p1"
+    assert snap.find_product("te verde")["_id"] == "p2"
+    assert snap.order_by_number("ORD-000002")["customerId"] == "c2"
+    assert normalize_name("  Ana \t Pérez ") == "ana pérez"
+
+
+def test_empty_keys_are_not_indexed(snap):
+    by_email = snap.derive("customers", INDEXES["customers"][1])
+    assert "" not in by_email
+    assert snap.customer_by_email("") is None
+
+
+def test_missing_collection_answers_none():
+    partial = snapshot(orders=[order(1)])
+    assert partial.customers is None
+    assert partial.customer("c1") is None
+    assert partial.find_product("café") is None
+    assert partial.search_customers("ana") == []
+    assert partial.version == (("orders", 1),)
+
+
+def test_indexes_are_built_once_per_version(snap):
+    first = snap.derive("orders", INDEXES["orders"][0])
+    snap.order_by_number("ORD-000001")
+    assert snap.derive("orders", INDEXES["orders"][0]) is first
+    snap.build_indexes()
+    assert all(snap.derived(name, builder) is not None for name, builders in INDEXES.items() for builder in builders)
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("2026-03-01T12:00:00.000Z") == 1772366400.0
+    assert parse_timestamp(None) is None and parse_timestamp("ayer") is None
@@ -0,0 +1,143 @@
+import asyncio
+
+from actions import sqlite_replica as replica_module
+from actions.api_client import Page
+from actions.snapshot import parse_timestamp
+from actions.sqlite_replica import SQLiteReplica
+
+from conftest import FakeCollections, order
+
+
+def payment(number, status="completed", amount=10.0, updated_at="2026-03-01T12:00:00.000Z"):
+    return {"_id": f"p{number}", "orderId": f"o{number}", "status": status, "amount": amount,
+            "updatedAt": updated_at}
+
+
+class FakeApi:
+    """Deltas de órdenes y pagos por updatedSince, como la API."""
+
+    def __init__(self, orders, payments):
+        self.orders = orders
+        self.payments = payments
+        self.since = {"orders": [], "payments": []}
+
+    def _page(self, name, docs, updated_since):
+        self.since[name].append(updated_since)
+        items = [doc for doc in docs if updated_since is None or doc["updatedAt"] >= updated_since]
+        return Page(items, len(items))
+
+    async def list_orders(self, updated_since=None, fields=None, **filters):
+        return self._page("orders", self.orders, updated_since)
+
+    async def list_payments(self, updated_since=None, fields=None, **filters):
+        return self._page("payments", self.payments, updated_since)
+
+
+def install(monkeypatch, orders, payments):
+    collections = FakeCollections(orders=orders, payments=payments)
+    api = FakeApi(orders, payments)
+    monkeypatch.setattr(replica_module, "snapshot_cache", collections)
+    monkeypatch.setattr(replica_module, "api", api)
+    return collections, api
+
+
+def test_queries_wait_for_background_load(monkeypatch):
+    install(monkeypatch, [order(1)], [])
+    replica = SQLiteReplica(":memory:")
+
+    async def main():
+        # Sin cargar: el llamador consulta la API y la carga sigue en segundo plano
+        assert await replica.list_orders() is None
+        await replica._task
+        page = await replica.list_orders()
+        assert [item["id"] for item in page.items] == ["o1"]
+
+    asyncio.run(main())
+
+
+def test_list_orders_filters_and_counts(monkeypatch):
+    orders = [
+        order(1, status="pending", customer="c1", created_at="2026-03-01T12:00:00.000Z"),
+        order(2, status="delivered", payment_status="paid", customer="c2", created_at="2026-03-02T12:00:00.000Z"),
+        order(3, status="pending", customer="c2", created_at="2026-03-03T12:00:00.000Z"),
+        order(4, status="pending", customer="c1", created_at="2026-03-04T12:00:00.000Z"),
+    ]
+    install(monkeypatch, orders, [payment(1), payment(2, amount=5.5), payment(3, status="failed")])
+    replica = SQLiteReplica(":memory:")
+
+    async def main():
+        assert await replica.sync()
+        page = await replica.list_orders(status="pending", limit=2)
+        assert [item["id"] for item in page.items] == ["o1", "o3"]
+        assert page.total == 3
+
+        page = await replica.list_orders(customer_id="c2", payment_status="paid")
+        assert [item["orderNumber"] for item in page.items] == ["ORD-000002"]
+
+        page = await replica.list_orders(since=parse_timestamp("2026-03-02T00:00:00.000Z"),
+                                         until=parse_timestamp("2026-03-04T00:00:00.000Z"))
+        assert [item["id"] for item in page.items] == ["o2", "o3"]
+
+        assert await replica.payment_totals("completed") == (2, 15.5)
+        assert await replica.payment_totals("refunded") == (0, 0.0)
+
+    asyncio.run(main())
+
+
+def test_deltas_keep_row_order_and_empty_table_stays_loaded(monkeypatch):
+    collections, api = install(monkeypatch, [order(1), order(2)], [])
+    monkeypatch.setattr(replica_module, "SQLITE_SYNC_INTERVAL", 0)
+    replica = SQLiteReplica(":memory:")
+
+    async def main():
+        assert await replica.sync()
+        # Sin pagos no hay marca de agua, pero la réplica ya está cargada
+        assert not replica._reconcile_due()
+
+        api.orders[0] = order(1, status="delivered", updated_at="2026-03-02T12:00:00.000Z")
+        api.payments.append(payment(1, updated_at="2026-03-02T12:00:00.000Z"))
+        assert await replica.sync()
+        assert api.since["payments"] == [None]
+
+        page = await replica.list_orders()
+        assert [(item["id"], item["status"]) for item in page.items] == [("o1", "delivered"), ("o2", "pending")]
+        assert await replica.payment_totals("completed") == (1, 10.0)
+        assert api.since["payments"][-1] == "2026-03-02T12:00:00.000Z"
+        assert collections.streams == ["orders", "payments"]  # no volvió a cargar todo
+
+    asyncio.run(main())
+
+
+def test_apply_and_remove(monkeypatch):
+    install(monkeypatch, [order(1), order(2)], [])
+    replica = SQLiteReplica(":memory:")
+
+    async def main():
+        assert await replica.sync()
+        replica.apply("orders", order(2, status="cancelled"))
+        replica.remove("orders", "o1")
+        page = await replica.list_orders()
+        assert [(item["id"], item["status"]) for item in page.items] == [("o2", "cancelled")]
+
+    asyncio.run(main())
+
+
+def test_file_replica_resumes_from_watermark(monkeypatch, tmp_path):
+    path = str(tmp_path / "replica.db")
+    collections, api = install(monkeypatch, [order(1, updated_at="2026-03-01T12:00:00.000Z")], [payment(1)])
+    monkeypatch.setattr(replica_module, "SQLITE_SYNC_INTERVAL", 0)
+    asyncio.run(SQLiteReplica(path).sync())
+
+    # Un reinicio abre el archivo y pide solo los cambios desde la marca guardada
+    api.orders.append(order(2, updated_at="2026-03-05T12:00:00.000Z"))
+    replica = SQLiteReplica(path)
+
+    async def main():
+        assert await replica.sync()
+        assert replica.ready
+        page = await replica.list_orders()
+        assert [item["id"] for item in page.items] == ["o1", "o2"]
+
+    asyncio.run(main())
+    assert collections.streams == ["orders", "payments"]
+    assert api.since["orders"][0] == "2026-03-01T12:00:00.000Z"
@@ -0,0 +1,98 @@
+import asyncio
+import types
+
+from actions import metrics
+
+from conftest import FakeApp
+
+
+class FakeCache:
+    """snapshot_cache para la precarga: get() espera a que se abra `gate`."""
+
+    def __init__(self):
+        self.gate = None
+        self.requested = []
+
+    async def get(self, name):
+        self.requested.append(name)
+        await self.gate.wait()
+        return []
+
+    def peek(self, *names):
+        return types.SimpleNamespace(build_indexes=lambda: None)
+
+
+async def _nothing(*args):
+    return None
+
+
+def test_loader_registers_listeners_on_each_app(fresh):
+    class AppLoader:
+        def load(self):
+            return FakeApp()
+
+    fresh._patch_loader(AppLoader)
+    fresh._patch_loader(AppLoader)  # una sola vez aunque se importe de nuevo
+    first, second = AppLoader().load(), AppLoader().load()
+    for app in (first, second):
+        assert app.listeners["after_server_start"] == [fresh._after_server_start]
+        assert "/ready" in app.routes
+
+    other = FakeApp("otra")
+    fresh._listen(other)
+    fresh._listen(other)
+    assert len(other.listeners["after_server_start"]) == 1
+
+
+def test_nothing_starts_at_install(fresh, monkeypatch):
+    monkeypatch.setattr(fresh, "WARM_START", True)
+    monkeypatch.setattr(fresh, "REFRESH_ENABLED", True)
+    started = []
+    monkeypatch.setattr(fresh, "refresher", types.SimpleNamespace(start=lambda: started.append("refresh")))
+    fresh.install()
+    assert not started and fresh._task is None
+    assert metrics._server is None  # ni el endpoint de métricas
+    assert not fresh.is_ready()
+
+
+def test_ready_waits_for_warm_start(fresh, monkeypatch):
+    cache = FakeCache()
+    monkeypatch.setattr(fresh, "WARM_START", True)
+    monkeypatch.setattr(fresh, "snapshot_cache", cache)
+    monkeypatch.setattr(fresh, "compute_executor", types.SimpleNamespace(order_stats=_nothing))
+    monkeypatch.setattr(fresh, "sales_aggregator", types.SimpleNamespace(sync=_nothing))
+    app = FakeApp()
+    fresh.install(app)
+    assert not fresh.is_ready()
+
+    async def main():
+        cache.gate = asyncio.Event()
+        await app.start()  # la precarga empieza con el servidor, no con la primera acción
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert cache.requested
+        assert not fresh.is_ready()
+        cache.gate.set()
+        assert await fresh._task
+        assert fresh.is_ready()
+
+    asyncio.run(main())
+
+
+def test_refresh_starts_with_server_and_tracks_actions(fresh, monkeypatch):
+    started, touched = [], []
+    monkeypatch.setattr(fresh, "REFRESH_ENABLED", True)
+    monkeypatch.setattr(fresh, "refresher", types.SimpleNamespace(start=lambda: started.append(True),
+                                                                    touch=lambda: touched.append(True)))
+    app = FakeApp()
+    fresh.install(app)
+    asyncio.run(app.start())
+    assert started == [True]
+    for callback in metrics._on_action:
+        callback()
+    assert touched == [True]
+
+
+def test_ready_immediately_without_warm_start(fresh):
+    fresh.install(FakeApp())
+    assert fresh.is_ready()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from actions.streaming import JsonArrayParser, iter_json_array
+
+DOCS = [
+    {"_id": "1", "name": "Café [grande], \"especial\"", "price": 12.5, "tags": ["a", "b"]},
+    {"_id": "2", "name": "Té ñandú", "price": 7, "nested": {"list": [1, 2, {"x": None}]}},
+    12.75,
+    "texto con ] y ,",
+    True,
+]
+BODY = json.dumps(DOCS, ensure_ascii=False, indent=1).encode()
+
+
+def parse(chunks):
+    parser = JsonArrayParser()
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return items
+
+
+def test_any_split_point_gives_same_items():
+    # Cortes en cualquier byte, incluso dentro de un carácter UTF-8 o de un número
+    for cut in range(len(BODY) + 1):
+        assert parse([BODY[:cut], BODY[cut:]]) == DOCS
+
+
+def test_byte_by_byte():
+    assert parse([BODY[i:i + 1] for i in range(len(BODY))]) == DOCS
+
+
+def test_items_are_returned_as_they_complete():
+    parser = JsonArrayParser()
+    assert parser.feed(b'[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(b': 2}, 3') == [{"b": 2}]
+    assert parser.feed(b']') == [3]
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize("body", [b'[{"a": 1}, {"b": 2}', b'{"a": 1}', b'[1 2]', b'[1] 2', b'',
+                                  b'[1,]', b'[1, ]', b'[{"a": 1},\n]', b'[,1]', b'[1,,2]', b'[,]'])
+def test_invalid_or_incomplete_arrays_fail(body):
+    with pytest.raises(ValueError):
+        parse([body])
+
+
+def test_trailing_comma_fails_across_chunks():
+    parser = JsonArrayParser()
+    assert parser.feed(b'[1,') == [1]
+    with pytest.raises(ValueError):
+        parser.feed(b' ]')
+
+
+def test_empty_array():
+    assert parse([b" [ ] "]) == []
+
+
+def test_iter_json_array():
+    async def chunks():
+        for i in range(0, len(BODY), 7):
+            yield BODY[i:i + 7]
+
+    async def main():
+        return [item async for item in iter_json_array(chunks())]
+
+    assert asyncio.run(main()) == DOCS